@@ -0,0 +1,76 @@
+"""
+Compares the cached temperature conversion of
+`nomad_polymerization_reactions.units` with the per-record pint conversion that
+`generate_archive_from_json` used before.
+
+Run with:
+```sh
+python benchmarks/bench_temperature.py --records 100000
+```
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+from nomad.units import ureg
+
+from nomad_polymerization_reactions.units import (
+    temperature_to_kelvin,
+    temperatures_to_kelvin,
+)
+
+UNITS = ['°C', '°C', '°C', 'K', '°F']
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def per_record_pint(temperatures, units):
+    return [
+        ureg.Quantity(temperature, unit).to('K').magnitude
+        for temperature, unit in zip(temperatures, units)
+    ]
+
+
+def per_record_cached(temperatures, units):
+    return [
+        temperature_to_kelvin(temperature, unit)
+        for temperature, unit in zip(temperatures, units)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--records', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    temperatures = [rng.uniform(-50.0, 200.0) for _ in range(args.records)]
+    units = [rng.choice(UNITS) for _ in range(args.records)]
+
+    reference, pint_time = _timed(per_record_pint, temperatures, units)
+    cached, cached_time = _timed(per_record_cached, temperatures, units)
+    vectorized, vectorized_time = _timed(temperatures_to_kelvin, temperatures, units)
+    assert cached == reference
+    np.testing.assert_array_equal(vectorized, reference)
+
+    print(f'{args.records} records')
+    for label, elapsed in (
+        ('per-record pint', pint_time),
+        ('per-record cached', cached_time),
+        ('vectorized', vectorized_time),
+    ):
+        print(
+            f'{label:<18} {elapsed:9.4f} s  {args.records / elapsed:14.0f} records/s'
+            f'  x{pint_time / elapsed:8.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,381 @@
+"""
+Measures the throughput, per-record latency and peak memory of the archive
+conversion, serialization, schema normalization and CLI conversion on a synthetic
+reaction corpus and writes the results as JSON.
+
+Every stage runs in a fresh process, so that the peak RSS of one stage does not
+include the memory of another, but it does include the memory of the imported
+modules. During normalization, the PubChem substance lookup and the Crossref
+requests are replaced by local stand-ins.
+
+The `normalize_repeated` and `normalize_repeated_uncached` stages normalize an
+upload in which the same monomer pairs occur many times, with and without the
+cache of polymer compositions.
+
+The `load_dicts` and `load_store` stages load a JSONL corpus of the records into
+memory, once as a list of archive dicts and once into a columnar
+`ReactionStore`, and report the memory retained by the loaded reactions.
+
+Run with:
+```sh
+python benchmarks/run_benchmarks.py --records 100000 --output results.json
+```
+"""
+
+import argparse
+import datetime
+import importlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+
+import numpy as np
+import requests
+import structlog
+from click.testing import CliRunner
+from nomad.client import normalize_all
+from nomad.datamodel import EntryArchive, EntryMetadata
+from synthetic import FORMULAS, generate_records
+
+from nomad_polymerization_reactions.cli import cli
+from nomad_polymerization_reactions.store import ReactionStore
+from nomad_polymerization_reactions.utils import build_archive_entry, dump_archive
+
+STAGES = (
+    'convert',
+    'serialize_yaml',
+    'serialize_json',
+    'normalize',
+    'normalize_repeated',
+    'normalize_repeated_uncached',
+    'cli',
+    'load_dicts',
+    'load_store',
+)
+PERCENTILES = (50, 90, 99)
+
+
+def _peak_rss_bytes(who=resource.RUSAGE_SELF) -> int:
+    # `ru_maxrss` is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _summarize(latencies: array, wall_seconds: float) -> dict:
+    # the throughput excludes the time spent generating the synthetic records
+    values = np.frombuffer(latencies, dtype=np.float64)
+    seconds = float(values.sum())
+    summary = dict(
+        records=len(values),
+        seconds=seconds,
+        wall_seconds=wall_seconds,
+        records_per_second=len(values) / seconds if seconds else None,
+    )
+    if len(values):
+        for percentile, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+            summary[f'latency_p{percentile}_ms'] = value * 1e3
+        summary['latency_max_ms'] = values.max() * 1e3
+    return summary
+
+
+def _timed_records(function, records) -> dict:
+    latencies = array('d')
+    start = time.perf_counter()
+    for record in records:
+        record_start = time.perf_counter()
+        function(record)
+        latencies.append(time.perf_counter() - record_start)
+    return _summarize(latencies, time.perf_counter() - start)
+
+
+def bench_convert(config: dict) -> dict:
+    records = generate_records(config['records'], config['seed'], config['missing'])
+    return _timed_records(build_archive_entry, records)
+
+
+def _bench_serialize(config: dict, archive_format: str) -> dict:
+    # only the serialization is timed, the entries are built on the fly
+    entries = (
+        build_archive_entry(record)
+        for record in generate_records(
+            config['records'], config['seed'], config['missing']
+        )
+    )
+    return _timed_records(lambda entry: dump_archive(entry, archive_format), entries)
+
+
+def bench_serialize_yaml(config: dict) -> dict:
+    return _bench_serialize(config, 'yaml')
+
+
+def bench_serialize_json(config: dict) -> dict:
+    return _bench_serialize(config, 'json')
+
+
+def _stub_network():
+    polymerization = importlib.import_module(
+        'nomad_polymerization_reactions.schema_packages.polymerization'
+    )
+
+    def lookup_substance(name, logger, cache=None):
+        return dict(
+            pub_chem_cid=sum(name.encode()),
+            molecular_formula=FORMULAS.get(name, 'C8H8'),
+            smile='C=CC1=CC=CC=C1',
+        )
+
+    def get(*args, **kwargs):
+        response = requests.Response()
+        response.status_code = 404
+        return response
+
+    polymerization.lookup_substance = lookup_substance
+    requests.get = get
+    return polymerization
+
+
+def _bench_normalize(records, composition_cache: bool = True) -> dict:
+    polymerization = _stub_network()
+    if not composition_cache:
+        polymerization.get_composition_cache = lambda: None
+    logger = structlog.wrap_logger(structlog.ReturnLogger())
+
+    def normalize(record):
+        entry = build_archive_entry(record)
+        archive = EntryArchive(
+            data=polymerization.PolymerizationReaction.m_from_dict(entry['data']),
+            metadata=EntryMetadata(mainfile=record['file']),
+        )
+        normalize_all(archive, logger)
+
+    result = _timed_records(normalize, records)
+    cache = polymerization.get_composition_cache()
+    if cache is not None:
+        result['composition_cache_hits'] = cache.hits
+        result['composition_cache_misses'] = cache.misses
+    return result
+
+
+def bench_normalize(config: dict) -> dict:
+    return _bench_normalize(
+        generate_records(config['normalize_records'], config['seed'], config['missing'])
+    )
+
+
+def _repeated_records(config: dict):
+    # about 20 distinct monomer sets, each occurring in many entries
+    pairs = list(generate_records(20, config['seed'], config['missing']))
+    for index, record in enumerate(
+        generate_records(config['repeated_records'], config['seed'] + 1, 0.0)
+    ):
+        pair = pairs[index % len(pairs)]
+        for key in [key for key in record if key.startswith('monomer')]:
+            del record[key]
+        record.update(
+            (key, value) for key, value in pair.items() if key.startswith('monomer')
+        )
+        yield record
+
+
+def bench_normalize_repeated(config: dict) -> dict:
+    return _bench_normalize(_repeated_records(config))
+
+
+def bench_normalize_repeated_uncached(config: dict) -> dict:
+    return _bench_normalize(_repeated_records(config), composition_cache=False)
+
+
+def bench_cli(config: dict) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        filepaths = []
+        records = generate_records(
+            config['cli_records'], config['seed'], config['missing']
+        )
+        for index, record in enumerate(records):
+            filepath = os.path.join(directory, f'reaction_{index}.json')
+            with open(filepath, 'w') as f:
+                json.dump(record, f)
+            filepaths.append(filepath)
+
+        start = time.perf_counter()
+        result = CliRunner().invoke(
+            cli,
+            [
+                'create-archive',
+                '--same-dir-as-input',
+                '--jobs',
+                str(config['jobs']),
+                *filepaths,
+            ],
+        )
+        elapsed = time.perf_counter() - start
+        if result.exit_code != 0:
+            raise RuntimeError(f'create-archive failed:\n{result.output}')
+        failed = sum(
+            not os.path.exists(filepath.replace('.json', '.archive.yaml'))
+            for filepath in filepaths
+        )
+
+    return dict(
+        records=len(filepaths),
+        failed=failed,
+        jobs=config['jobs'],
+        seconds=elapsed,
+        records_per_second=len(filepaths) / elapsed if elapsed else None,
+        workers_peak_rss_bytes=_peak_rss_bytes(resource.RUSAGE_CHILDREN),
+    )
+
+
+def _load_dicts(corpus_path: str) -> list[dict]:
+    with open(corpus_path, 'rb') as f:
+        return [build_archive_entry(json.loads(line)) for line in f if line.strip()]
+
+
+def _bench_load(config: dict, load) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        corpus_path = os.path.join(directory, 'reactions.jsonl')
+        with open(corpus_path, 'w') as f:
+            for record in generate_records(
+                config['records'], config['seed'], config['missing']
+            ):
+                f.write(json.dumps(record) + '\n')
+
+        start = time.perf_counter()
+        records = len(load(corpus_path))
+        elapsed = time.perf_counter() - start
+
+        # tracing slows the loading down, so the memory is measured separately
+        tracemalloc.start()
+        loaded = load(corpus_path)
+        retained_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del loaded
+
+    return dict(
+        records=records,
+        seconds=elapsed,
+        records_per_second=records / elapsed if elapsed else None,
+        retained_bytes=retained_bytes,
+        retained_bytes_per_record=retained_bytes / records if records else None,
+    )
+
+
+def bench_load_dicts(config: dict) -> dict:
+    return _bench_load(config, _load_dicts)
+
+
+def bench_load_store(config: dict) -> dict:
+    return _bench_load(config, ReactionStore.from_jsonl)
+
+
+def _run_stage(stage: str, config: dict, queue) -> None:
+    result = globals()[f'bench_{stage}'](config)
+    result['peak_rss_bytes'] = _peak_rss_bytes()
+    queue.put(result)
+
+
+def run_stage(stage: str, config: dict) -> dict:
+    """
+    Runs a benchmark stage in a fresh process and returns its results.
+    """
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_run_stage, args=(stage, config, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--records', type=int, default=10000)
+    parser.add_argument(
+        '--normalize-records',
+        type=int,
+        default=1000,
+        help='Number of records to normalize, which is about 100 times slower.',
+    )
+    parser.add_argument(
+        '--repeated-records',
+        type=int,
+        default=10000,
+        help='Number of records with repeated monomer pairs to normalize.',
+    )
+    parser.add_argument(
+        '--cli-records',
+        type=int,
+        default=1000,
+        help='Number of JSON files converted in the CLI stage.',
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--missing',
+        type=float,
+        default=0.1,
+        help='Probability of each optional field to be null.',
+    )
+    parser.add_argument('--jobs', type=int, default=1)
+    parser.add_argument(
+        '--stages', nargs='+', choices=STAGES, default=list(STAGES), metavar='STAGE'
+    )
+    parser.add_argument('--output', default='benchmark_results.json')
+    args = parser.parse_args(argv)
+
+    config = dict(
+        records=args.records,
+        normalize_records=args.normalize_records,
+        repeated_records=args.repeated_records,
+        cli_records=args.cli_records,
+        seed=args.seed,
+        missing=args.missing,
+        jobs=args.jobs,
+    )
+    results = dict(
+        metadata=dict(
+            timestamp=datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            python=platform.python_version(),
+            platform=platform.platform(),
+            cpus=os.cpu_count(),
+            git_commit=_git_commit(),
+        ),
+        config=config,
+        stages=dict(),
+    )
+    for stage in args.stages:
+        result = run_stage(stage, config)
+        results['stages'][stage] = result
+        print(
+            f'{stage:<28} {result["records"]:>9} records'
+            f'  {result["records_per_second"] or 0:12.0f} records/s'
+            f'  {result["peak_rss_bytes"] / 2**20:8.1f} MiB peak RSS'
+        )
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'Results written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Generates synthetic reaction records in the flat LLM output format accepted by
+`generate_archive_from_json`.
+"""
+
+import random
+from collections.abc import Iterator
+
+MONOMERS = [
+    ('styrene', 'C=Cc1ccccc1'),
+    ('methyl methacrylate', 'C=C(C)C(=O)OC'),
+    ('methacrylic acid', 'C=C(C)C(=O)O'),
+    ('acrylonitrile', 'C=CC#N'),
+    ('butyl acrylate', 'C=CC(=O)OCCCC'),
+    ('vinyl acetate', 'C=COC(C)=O'),
+    ('ethylene', 'C=C'),
+    ('carbon monoxide', '[C-]#[O+]'),
+    ('maleic anhydride', 'O=C1C=CC(=O)O1'),
+    ('N-vinylpyrrolidone', 'C=CN1CCCC1=O'),
+    ('acrylamide', 'C=CC(N)=O'),
+    ('2-hydroxyethyl methacrylate', 'C=C(C)C(=O)OCCO'),
+]
+# Molecular formulas returned by the PubChem stand-in of the benchmarks.
+FORMULAS = {
+    'styrene': 'C8H8',
+    'methyl methacrylate': 'C5H8O2',
+    'methacrylic acid': 'C4H6O2',
+    'acrylonitrile': 'C3H3N',
+    'butyl acrylate': 'C7H12O2',
+    'vinyl acetate': 'C4H6O2',
+    'ethylene': 'C2H4',
+    'carbon monoxide': 'CO',
+    'maleic anhydride': 'C4H2O3',
+    'N-vinylpyrrolidone': 'C6H9NO',
+    'acrylamide': 'C3H5NO',
+    '2-hydroxyethyl methacrylate': 'C6H10O3',
+}
+SOLVENTS = ['toluene', 'benzene', 'chloroform', 'CC(C)O', '1,4-dioxane', 'DMF']
+METHODS = ['bulk', 'solvent', 'emulsion', 'suspension']
+POLYMERIZATION_TYPES = ['free radical', 'ATRP', 'RAFT', 'anionic', 'cationic']
+DETERMINATION_METHODS = ['Fineman-Ross', 'Kelen-Tudor', 'Mayo-Lewis', 'NLLS']
+TEMPERATURES = {
+    '°C': (20.0, 120.0),
+    'K': (293.15, 393.15),
+    '°F': (68.0, 248.0),
+}
+
+
+def _maybe(rng: random.Random, missing: float, value):
+    return None if rng.random() < missing else value
+
+
+def generate_record(rng: random.Random, index: int, missing: float = 0.1) -> dict:
+    """
+    Generates one synthetic reaction record.
+
+    Args:
+        rng (random.Random): The random number generator.
+        index (int): The index of the record, used for the file and DOI.
+        missing (float): Probability of each optional field to be null.
+
+    Returns:
+        dict: The record.
+    """
+    paper = index // 5
+    record = {'file': f'paper_{paper}.json'}
+    n_monomers = rng.choices([1, 2, 3, 4], weights=[1, 16, 2, 1])[0]
+    for iterator, (name, smiles) in enumerate(rng.sample(MONOMERS, n_monomers), 1):
+        record[f'monomer{iterator}'] = name
+        record[f'monomer{iterator}_s'] = _maybe(rng, missing, smiles)
+
+    r1, r2 = (
+        round(rng.lognormvariate(-0.5, 1.0), 3),
+        round(rng.lognormvariate(-0.5, 1.0), 3),
+    )
+    record['r_values'] = {'constant_1': r1, 'constant_2': r2}
+    record['conf_intervals'] = {
+        'constant_conf_1': _maybe(rng, missing, round(r1 * rng.uniform(0.01, 0.2), 3)),
+        'constant_conf_2': _maybe(rng, missing, round(r2 * rng.uniform(0.01, 0.2), 3)),
+    }
+    unit = rng.choice(list(TEMPERATURES))
+    record['temperature'] = _maybe(
+        rng, missing, round(rng.uniform(*TEMPERATURES[unit]), 1)
+    )
+    record['temperature_unit'] = unit
+    record['solvent'] = _maybe(rng, missing, rng.choice(SOLVENTS))
+    record['method'] = _maybe(rng, missing, rng.choice(METHODS))
+    record['polymerization_type'] = _maybe(
+        rng, missing, rng.choice(POLYMERIZATION_TYPES)
+    )
+    record['determination_method'] = _maybe(
+        rng, missing, rng.choice(DETERMINATION_METHODS)
+    )
+    record['r-product'] = _maybe(rng, missing, round(r1 * r2, 4))
+    record['source'] = f'https://doi.org/10.0000/synthetic.{paper}'
+    record['logP'] = _maybe(rng, missing, round(rng.uniform(-1.0, 4.0), 4))
+    return record
+
+
+def generate_records(n: int, seed: int = 0, missing: float = 0.1) -> Iterator[dict]:
+    """
+    Lazily generates `n` synthetic reaction records. The same seed always generates
+    the same records.
+    """
+    rng = random.Random(seed)
+    for index in range(n):
+        yield generate_record(rng, index, missing)
@@ -0,0 +1,359 @@
+import functools
+import json
+import os
+import zipfile
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING, Optional
+
+from nomad_polymerization_reactions.profiling import (
+    count,
+    map_ordered,
+    profile_stage,
+)
+from nomad_polymerization_reactions.utils import (
+    build_archive_entry,
+    dump_archive,
+    get_archive_path,
+    iter_archives_from_nested_json,
+)
+
+if TYPE_CHECKING:
+    from structlog.stdlib import BoundLogger
+
+# Size of the local file header, data descriptor and central directory record
+# of a zip member, excluding the member name.
+_ZIP_MEMBER_OVERHEAD = 30 + 16 + 46
+_ZIP_END_OF_CENTRAL_DIRECTORY = 22
+
+# A JSON input is either a plain file `(path, None)` or a member of a zip file
+# `(zip path, member name)`.
+JsonInput = tuple[str, Optional[str]]
+
+
+class DirectoryWriter:
+    """
+    Writes archives as individual files into a directory.
+
+    Args:
+        directory (str): The output directory. Defaults to the working directory.
+    """
+
+    def __init__(self, directory: str = '.'):
+        self.directory = directory
+        self.paths = []
+
+    def add(self, name: str, content: str) -> None:
+        path = os.path.join(self.directory, name)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+        self.paths.append(path)
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class ZipBundleWriter:
+    """
+    Writes archives into upload-ready zip bundles named `<prefix>_<n>.zip`, with `n`
+    counting from 1. A new bundle is started before a bundle would exceed
+    `max_entries` members or `max_bytes` bytes on disk. A single archive larger than
+    `max_bytes` still gets a bundle of its own. An archive with the name of an
+    archive already in the bundle is rejected with a `ValueError`, as an upload
+    only keeps one of them.
+
+    Args:
+        prefix (str): Path prefix of the bundles.
+        max_entries (int): Maximum number of archives per bundle.
+        max_bytes (int): Maximum size of a bundle in bytes.
+        compression (int): The `zipfile` compression method.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        compression: int = zipfile.ZIP_DEFLATED,
+    ):
+        self.prefix = prefix
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self.paths = []
+        self._zip_file = None
+        self._entries = 0
+        self._central_directory_size = 0
+        self._names = set()
+
+    def _projected_size(self, name: str, size: int) -> int:
+        member_size = size + 2 * len(name.encode()) + _ZIP_MEMBER_OVERHEAD
+        return (
+            self._zip_file.fp.tell()
+            + self._central_directory_size
+            + member_size
+            + _ZIP_END_OF_CENTRAL_DIRECTORY
+        )
+
+    def _is_full(self, name: str, size: int) -> bool:
+        if self._zip_file is None:
+            return True
+        if self._entries == 0:
+            return False
+        if self.max_entries is not None and self._entries >= self.max_entries:
+            return True
+        return (
+            self.max_bytes is not None
+            and self._projected_size(name, size) > self.max_bytes
+        )
+
+    def _next_bundle(self) -> None:
+        self.close()
+        path = f'{self.prefix}_{len(self.paths) + 1}.zip'
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._zip_file = zipfile.ZipFile(path, 'w', compression=self.compression)
+        self._entries = 0
+        self._central_directory_size = 0
+        self._names = set()
+        self.paths.append(path)
+
+    def add(self, name: str, content: str) -> None:
+        data = content.encode()
+        if self._is_full(name, len(data)):
+            self._next_bundle()
+        if name in self._names:
+            raise ValueError(
+                f'Duplicate archive name "{name}" in bundle {self.paths[-1]}.'
+            )
+        self._zip_file.writestr(name, data)
+        self._names.add(name)
+        self._entries += 1
+        self._central_directory_size += 46 + len(name.encode())
+
+    def close(self) -> None:
+        if self._zip_file is not None:
+            self._zip_file.close()
+            self._zip_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def iter_json_inputs(paths: Iterable[str]) -> Iterator[JsonInput]:
+    """
+    Expands the given paths into JSON inputs. Zip files are expanded into their
+    `.json` members without extracting them.
+
+    Args:
+        paths (Iterable[str]): Paths of JSON or zip files.
+
+    Yields:
+        JsonInput: The JSON inputs in order.
+    """
+    for path in paths:
+        if not zipfile.is_zipfile(path):
+            yield path, None
+            continue
+        with zipfile.ZipFile(path) as zip_file:
+            members = [
+                info.filename
+                for info in zip_file.infolist()
+                if not info.is_dir() and info.filename.endswith('.json')
+            ]
+        for member in members:
+            yield path, member
+
+
+@functools.lru_cache(maxsize=8)
+def open_zip_file(path: str, modified: int) -> zipfile.ZipFile:
+    """
+    Opens a zip file for reading. The open zip files are cached, so that the
+    members of a zip file are read without parsing its central directory again.
+
+    Args:
+        path (str): Path of the zip file.
+        modified (int): The modification time of the file, e.g. `st_mtime_ns`. It
+        is only part of the cache key, so that changed files are reopened.
+
+    Returns:
+        zipfile.ZipFile: The open zip file.
+    """
+    return zipfile.ZipFile(path)
+
+
+def _open_json_input(json_input: JsonInput):
+    path, member = json_input
+    if member is None:
+        return open(path, 'rb')
+    return open_zip_file(path, os.stat(path).st_mtime_ns).open(member)
+
+
+def _archive_name(
+    json_input: JsonInput,
+    same_dir_as_input: bool,
+    archive_format: str,
+    base_dir: Optional[str] = None,
+) -> str:
+    path, member = json_input
+    if member is None and base_dir is not None:
+        return get_archive_path(os.path.relpath(path, base_dir), True, archive_format)
+    if member is None:
+        return get_archive_path(path, same_dir_as_input, archive_format)
+    archive_path = get_archive_path(member, True, archive_format)
+    if same_dir_as_input:
+        return os.path.join(os.path.dirname(path), archive_path)
+    return archive_path
+
+
+def convert_json_input(
+    json_input: JsonInput,
+    same_dir_as_input: bool = False,
+    nested: bool = False,
+    archive_format: str = 'yaml',
+    base_dir: Optional[str] = None,
+) -> list[tuple[str, str]]:
+    """
+    Converts a JSON input into serialized archives.
+
+    Args:
+        json_input (JsonInput): The JSON input.
+        same_dir_as_input (bool): If True, the archive names include the directory
+        of the input file.
+        nested (bool): If True, the input contains the nested multi-reaction LLM
+        output.
+        archive_format (str): The archive format, `yaml` or `json`.
+        base_dir (str): If given, the archives of plain JSON files are named by the
+        path of the file relative to this directory.
+
+    Returns:
+        list[tuple[str, str]]: The `(name, content)` of the archives.
+    """
+    archive_name = _archive_name(
+        json_input, same_dir_as_input, archive_format, base_dir
+    )
+    if not nested:
+        with profile_stage('json_parse'), _open_json_input(json_input) as f:
+            file_dict = json.load(f)
+        entry = build_archive_entry(file_dict)
+        with profile_stage('serialization'):
+            return [(archive_name, dump_archive(entry, archive_format))]
+
+    archive_suffix = f'.archive.{archive_format}'
+    archive_prefix = archive_name.removesuffix(archive_suffix)
+    entries = iter_archives_from_nested_json(
+        json_input[1] or json_input[0],
+        functools.partial(_open_json_input, json_input),
+    )
+    archives = []
+    for iterator, entry in enumerate(entries, start=1):
+        with profile_stage('serialization'):
+            content = dump_archive(entry, archive_format)
+        archives.append(
+            (f'{archive_prefix}_reaction_{iterator}{archive_suffix}', content)
+        )
+    return archives
+
+
+def _convert_json_inputs_task(
+    json_inputs: list[JsonInput], **kwargs
+) -> list[tuple[JsonInput, list[tuple[str, str]], Optional[str]]]:
+    results = []
+    for json_input in json_inputs:
+        try:
+            archives = convert_json_input(json_input, **kwargs)
+            count('archives', len(archives))
+            results.append((json_input, archives, None))
+        except Exception as e:
+            count('failures')
+            results.append((json_input, [], f'{type(e).__name__}: {e}'))
+    return results
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[list]:
+    """
+    Lazily splits an iterable into lists of `size` items, the last one possibly
+    shorter.
+    """
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate_archives_from_inputs(  # noqa: PLR0913, PLR0917
+    paths: Iterable[str],
+    writer,
+    same_dir_as_input: bool = False,
+    jobs: int = 1,
+    nested: bool = False,
+    archive_format: str = 'yaml',
+    batch_size: int = 64,
+    base_dir: Optional[str] = None,
+    logger: 'BoundLogger' = None,
+) -> list[tuple[str, Optional[str]]]:
+    """
+    Generates archives from JSON files and zip files of JSON files and hands them
+    to a writer, e.g. a `ZipBundleWriter`. Zip members are read without extracting
+    them and a failing input does not stop the conversion of the remaining ones.
+
+    With `jobs > 1`, batches of `batch_size` inputs are converted by a pool of worker
+    processes. At most `2 * jobs` batches are in flight and the archives are passed
+    to the writer in input order, so memory stays bounded and the output does not
+    depend on the number of workers.
+
+    Args:
+        paths (Iterable[str]): Paths of JSON or zip files.
+        writer: The writer receiving the archives through `add(name, content)`.
+        same_dir_as_input (bool): If True, the archive names include the directory
+        of the input file.
+        jobs (int): Number of worker processes.
+        nested (bool): If True, the inputs contain the nested multi-reaction LLM
+        output.
+        archive_format (str): The archive format, `yaml` or `json`.
+        batch_size (int): Number of inputs converted per worker task.
+        base_dir (str): If given, the archives of plain JSON files are named by the
+        path of the file relative to this directory, so that files with the same
+        name in different subdirectories do not collide in a bundle.
+        logger (BoundLogger): A structlog logger.
+
+    Returns:
+        list[tuple[str, Optional[str]]]: One `(input, error)` pair per JSON input,
+        in input order. Zip members are reported as `<zip path>/<member>`.
+    """
+    task = functools.partial(
+        _convert_json_inputs_task,
+        same_dir_as_input=same_dir_as_input,
+        nested=nested,
+        archive_format=archive_format,
+        base_dir=base_dir,
+    )
+    batches = batched(iter_json_inputs(paths), batch_size)
+    results = []
+    for batch_results in map_ordered(task, batches, jobs):
+        for (path, member), archives, task_error in batch_results:
+            name = path if member is None else f'{path}/{member}'
+            error = task_error
+            for archive_name, content in archives:
+                try:
+                    with profile_stage('file_write'):
+                        writer.add(archive_name, content)
+                except ValueError as e:
+                    # e.g. a member name of another zip file in the same bundle
+                    error = error or f'{type(e).__name__}: {e}'
+            if error is not None and logger is not None:
+                logger.warning('Archive creation failed.', input=name, error=error)
+            results.append((name, error))
+    return results
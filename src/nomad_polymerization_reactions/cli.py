@@ -1,6 +1,21 @@
+import contextlib
+import time
+import zipfile
+
 import click
 
-from nomad_polymerization_reactions.utils import generate_archive_from_json
+# Only the option choices are imported eagerly. The commands import their modules,
+# NOMAD and the other heavy dependencies when they run, which keeps `--help` and
+# argument validation fast. `tests/test_cli.py` enforces the startup budget.
+from nomad_polymerization_reactions.dedup import DUPLICATE_POLICIES
+from nomad_polymerization_reactions.export import TABLE_FORMATS
+from nomad_polymerization_reactions.utils import ARCHIVE_FORMATS
+
+
+def _get_logger():
+    from nomad import utils as nomad_utils  # noqa: PLC0415
+
+    return nomad_utils.get_logger(__name__)
 
 
 @click.group(
@@ -15,7 +30,11 @@ def cli():
 
 
 @cli.command(
-    help='Create an archive from a JSON file containing polymerization reaction data.',
+    help="""
+    Create an archive from a JSON file containing polymerization reaction data.
+    JSON_FILE_PATH can also point to zip files, whose JSON members are converted
+    without extracting them.
+    """,
     name='create-archive',
 )
 @click.argument(
@@ -30,10 +49,1024 @@ def cli():
     default=False,
     help='Create the archive in the same directory as the input JSON file.',
 )
-def _create_archive(json_file_path, same_dir_as_input):
-    try:
-        for file_path in json_file_path:
-            generate_archive_from_json(file_path, same_dir_as_input)
+@click.option(
+    '--jobs',
+    '-j',
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help='Number of worker processes used to convert the JSON files in parallel.',
+)
+@click.option(
+    '--nested',
+    is_flag=True,
+    default=False,
+    help=(
+        'The JSON files contain the nested multi-reaction LLM output. One archive '
+        'is created per reaction and reaction condition pair.'
+    ),
+)
+@click.option(
+    '--format',
+    'archive_format',
+    type=click.Choice(ARCHIVE_FORMATS),
+    default='yaml',
+    show_default=True,
+    help='Format of the created archive files.',
+)
+@click.option(
+    '--output-zip',
+    type=click.Path(dir_okay=False),
+    default=None,
+    help=(
+        'Write the archives into zip bundles named <OUTPUT_ZIP>_<n>.zip instead of '
+        'individual files.'
+    ),
+)
+@click.option(
+    '--max-entries-per-zip',
+    type=click.IntRange(min=1),
+    default=None,
+    help='Maximum number of archives per zip bundle.',
+)
+@click.option(
+    '--max-bytes-per-zip',
+    type=click.IntRange(min=1),
+    default=None,
+    help='Maximum size of a zip bundle in bytes.',
+)
+@click.option(
+    '--manifest',
+    type=click.Path(dir_okay=False),
+    default=None,
+    help=(
+        'Convert incrementally: skip the files whose content and converter did not '
+        'change since the conversion recorded in this manifest file, and update it.'
+    ),
+)
+@click.option(
+    '--prune-orphans',
+    is_flag=True,
+    default=False,
+    help=(
+        'Delete the archives in the manifest whose input file no longer exists or '
+        'no longer generates them.'
+    ),
+)
+@click.option(
+    '--profile',
+    is_flag=True,
+    default=False,
+    help=(
+        'Report the time spent in each conversion stage and the number of '
+        'converted records, skipped fields and failures.'
+    ),
+)
+@click.option(
+    '--duplicates',
+    type=click.Choice(DUPLICATE_POLICIES),
+    default=None,
+    help=(
+        'Detect reactions with the same monomers, temperature, method and solvent '
+        'across all files and keep, skip or merge the duplicates. The files are '
+        'converted in a single process.'
+    ),
+)
+@click.option(
+    '--duplicates-report',
+    type=click.Path(dir_okay=False),
+    default=None,
+    help='Write the duplicate clusters into this JSON file. Requires --duplicates.',
+)
+@click.option(
+    '--temperature-decimals',
+    type=int,
+    default=0,
+    show_default=True,
+    help=(
+        'Number of decimals the temperatures in K are rounded to when detecting '
+        'duplicates. Requires --duplicates.'
+    ),
+)
+@click.option(
+    '--pipeline',
+    is_flag=True,
+    default=False,
+    help=(
+        'Read, convert and write the files in overlapping stages joined by bounded '
+        'queues and report the throughput. With --jobs, the conversions run in '
+        'worker processes.'
+    ),
+)
+@click.option(
+    '--queue-size',
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help=(
+        'Maximum number of files, or records of nested files, waiting between two '
+        'stages of --pipeline.'
+    ),
+)
+@click.option(
+    '--validate',
+    is_flag=True,
+    default=False,
+    help=(
+        'Validate all records before the conversion and only convert the files '
+        'without issues. Nested files with an invalid record are skipped entirely.'
+    ),
+)
+@click.option(
+    '--validation-report',
+    type=click.Path(dir_okay=False),
+    default=None,
+    help='Write the validation issues into this JSON file. Requires --validate.',
+)
+def _create_archive(  # noqa: PLR0912, PLR0913, PLR0915, PLR0917
+    json_file_path,
+    same_dir_as_input,
+    jobs,
+    nested,
+    archive_format,
+    output_zip,
+    max_entries_per_zip,
+    max_bytes_per_zip,
+    manifest,
+    prune_orphans,
+    profile,
+    duplicates,
+    duplicates_report,
+    temperature_decimals,
+    pipeline,
+    queue_size,
+    validate,
+    validation_report,
+):
+    if output_zip is not None and same_dir_as_input:
+        raise click.UsageError(
+            '--same-dir-as-input can not be combined with --output-zip.'
+        )
+    zip_inputs = any(map(zipfile.is_zipfile, json_file_path))
+    if manifest is not None and (output_zip is not None or zip_inputs):
+        raise click.UsageError(
+            '--manifest only supports JSON files converted into individual archives.'
+        )
+    if prune_orphans and manifest is None:
+        raise click.UsageError('--prune-orphans requires --manifest.')
+    if duplicates is not None and (
+        manifest is not None or output_zip is not None or zip_inputs
+    ):
+        raise click.UsageError(
+            '--duplicates only supports JSON files converted into individual '
+            'archives without --manifest.'
+        )
+    if duplicates_report is not None and duplicates is None:
+        raise click.UsageError('--duplicates-report requires --duplicates.')
+    if temperature_decimals != 0 and duplicates is None:
+        raise click.UsageError('--temperature-decimals requires --duplicates.')
+    if validate and zip_inputs:
+        raise click.UsageError('--validate only supports JSON files.')
+    if validation_report is not None and not validate:
+        raise click.UsageError('--validation-report requires --validate.')
+    if pipeline and (
+        manifest is not None
+        or duplicates is not None
+        or output_zip is not None
+        or zip_inputs
+    ):
+        raise click.UsageError(
+            '--pipeline only supports JSON files converted into individual archives '
+            'without --manifest or --duplicates.'
+        )
+
+    from nomad_polymerization_reactions.bundles import (  # noqa: PLC0415
+        DirectoryWriter,
+        ZipBundleWriter,
+        generate_archives_from_inputs,
+    )
+    from nomad_polymerization_reactions.dedup import (  # noqa: PLC0415
+        generate_archives_deduplicated,
+        write_duplicate_report,
+    )
+    from nomad_polymerization_reactions.manifest import (  # noqa: PLC0415
+        generate_archives_incrementally,
+    )
+    from nomad_polymerization_reactions.pipeline import (  # noqa: PLC0415
+        generate_archives_pipelined,
+    )
+    from nomad_polymerization_reactions.profiling import profiling  # noqa: PLC0415
+    from nomad_polymerization_reactions.utils import (  # noqa: PLC0415
+        generate_archives_from_json,
+    )
+    from nomad_polymerization_reactions.validation import (  # noqa: PLC0415
+        validate_files,
+        write_validation_report,
+    )
+
+    validation = None
+    if validate:
+        validation = validate_files(json_file_path, nested)
+        input_paths = json_file_path
+        json_file_path = [
+            path for path in json_file_path if path not in validation.invalid_files
+        ]
+        click.echo(
+            f'Validated {validation.records} record(s): {len(validation.issues)} '
+            f'issue(s) in {len(validation.invalid_files)} file(s).'
+        )
+        if validation_report is not None:
+            write_validation_report(validation, validation_report)
+
+    conversion = None
+    deduplication = None
+    pipeline_report = None
+    start = time.perf_counter()
+    with profiling() if profile else contextlib.nullcontext() as profiler:
+        if manifest is not None:
+            conversion = generate_archives_incrementally(
+                json_file_path,
+                manifest,
+                same_dir_as_input,
+                jobs,
+                nested,
+                archive_format,
+                prune_orphans=prune_orphans,
+            )
+            results = conversion.results
+            click.echo(f'Skipped {len(conversion.skipped)} unchanged file(s).')
+        elif duplicates is not None:
+            deduplication = generate_archives_deduplicated(
+                json_file_path,
+                same_dir_as_input,
+                nested,
+                archive_format,
+                policy=duplicates,
+                temperature_decimals=temperature_decimals,
+            )
+            results = deduplication.results
+        elif pipeline:
+            pipeline_report = generate_archives_pipelined(
+                json_file_path,
+                same_dir_as_input,
+                jobs,
+                nested,
+                archive_format,
+                queue_size=queue_size,
+            )
+            results = pipeline_report.results
+        elif output_zip is None and not zip_inputs:
+            results = generate_archives_from_json(
+                json_file_path,
+                same_dir_as_input,
+                jobs,
+                nested,
+                archive_format=archive_format,
+            )
+        else:
+            if output_zip is None:
+                writer = DirectoryWriter()
+            else:
+                writer = ZipBundleWriter(
+                    output_zip.removesuffix('.zip'),
+                    max_entries=max_entries_per_zip,
+                    max_bytes=max_bytes_per_zip,
+                )
+            with writer:
+                results = generate_archives_from_inputs(
+                    json_file_path,
+                    writer,
+                    same_dir_as_input=same_dir_as_input,
+                    jobs=jobs,
+                    nested=nested,
+                    archive_format=archive_format,
+                )
+            if output_zip is not None:
+                click.echo(f'Created {len(writer.paths)} zip bundle(s):')
+                for path in writer.paths:
+                    click.echo(f'  {path}')
+    elapsed = time.perf_counter() - start
+
+    if validation is not None:
+        # the invalid files are reported with their first issue in input order,
+        # the files skipped by --manifest are not reported like without --validate
+        outcomes = dict(results)
+        for issue in reversed(validation.issues):
+            field = '' if issue.field is None else f'{issue.field}: '
+            outcomes[issue.file] = f'Invalid {field}{issue.reason}'
+        results = [(path, outcomes[path]) for path in input_paths if path in outcomes]
+
+    failed = []
+    for file_path, error in results:
+        if error is None:
             click.echo('Archive created successfully.')
-    except Exception as e:
-        click.echo(f'Archive creation failed. Error: {e}')
+        else:
+            click.echo(f'Archive creation failed for {file_path}. Error: {error}')
+            failed.append(file_path)
+
+    click.echo(
+        f'\nSummary: {len(results) - len(failed)} succeeded, {len(failed)} failed.'
+    )
+    for file_path, error in results:
+        click.echo(f'  {"OK" if error is None else "FAILED":<6} {file_path}')
+
+    if conversion is not None and conversion.orphaned_outputs:
+        action = 'Deleted' if prune_orphans else 'Found'
+        click.echo(
+            f'\n{action} {len(conversion.orphaned_outputs)} orphaned archive(s):'
+        )
+        for path in conversion.orphaned_outputs:
+            click.echo(f'  {path}')
+
+    if deduplication is not None:
+        _echo_duplicate_clusters(deduplication.clusters)
+        if duplicates != 'keep':
+            action = 'Skipped' if duplicates == 'skip' else 'Merged'
+            click.echo(f'{action} {len(deduplication.skipped)} duplicate archive(s).')
+        if duplicates_report is not None:
+            write_duplicate_report(deduplication.clusters, duplicates_report)
+
+    if pipeline_report is not None:
+        click.echo('\nPipeline throughput:')
+        click.echo(pipeline_report.report())
+
+    if profiler is not None:
+        profiler.log(_get_logger(), 'Archive creation profile.', elapsed)
+        click.echo(f'\nProfile ({elapsed:.3f} s in total):')
+        click.echo(profiler.report())
+
+
+def _echo_duplicate_clusters(clusters):
+    click.echo(f'\nFound {len(clusters)} duplicate cluster(s):')
+    for cluster in clusters:
+        click.echo(f'  {" + ".join(cluster.key[0])}:')
+        for member in cluster.members:
+            click.echo(f'    {member}')
+
+
+@cli.command(
+    help="""
+    Find duplicate reactions, i.e. reactions with the same monomers, temperature,
+    method and solvent, in LLM output JSON files or generated archive files.
+    """,
+    name='find-duplicates',
+)
+@click.argument(
+    'FILE_PATH',
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+)
+@click.option(
+    '--nested',
+    is_flag=True,
+    default=False,
+    help='The JSON files contain the nested multi-reaction LLM output.',
+)
+@click.option(
+    '--temperature-decimals',
+    type=int,
+    default=0,
+    show_default=True,
+    help='Number of decimals the temperatures in K are rounded to.',
+)
+@click.option(
+    '--output',
+    type=click.Path(dir_okay=False),
+    default=None,
+    help='Write the duplicate clusters into this JSON file.',
+)
+def _find_duplicates(file_path, nested, temperature_decimals, output):
+    from nomad_polymerization_reactions.dedup import (  # noqa: PLC0415
+        find_duplicates,
+        iter_identified_entries,
+        write_duplicate_report,
+    )
+
+    clusters = find_duplicates(
+        iter_identified_entries(file_path, nested), temperature_decimals
+    )
+    _echo_duplicate_clusters(clusters)
+    if output is not None:
+        write_duplicate_report(clusters, output)
+
+
+@cli.command(
+    help="""
+    Validate the records of LLM output JSON files: the field types, the temperature
+    units, the SMILES syntax and the numbering of the monomers and reaction
+    constants. Exits with status 1 if an issue was found.
+    """,
+    name='validate',
+)
+@click.argument(
+    'JSON_FILE_PATH',
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+)
+@click.option(
+    '--nested',
+    is_flag=True,
+    default=False,
+    help='The JSON files contain the nested multi-reaction LLM output.',
+)
+@click.option(
+    '--output',
+    type=click.Path(dir_okay=False),
+    default=None,
+    help='Write the validation report into this JSON file.',
+)
+def _validate(json_file_path, nested, output):
+    from nomad_polymerization_reactions.validation import (  # noqa: PLC0415
+        validate_files,
+        write_validation_report,
+    )
+
+    report = validate_files(json_file_path, nested)
+    for issue in report.issues:
+        record = '' if issue.record is None else f'#{issue.record}'
+        field = '' if issue.field is None else f' {issue.field}:'
+        click.echo(f'{issue.file}{record}:{field} {issue.reason}')
+    click.echo(
+        f'Validated {report.records} record(s): {len(report.issues)} issue(s) in '
+        f'{len(report.invalid_files)} file(s).'
+    )
+    if output is not None:
+        write_validation_report(report, output)
+    if report.issues:
+        raise SystemExit(1)
+
+
+@cli.command(
+    help="""
+    Resolve the monomers and solvents of several archive files with PubChem in
+    parallel and store them in the substance cache used during normalization.
+    The cache is a local SQLite file, by default in the NOMAD tmp directory, so it
+    only speeds up normalization that runs in the same environment or is
+    configured with the same substance_cache_path. With --write-archives, the
+    resolved substances are written into the archives instead, so that their
+    normalization anywhere, e.g. of uploads on a NOMAD server, does not look them
+    up. Archives which can not be read are reported and skipped.
+    """,
+    name='resolve-substances',
+)
+@click.argument(
+    'ARCHIVE_FILE_PATH',
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True),
+)
+@click.option(
+    '--jobs',
+    '-j',
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help='Maximum number of concurrent PubChem lookups.',
+)
+@click.option(
+    '--write-archives',
+    is_flag=True,
+    default=False,
+    help=(
+        'Write the resolved monomers and solvents into the archive files, which '
+        'are overwritten.'
+    ),
+)
+def _resolve_substances(archive_file_path, jobs, write_archives):
+    from nomad_polymerization_reactions.substances import (  # noqa: PLC0415
+        collect_substance_names,
+        embed_substances,
+        resolve_substances,
+    )
+    from nomad_polymerization_reactions.utils import (  # noqa: PLC0415
+        read_archive,
+        write_archive,
+    )
+
+    entries = dict()
+    unreadable = []
+    for path in archive_file_path:
+        try:
+            entries[path] = read_archive(path)
+        except Exception as e:
+            unreadable.append((path, f'{type(e).__name__}: {e}'))
+    names = collect_substance_names(entries.values())
+    resolved = resolve_substances(names, _get_logger(), max_workers=jobs)
+    found = sum(data is not None for data in resolved.values())
+    click.echo(
+        f'Resolved {len(names)} substances: {found} found, '
+        f'{len(resolved) - found} not found, {len(names) - len(resolved)} failed.'
+    )
+    if write_archives:
+        written = 0
+        for path, entry in entries.items():
+            if embed_substances(entry, resolved):
+                write_archive(entry, path)
+                written += 1
+        click.echo(f'Wrote the resolved substances into {written} archive(s).')
+    if unreadable:
+        click.echo(f'Skipped {len(unreadable)} unreadable archive(s):')
+        for path, error in unreadable:
+            click.echo(f'  {path}: {error}')
+
+
+@cli.command(
+    help="""
+    Export LLM output JSON files or generated archive files into a reaction table
+    and a monomer table for analytics. The tables are written as reactions.<ext>
+    and monomers.<ext> into OUTPUT_DIR and can be joined on their reaction_id.
+    Requires pyarrow.
+    """,
+    name='export-tables',
+)
+@click.argument(
+    'FILE_PATH',
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+)
+@click.option(
+    '--output-dir',
+    type=click.Path(file_okay=False),
+    default='.',
+    show_default=True,
+    help='Directory receiving the tables.',
+)
+@click.option(
+    '--format',
+    'table_format',
+    type=click.Choice(TABLE_FORMATS),
+    default='parquet',
+    show_default=True,
+    help='Format of the tables. arrow writes the Arrow IPC stream format.',
+)
+@click.option(
+    '--nested',
+    is_flag=True,
+    default=False,
+    help='The JSON files contain the nested multi-reaction LLM output.',
+)
+@click.option(
+    '--batch-size',
+    type=click.IntRange(min=1),
+    default=65536,
+    show_default=True,
+    help='Number of rows per record batch or Parquet row group.',
+)
+def _export_tables(file_path, output_dir, table_format, nested, batch_size):
+    from nomad_polymerization_reactions.export import export_tables  # noqa: PLC0415
+
+    try:
+        tables = export_tables(
+            file_path,
+            output_dir,
+            table_format,
+            nested,
+            batch_size,
+            logger=_get_logger(),
+        )
+    except ImportError as e:
+        raise click.ClickException(str(e)) from e
+    for path, rows in tables.values():
+        click.echo(f'Wrote {rows} rows to {path}.')
+
+
+@cli.command(
+    help="""
+    Index JSONL corpora with one LLM output record per line. The byte offsets of
+    the records and their numbers per paper id (file) and DOI (source) are written
+    into a sidecar file <CORPUS_PATH>.idx, which convert-jsonl uses to read
+    records without scanning the corpus.
+    """,
+    name='index-jsonl',
+)
+@click.argument(
+    'CORPUS_PATH',
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+)
+def _index_jsonl(corpus_path):
+    from nomad_polymerization_reactions.corpus import (  # noqa: PLC0415
+        build_index,
+        get_index_path,
+    )
+
+    for path in corpus_path:
+        index = build_index(path)
+        index_path = get_index_path(path)
+        index.write(index_path)
+        click.echo(
+            f'Indexed {len(index)} records of {len(index.keys["file"])} papers '
+            f'in {path} into {index_path}.'
+        )
+
+
+@cli.command(
+    help="""
+    Create archives from the records of a JSONL corpus, see index-jsonl. The corpus
+    is indexed first if its index is missing or out of date. The archives are
+    named <corpus name>_reaction_<n>.archive.<format>, counting the records from 1.
+    """,
+    name='convert-jsonl',
+)
+@click.argument(
+    'CORPUS_PATH',
+    type=click.Path(exists=True, dir_okay=False),
+)
+@click.option(
+    '--file',
+    'paper_ids',
+    multiple=True,
+    help='Only convert the records of this paper id. Can be given multiple times.',
+)
+@click.option(
+    '--source',
+    'sources',
+    multiple=True,
+    help='Only convert the records of this DOI. Can be given multiple times.',
+)
+@click.option(
+    '--jobs',
+    '-j',
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help='Number of worker processes converting chunks of the corpus in parallel.',
+)
+@click.option(
+    '--format',
+    'archive_format',
+    type=click.Choice(ARCHIVE_FORMATS),
+    default='yaml',
+    show_default=True,
+    help='Format of the generated archive files.',
+)
+@click.option(
+    '--output-dir',
+    type=click.Path(file_okay=False),
+    default='.',
+    show_default=True,
+    help='Directory receiving the archives.',
+)
+def _convert_jsonl(  # noqa: PLR0913, PLR0917
+    corpus_path, paper_ids, sources, jobs, archive_format, output_dir
+):
+    from nomad_polymerization_reactions.bundles import (  # noqa: PLC0415
+        DirectoryWriter,
+    )
+    from nomad_polymerization_reactions.corpus import (  # noqa: PLC0415
+        convert_corpus,
+        load_index,
+    )
+
+    index = load_index(corpus_path)
+    numbers = None
+    if paper_ids or sources:
+        numbers = [
+            number
+            for key, values in (('file', paper_ids), ('source', sources))
+            for value in values
+            for number in index.lookup(value, key)
+        ]
+    with DirectoryWriter(output_dir) as writer:
+        results = convert_corpus(
+            corpus_path,
+            writer,
+            numbers,
+            jobs,
+            archive_format,
+            index=index,
+            logger=_get_logger(),
+        )
+    failed = [number for number, error in results if error is not None]
+    click.echo(
+        f'Created {len(results) - len(failed)} archives from {len(results)} '
+        f'records of {corpus_path}.'
+    )
+    if failed:
+        click.echo(f'Failed records: {", ".join(str(n + 1) for n in failed)}')
+
+
+@cli.command(
+    help="""
+    Watch DIRECTORY for new and changed JSON files and convert them in
+    micro-batches into upload-ready zip bundles in OUTPUT_DIR. A batch is converted
+    once it holds --max-batch-size files or its first file waited --max-batch-wait
+    seconds. Bundles only appear in OUTPUT_DIR once they are complete. Without
+    --manifest, the files already in DIRECTORY are converted on start. Runs until
+    interrupted.
+    """,
+    name='watch',
+)
+@click.argument(
+    'DIRECTORY',
+    type=click.Path(exists=True, file_okay=False),
+)
+@click.argument(
+    'OUTPUT_DIR',
+    type=click.Path(file_okay=False),
+)
+@click.option(
+    '--pattern',
+    default='*.json',
+    show_default=True,
+    help='Glob pattern of the watched file names.',
+)
+@click.option(
+    '--recursive',
+    is_flag=True,
+    default=False,
+    help=(
+        'Also watch the subdirectories of DIRECTORY. The archives are named by the '
+        'path of their file relative to DIRECTORY.'
+    ),
+)
+@click.option(
+    '--nested',
+    is_flag=True,
+    default=False,
+    help='The JSON files contain the nested multi-reaction LLM output.',
+)
+@click.option(
+    '--format',
+    'archive_format',
+    type=click.Choice(ARCHIVE_FORMATS),
+    default='yaml',
+    show_default=True,
+    help='Format of the generated archive files.',
+)
+@click.option(
+    '--poll-interval',
+    type=click.FloatRange(min=0),
+    default=1.0,
+    show_default=True,
+    help='Seconds between two scans of DIRECTORY.',
+)
+@click.option(
+    '--max-batch-size',
+    type=click.IntRange(min=1),
+    default=100,
+    show_default=True,
+    help='Maximum number of files converted in one batch.',
+)
+@click.option(
+    '--max-batch-wait',
+    type=click.FloatRange(min=0),
+    default=5.0,
+    show_default=True,
+    help='Maximum seconds a new file waits for its batch to be converted.',
+)
+@click.option(
+    '--max-entries-per-zip',
+    type=click.IntRange(min=1),
+    default=None,
+    help='Maximum number of archives per zip bundle.',
+)
+@click.option(
+    '--max-bytes-per-zip',
+    type=click.IntRange(min=1),
+    default=None,
+    help='Maximum size of a zip bundle in bytes.',
+)
+@click.option(
+    '--jobs',
+    '-j',
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help='Number of worker processes converting a batch.',
+)
+@click.option(
+    '--manifest',
+    type=click.Path(dir_okay=False),
+    default=None,
+    help='Record the converted files in this manifest and skip the files which '
+    'did not change since they were converted when restarted.',
+)
+@click.option(
+    '--max-batches',
+    type=click.IntRange(min=1),
+    default=None,
+    help='Stop after converting this many batches.',
+)
+def _watch(  # noqa: PLR0913, PLR0917
+    directory,
+    output_dir,
+    pattern,
+    recursive,
+    nested,
+    archive_format,
+    poll_interval,
+    max_batch_size,
+    max_batch_wait,
+    max_entries_per_zip,
+    max_bytes_per_zip,
+    jobs,
+    manifest,
+    max_batches,
+):
+    from nomad_polymerization_reactions.watch import watch  # noqa: PLC0415
+
+    def echo_batch(batch):
+        failed = [path for path, error in batch.results if error is not None]
+        click.echo(
+            f'{batch.name}: converted {len(batch.results) - len(failed)} of '
+            f'{len(batch.results)} file(s) into {len(batch.bundles)} bundle(s) '
+            f'in {batch.elapsed:.2f} s.'
+        )
+        for path, error in batch.results:
+            if error is not None:
+                click.echo(f'  Archive creation failed for {path}. Error: {error}')
+
+    click.echo(f'Watching {directory} for {pattern} files.')
+    try:
+        watch(
+            directory,
+            output_dir,
+            nested,
+            archive_format,
+            pattern,
+            recursive,
+            poll_interval,
+            max_batch_size,
+            max_batch_wait,
+            max_entries_per_zip,
+            max_bytes_per_zip,
+            jobs,
+            manifest,
+            max_batches,
+            on_batch=echo_batch,
+            logger=_get_logger(),
+        )
+    except KeyboardInterrupt:
+        click.echo('Stopped watching.')
+
+
+@cli.command(
+    help="""
+    Build a fingerprint index of the monomer SMILES of LLM output JSON files or
+    generated archive files for search-monomers. Every distinct SMILES is parsed
+    once and its hashed path fingerprint stored in a NumPy .npz file.
+    """,
+    name='index-monomers',
+)
+@click.argument(
+    'FILE_PATH',
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+)
+@click.option(
+    '--output',
+    type=click.Path(dir_okay=False),
+    default='monomers.npz',
+    show_default=True,
+    help='Path of the index file.',
+)
+@click.option(
+    '--nested',
+    is_flag=True,
+    default=False,
+    help='The JSON files contain the nested multi-reaction LLM output.',
+)
+@click.option(
+    '--bits',
+    type=click.IntRange(min=64),
+    default=1024,
+    show_default=True,
+    help='Number of bits of the fingerprints, a multiple of 64.',
+)
+def _index_monomers(file_path, output, nested, bits):
+    from nomad_polymerization_reactions.fingerprints import (  # noqa: PLC0415
+        build_fingerprint_index,
+    )
+
+    if bits % 64:
+        raise click.BadParameter('must be a multiple of 64.', param_hint='--bits')
+    build = build_fingerprint_index(file_path, nested, bits)
+    build.index.save(output)
+    click.echo(
+        f'Indexed {len(build.index)} distinct monomers of {build.entries} '
+        f'reaction(s) into {output}.'
+    )
+    for smiles in build.invalid_smiles:
+        click.echo(f'  Skipped invalid SMILES {smiles}')
+
+
+@cli.command(
+    help="""
+    Search the monomers of a fingerprint index built by index-monomers for monomers
+    similar to the SMILES QUERY, or with --substructure for monomers which may
+    contain it. Substructure matches are candidates: not every match contains
+    QUERY. Aromatic rings are only matched if QUERY writes them like the indexed
+    SMILES, either aromatic (c1ccccc1) or in the Kekulé form (C1=CC=CC=C1).
+    """,
+    name='search-monomers',
+)
+@click.argument(
+    'INDEX_PATH',
+    type=click.Path(exists=True, dir_okay=False),
+)
+@click.argument('QUERY')
+@click.option(
+    '--substructure',
+    is_flag=True,
+    default=False,
+    help='Find the monomers which may contain QUERY instead of similar ones.',
+)
+@click.option(
+    '--threshold',
+    type=click.FloatRange(min=0, max=1),
+    default=0.7,
+    show_default=True,
+    help='Minimum Tanimoto similarity of similar monomers.',
+)
+@click.option(
+    '--limit',
+    type=click.IntRange(min=1),
+    default=20,
+    show_default=True,
+    help='Maximum number of monomers shown.',
+)
+def _search_monomers(index_path, query, substructure, threshold, limit):
+    from nomad_polymerization_reactions.fingerprints import (  # noqa: PLC0415
+        FingerprintIndex,
+    )
+
+    index = FingerprintIndex.load(index_path)
+    start = time.perf_counter()
+    try:
+        if substructure:
+            matches = index.substructure(query)
+        else:
+            matches = index.similar(query, threshold)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='QUERY') from e
+    elapsed = time.perf_counter() - start
+    click.echo(
+        f'Found {len(matches)} of {len(index)} monomers in {elapsed * 1000:.1f} ms.'
+    )
+    for match in matches[:limit]:
+        click.echo(
+            f'  {match.similarity:.3f} {match.smiles} ({match.name or "unnamed"}, '
+            f'{len(match.entries)} reaction(s))'
+        )
+        for entry in match.entries:
+            click.echo(f'    {entry}')
+
+
+@cli.command(
+    help="""
+    Export archive files back into reaction records in the flat LLM output format,
+    e.g. after curating them in NOMAD, and write them into a JSONL file with one
+    record per line. Zip files, e.g. downloaded uploads, are read without
+    extracting them and directories are searched for archive and zip files. The
+    records can be converted again with create-archive or convert-jsonl.
+    """,
+    name='export-flat',
+)
+@click.argument(
+    'FILE_PATH',
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True),
+)
+@click.option(
+    '--output',
+    type=click.Path(dir_okay=False),
+    default='records.jsonl',
+    show_default=True,
+    help='Path of the JSONL file.',
+)
+@click.option(
+    '--jobs',
+    '-j',
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help='Number of worker processes reading the archives in parallel.',
+)
+@click.option(
+    '--batch-size',
+    type=click.IntRange(min=1),
+    default=256,
+    show_default=True,
+    help='Number of archives read per worker task.',
+)
+def _export_flat(file_path, output, jobs, batch_size):
+    from nomad_polymerization_reactions.flat_export import (  # noqa: PLC0415
+        export_flat_records,
+    )
+
+    results = export_flat_records(
+        file_path, output, jobs, batch_size, logger=_get_logger()
+    )
+    failed = [name for name, error in results if error is not None]
+    click.echo(
+        f'Exported {len(results) - len(failed)} of {len(results)} archives to {output}.'
+    )
+    for name in failed:
+        click.echo(f'  Failed: {name}')
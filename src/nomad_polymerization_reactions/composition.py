@@ -0,0 +1,94 @@
+import collections
+import threading
+from collections.abc import Iterable
+from typing import Optional
+
+# The cached elemental composition of a polymer: one `(element, atomic_fraction,
+# mass_fraction)` tuple per `ElementalComposition` section, in order.
+Composition = tuple[tuple[Optional[str], Optional[float], Optional[float]], ...]
+
+
+def composition_key(components: Iterable) -> Optional[tuple]:
+    """
+    Builds the key of the elemental composition of a composite system from its
+    components: for every component in order, the PubChem CID of its substance or
+    else its SMILES or name, the molecular formula the composition is computed
+    from, and the mass and mass fraction. Including the formula ensures that a
+    monomer whose substance could not be resolved never reuses the composition of
+    a resolved one.
+
+    Args:
+        components (Iterable): The `PureSubstanceComponent` sections.
+
+    Returns:
+        Optional[tuple]: The key, or None if a component is not a pure substance
+        and the composition hence can not be cached.
+    """
+    key = []
+    for component in components:
+        if not hasattr(component, 'pure_substance'):
+            return None
+        substance = component.pure_substance
+        identifier = None if substance is None else substance.pub_chem_cid
+        if identifier is None:
+            identifier = (
+                getattr(component, 'smiles', None)
+                or getattr(component, 'substance_name', None)
+                or component.name
+            )
+        mass = component.mass
+        if mass is not None:
+            mass = (float(mass.magnitude), str(mass.units))
+        key.append(
+            (
+                identifier,
+                None if substance is None else substance.molecular_formula,
+                mass,
+                component.mass_fraction,
+            )
+        )
+    return tuple(key)
+
+
+class CompositionCache:
+    """
+    A process-wide, size-bounded cache of the elemental compositions computed
+    during the normalization of polymers. The least recently used composition is
+    evicted once `max_entries` compositions are cached.
+
+    Args:
+        max_entries (int): Maximum number of cached compositions.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._compositions = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[Composition]:
+        with self._lock:
+            composition = self._compositions.get(key)
+            if composition is None:
+                self.misses += 1
+                return None
+            self._compositions.move_to_end(key)
+            self.hits += 1
+            return composition
+
+    def put(self, key: tuple, composition: Composition) -> None:
+        with self._lock:
+            self._compositions[key] = composition
+            self._compositions.move_to_end(key)
+            while len(self._compositions) > self.max_entries:
+                self._compositions.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._compositions.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._compositions)
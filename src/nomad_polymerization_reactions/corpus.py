@@ -0,0 +1,424 @@
+import collections
+import functools
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING, Optional
+
+from nomad_polymerization_reactions.profiling import (
+    count,
+    map_ordered,
+    profile_stage,
+)
+from nomad_polymerization_reactions.utils import build_archive_entry, dump_archive
+
+if TYPE_CHECKING:
+    from structlog.stdlib import BoundLogger
+
+# The record fields the records of a corpus are looked up by: the paper id and
+# the DOI.
+INDEX_KEYS = ('file', 'source')
+INDEX_SUFFIX = '.idx'
+
+# The sidecar file starts with a header of the magic bytes, the size and the
+# modification time of the indexed corpus, the number of records and the size of
+# the key table. It is followed by the start and the end offsets of the records
+# as little-endian unsigned 64 bit integers and the zlib compressed JSON key
+# table, which maps every key field and value to the numbers of its records.
+_MAGIC = b'NPRJIDX1'
+_HEADER = struct.Struct('<8sQqQQ')
+_OFFSET_TYPE = 'Q'
+
+
+def get_index_path(corpus_path: str) -> str:
+    """
+    Returns the path of the sidecar index file of a JSONL corpus.
+    """
+    return f'{corpus_path}{INDEX_SUFFIX}'
+
+
+def _little_endian(offsets: array) -> array:
+    if sys.byteorder == 'big':
+        offsets = array(_OFFSET_TYPE, offsets)
+        offsets.byteswap()
+    return offsets
+
+
+class CorpusIndex:
+    """
+    The byte offsets of the records of a JSONL corpus with one reaction record per
+    line, and the numbers of the records per paper id and DOI. Blank lines are not
+    records. Records are numbered from 0 in order of occurrence.
+
+    Args:
+        starts (array): The start offset of every record.
+        ends (array): The end offset of every record.
+        keys (dict[str, dict[str, list[int]]]): The record numbers per key field
+        and value.
+        size (int): The size of the indexed corpus in bytes.
+        mtime_ns (int): The modification time of the indexed corpus.
+    """
+
+    def __init__(
+        self,
+        starts: array,
+        ends: array,
+        keys: dict[str, dict[str, list[int]]],
+        size: int = 0,
+        mtime_ns: int = 0,
+    ):
+        self.starts = starts
+        self.ends = ends
+        self.keys = keys
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def lookup(self, value: str, key: str = 'file') -> list[int]:
+        """
+        Returns the numbers of the records with the given value of a key field,
+        e.g. the records of a paper id (`file`) or a DOI (`source`).
+        """
+        if key not in self.keys:
+            raise KeyError(f'The corpus is not indexed by "{key}".')
+        return self.keys[key].get(value, [])
+
+    def chunks(self, n_chunks: int) -> list[range]:
+        """
+        Splits the records into at most `n_chunks` consecutive ranges of about
+        the same number of bytes.
+        """
+        if not self.starts:
+            return []
+        start = self.starts[0]
+        total = self.ends[-1] - start
+        boundaries = [0]
+        for chunk in range(1, n_chunks):
+            target = start + total * chunk // n_chunks
+            boundary = _bisect(self.starts, target, boundaries[-1])
+            if boundary > boundaries[-1]:
+                boundaries.append(boundary)
+        boundaries.append(len(self.starts))
+        return [
+            range(boundaries[i], boundaries[i + 1])
+            for i in range(len(boundaries) - 1)
+            if boundaries[i] < boundaries[i + 1]
+        ]
+
+    def is_current(self, corpus_path: str) -> bool:
+        """
+        Checks that the corpus was not changed since it was indexed.
+        """
+        stat = os.stat(corpus_path)
+        return (stat.st_size, stat.st_mtime_ns) == (self.size, self.mtime_ns)
+
+    def write(self, path: str) -> None:
+        """
+        Writes the index into a sidecar file.
+        """
+        keys = zlib.compress(json.dumps(self.keys, separators=(',', ':')).encode())
+        with open(path, 'wb') as f:
+            f.write(
+                _HEADER.pack(_MAGIC, self.size, self.mtime_ns, len(self), len(keys))
+            )
+            _little_endian(self.starts).tofile(f)
+            _little_endian(self.ends).tofile(f)
+            f.write(keys)
+
+    @classmethod
+    def read(cls, path: str) -> 'CorpusIndex':
+        """
+        Reads an index from a sidecar file.
+        """
+        with open(path, 'rb') as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size or header[:8] != _MAGIC:
+                raise ValueError(f'"{path}" is not a corpus index.')
+            _, size, mtime_ns, records, keys_size = _HEADER.unpack(header)
+            starts = array(_OFFSET_TYPE)
+            starts.fromfile(f, records)
+            ends = array(_OFFSET_TYPE)
+            ends.fromfile(f, records)
+            keys = json.loads(zlib.decompress(f.read(keys_size)))
+        return cls(_little_endian(starts), _little_endian(ends), keys, size, mtime_ns)
+
+
+def _bisect(starts: array, target: int, low: int) -> int:
+    # the number of the first record starting at or after `target`
+    high = len(starts)
+    while low < high:
+        middle = (low + high) // 2
+        if starts[middle] < target:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def build_index(corpus_path: str, keys: Iterable[str] = INDEX_KEYS) -> CorpusIndex:
+    """
+    Indexes a JSONL corpus in a single scan: the byte offsets of every record and
+    the numbers of the records per value of the `keys` fields.
+
+    Args:
+        corpus_path (str): Path of the JSONL file.
+        keys (Iterable[str]): The record fields to look records up by.
+
+    Returns:
+        CorpusIndex: The index.
+    """
+    keys = tuple(keys)
+    stat = os.stat(corpus_path)
+    starts = array(_OFFSET_TYPE)
+    ends = array(_OFFSET_TYPE)
+    key_table = {key: collections.defaultdict(list) for key in keys}
+    offset = 0
+    with open(corpus_path, 'rb') as f:
+        for line in f:
+            start = offset
+            offset += len(line)
+            if line.isspace():
+                continue
+            if keys:
+                # malformed records are indexed without keys and only fail when
+                # they are converted
+                try:
+                    with profile_stage('json_parse'):
+                        record = json.loads(line)
+                except ValueError:
+                    record = None
+                for key in keys:
+                    value = record.get(key) if isinstance(record, dict) else None
+                    if value is not None:
+                        key_table[key][str(value)].append(len(starts))
+            starts.append(start)
+            ends.append(offset)
+    return CorpusIndex(
+        starts,
+        ends,
+        {key: dict(values) for key, values in key_table.items()},
+        stat.st_size,
+        stat.st_mtime_ns,
+    )
+
+
+def load_index(corpus_path: str, rebuild: bool = False) -> CorpusIndex:
+    """
+    Reads the sidecar index of a JSONL corpus. The corpus is indexed and the
+    sidecar file (re)written if it does not exist, is out of date or `rebuild` is
+    True.
+
+    Args:
+        corpus_path (str): Path of the JSONL file.
+        rebuild (bool): If True, the corpus is always indexed again.
+
+    Returns:
+        CorpusIndex: The index.
+    """
+    index_path = get_index_path(corpus_path)
+    if not rebuild and os.path.exists(index_path):
+        index = CorpusIndex.read(index_path)
+        if index.is_current(corpus_path):
+            return index
+    index = build_index(corpus_path)
+    index.write(index_path)
+    return index
+
+
+class Corpus:
+    """
+    Random access to the records of a memory-mapped JSONL corpus through its
+    sidecar index, see `load_index`.
+
+    Args:
+        corpus_path (str): Path of the JSONL file.
+        index (CorpusIndex): The index of the corpus. Loaded with `load_index` if
+        not given.
+    """
+
+    def __init__(self, corpus_path: str, index: Optional[CorpusIndex] = None):
+        self.path = corpus_path
+        self.index = load_index(corpus_path) if index is None else index
+        self._file = open(corpus_path, 'rb')
+        # empty files can not be memory-mapped
+        self._map = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if os.fstat(self._file.fileno()).st_size
+            else b''
+        )
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def read(self, number: int) -> bytes:
+        """
+        Returns the line of a record without parsing it.
+        """
+        return self._map[self.index.starts[number] : self.index.ends[number]]
+
+    def record(self, number: int) -> dict:
+        """
+        Returns a record.
+        """
+        with profile_stage('json_parse'):
+            return json.loads(self.read(number))
+
+    def records(self, numbers: Iterable[int]) -> Iterator[dict]:
+        """
+        Yields the records with the given numbers.
+        """
+        for number in numbers:
+            yield self.record(number)
+
+    def find(self, value: str, key: str = 'file') -> list[dict]:
+        """
+        Returns the records with the given value of a key field, e.g. the records
+        of a paper id (`file`) or a DOI (`source`).
+        """
+        return list(self.records(self.index.lookup(value, key)))
+
+    def close(self) -> None:
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def get_record_archive_name(
+    corpus_path: str, number: int, archive_format: str = 'yaml'
+) -> str:
+    """
+    Returns the name of the archive of a record of a corpus, counting the records
+    from 1 like the reactions of the nested LLM output.
+    """
+    stem = os.path.splitext(os.path.basename(corpus_path))[0]
+    return f'{stem}_reaction_{number + 1}.archive.{archive_format}'
+
+
+def _convert_records_task(
+    corpus_path: str,
+    chunk: tuple[array, array, array],
+    archive_format: str = 'yaml',
+) -> list[tuple[int, Optional[tuple[str, str]], Optional[str]]]:
+    # the chunk holds the numbers, start and end offsets of its records, which are
+    # numbered from 0 within the worker
+    numbers, starts, ends = chunk
+    index = CorpusIndex(starts, ends, {})
+    results = []
+    with Corpus(corpus_path, index) as corpus:
+        for position, number in enumerate(numbers):
+            try:
+                entry = build_archive_entry(corpus.record(position))
+                with profile_stage('serialization'):
+                    content = dump_archive(entry, archive_format)
+                count('archives')
+                name = get_record_archive_name(corpus_path, number, archive_format)
+                results.append((number, (name, content), None))
+            except Exception as e:
+                count('failures')
+                results.append((number, None, f'{type(e).__name__}: {e}'))
+    return results
+
+
+def _split_numbers(
+    index: CorpusIndex, numbers: list[int], jobs: int, chunk_bytes: int
+) -> Iterator[list[int]]:
+    # splits sorted record numbers like `CorpusIndex.chunks` splits all records
+    total = sum(index.ends[number] - index.starts[number] for number in numbers)
+    target = total / max(jobs, -(-total // chunk_bytes), 1)
+    chunk = []
+    size = 0
+    for number in numbers:
+        chunk.append(number)
+        size += index.ends[number] - index.starts[number]
+        if size >= target:
+            yield chunk
+            chunk = []
+            size = 0
+    if chunk:
+        yield chunk
+
+
+def convert_corpus(  # noqa: PLR0913, PLR0917
+    corpus_path: str,
+    writer,
+    numbers: Optional[Iterable[int]] = None,
+    jobs: int = 1,
+    archive_format: str = 'yaml',
+    index: Optional[CorpusIndex] = None,
+    chunk_bytes: int = 2**20,
+    logger: 'BoundLogger' = None,
+) -> list[tuple[int, Optional[str]]]:
+    """
+    Converts the records of a JSONL corpus into archives and hands them to a
+    writer, e.g. a `DirectoryWriter`. The records are read from the memory-mapped
+    corpus at the offsets of its index, so selected records are converted without
+    scanning the corpus.
+
+    The records are converted in consecutive chunks of about `chunk_bytes` bytes,
+    and in at least `jobs` chunks, so that only a few chunks of archives are held
+    in memory at a time. With `jobs > 1`, the chunks are converted by a pool of
+    worker processes with at most `2 * jobs` chunks in flight, see `map_ordered`.
+    The archives are still passed to the writer in record order.
+
+    Args:
+        corpus_path (str): Path of the JSONL file.
+        writer: The writer receiving the archives through `add(name, content)`.
+        numbers (Iterable[int]): The numbers of the records to convert, e.g. the
+        result of `CorpusIndex.lookup`. Defaults to all records.
+        jobs (int): Number of worker processes.
+        archive_format (str): The archive format, `yaml` or `json`.
+        index (CorpusIndex): The index of the corpus. Loaded with `load_index` if
+        not given.
+        chunk_bytes (int): The number of corpus bytes converted per chunk.
+        logger (BoundLogger): A structlog logger.
+
+    Returns:
+        list[tuple[int, Optional[str]]]: One `(record number, error)` pair per
+        converted record, in record order.
+    """
+    if index is None:
+        index = load_index(corpus_path)
+    if numbers is None:
+        total = index.ends[-1] - index.starts[0] if len(index) else 0
+        chunks = index.chunks(max(jobs, -(-total // chunk_bytes), 1))
+    else:
+        chunks = _split_numbers(index, sorted(set(numbers)), jobs, chunk_bytes)
+    tasks = (
+        (
+            array(_OFFSET_TYPE, chunk),
+            array(_OFFSET_TYPE, (index.starts[number] for number in chunk)),
+            array(_OFFSET_TYPE, (index.ends[number] for number in chunk)),
+        )
+        for chunk in chunks
+    )
+    task = functools.partial(
+        _convert_records_task, corpus_path, archive_format=archive_format
+    )
+    results = []
+    for chunk_results in map_ordered(task, tasks, jobs):
+        for number, archive, error in chunk_results:
+            if archive is not None:
+                with profile_stage('file_write'):
+                    writer.add(*archive)
+            if error is not None and logger is not None:
+                logger.warning(
+                    'Archive creation failed.',
+                    input=corpus_path,
+                    record=number,
+                    error=error,
+                )
+            results.append((number, error))
+    return results
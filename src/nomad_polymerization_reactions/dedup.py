@@ -0,0 +1,292 @@
+import json
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+
+from nomad_polymerization_reactions.utils import (
+    iter_archive_entries,
+    read_archive,
+    write_archive,
+)
+
+if TYPE_CHECKING:
+    from structlog.stdlib import BoundLogger
+
+DUPLICATE_POLICIES = ('keep', 'skip', 'merge')
+
+# A reaction key is `(monomers, temperature, method, solvent)`.
+ReactionKey = tuple[tuple[str, ...], Optional[float], Optional[str], Optional[str]]
+
+
+def _normalize_text(value) -> Optional[str]:
+    if value is None:
+        return None
+    return ' '.join(str(value).split()).casefold() or None
+
+
+def reaction_key(entry: dict, temperature_decimals: int = 0) -> Optional[ReactionKey]:
+    """
+    Builds the canonical key of the copolymerization system of an archive entry:
+    the sorted monomers, identified by their SMILES or else by their name, the
+    temperature in K rounded to `temperature_decimals`, the method and the solvent.
+    Names, methods and solvents are compared case insensitively.
+
+    Args:
+        entry (dict): The archive entry, i.e. a dict with the `data` section.
+        temperature_decimals (int): The number of decimals of the temperature.
+
+    Returns:
+        Optional[ReactionKey]: The key, or None if the entry has no monomers and
+        hence is never a duplicate.
+    """
+    data = entry.get('data') or dict()
+    monomers = tuple(
+        sorted(
+            monomer.get('smiles') or _normalize_text(monomer.get('substance_name'))
+            for monomer in data.get('monomers') or []
+            if monomer.get('smiles') or monomer.get('substance_name')
+        )
+    )
+    if not monomers:
+        return None
+    conditions = data.get('reaction_conditions') or dict()
+    temperature = conditions.get('temperature')
+    if temperature is not None:
+        temperature = round(float(temperature), temperature_decimals)
+    solvent = (conditions.get('solvent') or dict()).get('name')
+    return (
+        monomers,
+        temperature,
+        _normalize_text(conditions.get('method')),
+        _normalize_text(solvent),
+    )
+
+
+@dataclass
+class DuplicateCluster:
+    """
+    Reactions sharing the same `reaction_key`, in order of occurrence.
+    """
+
+    key: ReactionKey
+    members: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        monomers, temperature, method, solvent = self.key
+        return dict(
+            monomers=list(monomers),
+            temperature=temperature,
+            method=method,
+            solvent=solvent,
+            members=list(self.members),
+        )
+
+
+class DuplicateIndex:
+    """
+    Groups reactions by their `reaction_key` in a hash index, so that the
+    duplicates of a corpus are found in a single pass.
+
+    Args:
+        temperature_decimals (int): The number of decimals of the temperature.
+    """
+
+    def __init__(self, temperature_decimals: int = 0):
+        self.temperature_decimals = temperature_decimals
+        self._clusters = dict()
+
+    def add(self, identifier: str, entry: dict) -> Optional[str]:
+        """
+        Adds a reaction to the index.
+
+        Args:
+            identifier (str): Identifies the reaction in the clusters, e.g. a path.
+            entry (dict): The archive entry.
+
+        Returns:
+            Optional[str]: The identifier of the first reaction with the same key,
+            or None if the reaction is not a duplicate.
+        """
+        key = reaction_key(entry, self.temperature_decimals)
+        if key is None:
+            return None
+        cluster = self._clusters.get(key)
+        if cluster is None:
+            self._clusters[key] = DuplicateCluster(key, [identifier])
+            return None
+        cluster.members.append(identifier)
+        return cluster.members[0]
+
+    def clusters(self) -> list[DuplicateCluster]:
+        """
+        Returns the clusters with more than one reaction, in order of occurrence.
+        """
+        return [
+            cluster for cluster in self._clusters.values() if len(cluster.members) > 1
+        ]
+
+
+def find_duplicates(
+    entries: Iterable[tuple[str, dict]], temperature_decimals: int = 0
+) -> list[DuplicateCluster]:
+    """
+    Finds the duplicate reactions of a corpus.
+
+    Args:
+        entries (Iterable[tuple[str, dict]]): The identifiers and archive entries.
+        temperature_decimals (int): The number of decimals of the temperature.
+
+    Returns:
+        list[DuplicateCluster]: The clusters of duplicate reactions.
+    """
+    index = DuplicateIndex(temperature_decimals)
+    for identifier, entry in entries:
+        index.add(identifier, entry)
+    return index.clusters()
+
+
+def iter_identified_entries(
+    paths: Iterable[str], nested: bool = False
+) -> Iterator[tuple[str, dict]]:
+    """
+    Lazily reads the archive entries of LLM output JSON files and of generated
+    archive files together with an identifier: the path of the file, followed by
+    `#<n>` for the n-th reaction of a nested JSON file.
+
+    Args:
+        paths (Iterable[str]): Paths of the JSON and archive files.
+        nested (bool): If True, the JSON files contain the nested multi-reaction
+        LLM output.
+
+    Yields:
+        tuple[str, dict]: The identifier and the archive entry.
+    """
+    for path in paths:
+        if path.endswith(('.archive.yaml', '.archive.yml', '.archive.json')):
+            yield path, read_archive(path)
+        elif nested:
+            for iterator, (_, entry) in enumerate(
+                iter_archive_entries(path, nested=True), start=1
+            ):
+                yield f'{path}#{iterator}', entry
+        else:
+            for _, entry in iter_archive_entries(path):
+                yield path, entry
+
+
+def merge_entries(entry: dict, duplicate: dict) -> dict:
+    """
+    Merges a duplicate into an archive entry by filling in the quantities and
+    sections the entry is missing. Existing values and lists, e.g. the monomers
+    and reaction constants, are never changed, as the duplicate may list the
+    monomers in another order.
+
+    Args:
+        entry (dict): The archive entry or one of its sections.
+        duplicate (dict): The corresponding dict of the duplicate.
+
+    Returns:
+        dict: The merged entry.
+    """
+    merged = dict(entry)
+    for key, value in duplicate.items():
+        if merged.get(key) is None:
+            merged[key] = value
+        elif isinstance(merged[key], dict) and isinstance(value, dict):
+            merged[key] = merge_entries(merged[key], value)
+    return merged
+
+
+def write_duplicate_report(clusters: list[DuplicateCluster], path: str) -> None:
+    """
+    Writes the duplicate clusters into a JSON file.
+    """
+    with open(path, 'w') as f:
+        json.dump([cluster.to_dict() for cluster in clusters], f, indent=2)
+
+
+@dataclass
+class Deduplication:
+    """
+    The outcome of `generate_archives_deduplicated`.
+    """
+
+    results: list[tuple[str, Optional[str]]] = field(default_factory=list)
+    clusters: list[DuplicateCluster] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+
+
+def generate_archives_deduplicated(  # noqa: PLR0913, PLR0917
+    filepaths: list[str],
+    same_dir_as_input: bool = False,
+    nested: bool = False,
+    archive_format: str = 'yaml',
+    policy: str = 'skip',
+    temperature_decimals: int = 0,
+    logger: 'BoundLogger' = None,
+) -> Deduplication:
+    """
+    Like `generate_archives_from_json`, but detects duplicate reactions across all
+    files. Depending on the `policy`, the archives of duplicates are still written
+    (`keep`), not written (`skip`), or merged into the archive of the first
+    reaction with the same key (`merge`, see `merge_entries`). The clusters are
+    reported in any case and the duplicates are identified by their archive path.
+
+    The reactions of a file are only indexed and written once the whole file was
+    read, so a failing nested file contributes no archives. With `merge`, the
+    archives are only written once all files have been read.
+
+    Args:
+        filepaths (list[str]): Paths to the JSON files.
+        same_dir_as_input (bool): If True, the output is created inside the same
+        directory as the input JSON file.
+        nested (bool): If True, the files contain the nested multi-reaction LLM
+        output.
+        archive_format (str): The archive format, `yaml` (default) or `json`.
+        policy (str): `keep`, `skip` (default) or `merge`.
+        temperature_decimals (int): The number of decimals of the temperature in
+        the reaction key.
+        logger (BoundLogger): A structlog logger.
+
+    Returns:
+        Deduplication: The results of the files, the duplicate clusters and the
+        archives which were not written because they are duplicates.
+    """
+    if policy not in DUPLICATE_POLICIES:
+        raise ValueError(f'Unknown duplicate policy "{policy}".')
+    index = DuplicateIndex(temperature_decimals)
+    deduplication = Deduplication()
+    merged = dict()
+
+    for filepath in filepaths:
+        try:
+            # a file is only added to the index once all its reactions were read,
+            # so that a file failing part-way leaves no entries behind
+            entries = list(
+                iter_archive_entries(
+                    filepath, same_dir_as_input, nested, archive_format
+                )
+            )
+            for archive_path, entry in entries:
+                original = index.add(archive_path, entry)
+                if original is not None and policy != 'keep':
+                    deduplication.skipped.append(archive_path)
+                    if policy == 'merge':
+                        merged[original] = merge_entries(merged[original], entry)
+                elif policy == 'merge':
+                    merged[archive_path] = entry
+                else:
+                    write_archive(entry, archive_path, logger)
+            deduplication.results.append((filepath, None))
+        except Exception as e:
+            error = f'{type(e).__name__}: {e}'
+            if logger is not None:
+                logger.warning(
+                    'Archive creation failed.', filepath=filepath, error=error
+                )
+            deduplication.results.append((filepath, error))
+
+    for archive_path, entry in merged.items():
+        write_archive(entry, archive_path, logger)
+    deduplication.clusters = index.clusters()
+    return deduplication
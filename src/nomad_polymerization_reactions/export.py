@@ -0,0 +1,302 @@
+import json
+import os
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING
+
+from nomad_polymerization_reactions.utils import (
+    build_archive_entry,
+    iter_archives_from_nested_json,
+    iter_records_from_nested_json,
+    read_archive,
+)
+
+if TYPE_CHECKING:
+    from structlog.stdlib import BoundLogger
+
+TABLE_FORMATS = ('parquet', 'arrow')
+
+REACTION_COLUMNS = {
+    'reaction_id': 'int64',
+    'file': 'dictionary',
+    'doi': 'dictionary',
+    'temperature': 'float64',
+    'method': 'dictionary',
+    'solvent': 'dictionary',
+    'polymerization_type': 'dictionary',
+    'determination_method': 'dictionary',
+    'r1': 'float64',
+    'r2': 'float64',
+    'r1_conf': 'float64',
+    'r2_conf': 'float64',
+    'r_product': 'float64',
+    'logP': 'float64',
+    'n_monomers': 'int16',
+}
+MONOMER_COLUMNS = {
+    'reaction_id': 'int64',
+    'position': 'int16',
+    'name': 'dictionary',
+    'smiles': 'dictionary',
+}
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow  # noqa: PLC0415
+        import pyarrow.parquet  # noqa: PLC0415
+    except ImportError as e:
+        raise ImportError(
+            'Exporting tables requires pyarrow. Install it with '
+            '`pip install nomad-polymerization-reactions[parquet]`.'
+        ) from e
+    return pyarrow
+
+
+def get_schema(columns: dict):
+    """
+    Returns the Arrow schema of a table. String columns are dictionary encoded.
+
+    Args:
+        columns (dict): The column types, e.g. `REACTION_COLUMNS`.
+
+    Returns:
+        pyarrow.Schema: The schema.
+    """
+    pa = _import_pyarrow()
+    fields = []
+    for name, column_type in columns.items():
+        if column_type == 'dictionary':
+            fields.append(pa.field(name, pa.dictionary(pa.int32(), pa.string())))
+        else:
+            fields.append(pa.field(name, getattr(pa, column_type)()))
+    return pa.schema(fields)
+
+
+def _reaction_constant(reaction_constants: list, index: int, quantity: str):
+    if index < len(reaction_constants):
+        return reaction_constants[index].get(quantity)
+    return None
+
+
+def tabulate_entry(reaction_id: int, entry: dict) -> tuple[dict, list[dict]]:
+    """
+    Flattens an archive entry into one row of the reaction table and one row per
+    monomer of the monomer table.
+
+    Args:
+        reaction_id (int): The id joining the reaction and its monomers.
+        entry (dict): The archive entry, i.e. a dict with the `data` section.
+
+    Returns:
+        tuple[dict, list[dict]]: The reaction row and the monomer rows.
+    """
+    data = entry.get('data') or dict()
+    conditions = data.get('reaction_conditions') or dict()
+    reaction_constants = conditions.get('reaction_constants') or []
+    monomers = data.get('monomers') or []
+    reaction = dict(
+        reaction_id=reaction_id,
+        file=data.get('data_file_name'),
+        doi=(data.get('publication_reference') or dict()).get('DOI_number'),
+        temperature=conditions.get('temperature'),
+        method=conditions.get('method'),
+        solvent=(conditions.get('solvent') or dict()).get('name'),
+        polymerization_type=conditions.get('polymerization_type'),
+        determination_method=conditions.get('determination_method'),
+        r1=_reaction_constant(reaction_constants, 0, 'reaction_constant'),
+        r2=_reaction_constant(reaction_constants, 1, 'reaction_constant'),
+        r1_conf=_reaction_constant(reaction_constants, 0, 'reaction_constant_confi'),
+        r2_conf=_reaction_constant(reaction_constants, 1, 'reaction_constant_confi'),
+        r_product=data.get('r_product'),
+        logP=data.get('logP'),
+        n_monomers=len(monomers),
+    )
+    monomer_rows = [
+        dict(
+            reaction_id=reaction_id,
+            position=position,
+            name=monomer.get('substance_name'),
+            smiles=monomer.get('smiles'),
+        )
+        for position, monomer in enumerate(monomers, start=1)
+    ]
+    return reaction, monomer_rows
+
+
+def iter_entries(paths: Iterable[str], nested: bool = False) -> Iterator[dict]:
+    """
+    Lazily reads the archive entries of LLM output JSON files and of generated
+    `.archive.yaml` and `.archive.json` files.
+
+    Args:
+        paths (Iterable[str]): Paths of the JSON and archive files.
+        nested (bool): If True, the JSON files contain the nested multi-reaction
+        LLM output.
+
+    Yields:
+        dict: The archive entries.
+    """
+    for path in paths:
+        if path.endswith(('.archive.yaml', '.archive.yml', '.archive.json')):
+            yield read_archive(path)
+        elif nested:
+            yield from iter_archives_from_nested_json(path)
+        else:
+            with open(path) as f:
+                yield build_archive_entry(json.load(f))
+
+
+def _iter_file_entries(
+    path: str, nested: bool, logger: 'BoundLogger' = None
+) -> Iterator[dict]:
+    # the reactions of a nested file are converted one at a time, so that a
+    # reaction which can not be converted does not drop the others
+    if not nested or path.endswith(('.archive.yaml', '.archive.yml', '.archive.json')):
+        yield from iter_entries([path], nested)
+        return
+    for iterator, record in enumerate(iter_records_from_nested_json(path), start=1):
+        try:
+            entry = build_archive_entry(record)
+        except Exception as e:
+            if logger is not None:
+                logger.warning(
+                    'Could not convert reaction.',
+                    filepath=path,
+                    reaction=iterator,
+                    exc_info=e,
+                )
+            continue
+        yield entry
+
+
+def _to_float(value):
+    try:
+        return None if value is None else float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class _TableWriter:
+    """
+    Buffers rows and writes them as record batches into a Parquet file or an Arrow
+    IPC stream. Every batch is dictionary encoded on its own.
+    """
+
+    def __init__(self, path: str, columns: dict, table_format: str, batch_size: int):
+        pa = _import_pyarrow()
+        self.columns = columns
+        self.schema = get_schema(columns)
+        self.batch_size = batch_size
+        self.rows = 0
+        self._buffer = {name: [] for name in columns}
+        if table_format == 'parquet':
+            self._writer = pa.parquet.ParquetWriter(path, self.schema)
+        else:
+            self._writer = pa.ipc.new_stream(path, self.schema)
+
+    def add(self, row: dict) -> None:
+        for name, values in self._buffer.items():
+            values.append(row[name])
+        if len(self._buffer['reaction_id']) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        pa = _import_pyarrow()
+        size = len(self._buffer['reaction_id'])
+        if not size:
+            return
+        arrays = []
+        for field in self.schema:
+            values = self._buffer[field.name]
+            if pa.types.is_dictionary(field.type):
+                strings = [None if value is None else str(value) for value in values]
+                arrays.append(pa.array(strings, pa.string()).dictionary_encode())
+            elif pa.types.is_floating(field.type):
+                arrays.append(pa.array(map(_to_float, values), field.type))
+            else:
+                arrays.append(pa.array(values, field.type))
+        self._writer.write_batch(pa.record_batch(arrays, schema=self.schema))
+        self.rows += size
+        self._buffer = {name: [] for name in self.columns}
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.close()
+
+
+def export_tables(  # noqa: PLR0913, PLR0917
+    paths: Iterable[str],
+    output_dir: str,
+    table_format: str = 'parquet',
+    nested: bool = False,
+    batch_size: int = 65536,
+    logger: 'BoundLogger' = None,
+) -> dict[str, tuple[str, int]]:
+    """
+    Exports reaction records into a reaction table and a monomer table, joined by
+    their `reaction_id`. The records are streamed in batches of `batch_size` rows,
+    so memory does not grow with the number of records. Files that can not be read
+    are skipped from the first failure on, with a warning, and reactions of nested
+    files that can not be converted are skipped individually.
+
+    The reaction table holds the temperature in K, the reaction conditions, the
+    first two reaction constants with their confidence intervals, the r-product,
+    logP and the DOI. The monomer table holds the name and SMILES of every monomer
+    and its position within the reaction. String columns are dictionary encoded.
+
+    Args:
+        paths (Iterable[str]): Paths of LLM output JSON files or archive files.
+        output_dir (str): Directory receiving `reactions.<ext>` and
+        `monomers.<ext>`.
+        table_format (str): `parquet` (default) or `arrow`, i.e. the Arrow IPC
+        stream format.
+        nested (bool): If True, the JSON files contain the nested multi-reaction
+        LLM output.
+        batch_size (int): Number of rows per record batch or Parquet row group.
+        logger (BoundLogger): A structlog logger.
+
+    Returns:
+        dict[str, tuple[str, int]]: The path and number of rows of the `reactions`
+        and `monomers` tables.
+    """
+    if table_format not in TABLE_FORMATS:
+        raise ValueError(f'Unknown table format "{table_format}".')
+    os.makedirs(output_dir, exist_ok=True)
+    writers = {
+        name: _TableWriter(
+            os.path.join(output_dir, f'{name}.{table_format}'),
+            columns,
+            table_format,
+            batch_size,
+        )
+        for name, columns in (
+            ('reactions', REACTION_COLUMNS),
+            ('monomers', MONOMER_COLUMNS),
+        )
+    }
+
+    reaction_id = 0
+    try:
+        for path in paths:
+            rows = 0
+            try:
+                for entry in _iter_file_entries(path, nested, logger):
+                    reaction, monomers = tabulate_entry(reaction_id, entry)
+                    writers['reactions'].add(reaction)
+                    for monomer in monomers:
+                        writers['monomers'].add(monomer)
+                    reaction_id += 1
+                    rows += 1
+            except Exception as e:
+                if logger is not None:
+                    logger.warning(
+                        'Could not read file.', filepath=path, rows=rows, exc_info=e
+                    )
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    return {
+        name: (os.path.join(output_dir, f'{name}.{table_format}'), writer.rows)
+        for name, writer in writers.items()
+    }
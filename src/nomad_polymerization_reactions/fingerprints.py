@@ -0,0 +1,417 @@
+import re
+import zlib
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from nomad_polymerization_reactions.dedup import iter_identified_entries
+
+FINGERPRINT_BITS = 1024
+# Maximum number of atoms of the paths hashed into a fingerprint.
+MAX_PATH_LENGTH = 6
+
+_SMILES_TOKEN = re.compile(
+    r'(?P<atom>\[[^\[\]]+\]|Br|Cl|[BCNOPSFI]|[bcnops]|\*)'
+    r'|(?P<bond>[-=#$:/\\])'
+    r'|(?P<branch>[()])'
+    r'|(?P<ring>%\d{2}|\d)'
+    r'|(?P<dot>\.)'
+)
+_BRACKET_ATOM = re.compile(r'\[\d*(se|as|[A-Z][a-z]?|[bcnops]|\*)')
+_BOND_LABELS = {'-': '-', '/': '-', '\\': '-', '=': '=', '#': '#', '$': '$', ':': ':'}
+# The number of set bits of every byte, used if numpy has no `bitwise_count`.
+_BYTE_BIT_COUNTS = np.array([bin(byte).count('1') for byte in range(256)], np.uint8)
+
+
+def parse_smiles(smiles: str) -> tuple[list[str], list[tuple[int, int, str]]]:  # noqa: PLR0912
+    """
+    Parses a SMILES string into its molecular graph. Atoms are labeled by their
+    element, in lower case if they are aromatic, and bonds by their SMILES bond
+    symbol, with single bonds between aromatic atoms being aromatic. Hydrogens,
+    charges and stereochemistry are ignored.
+
+    Args:
+        smiles (str): The SMILES string.
+
+    Returns:
+        tuple[list[str], list[tuple[int, int, str]]]: The atom labels and the
+        bonds as `(atom, atom, bond label)`.
+    """
+    atoms = []
+    bonds = []
+    branches = []
+    rings = dict()
+    previous = None
+    bond = None
+    position = 0
+    for match in _SMILES_TOKEN.finditer(smiles):
+        if match.start() != position:
+            break
+        position = match.end()
+        token = match.group()
+        if match['atom']:
+            label = token
+            if token.startswith('['):
+                element = _BRACKET_ATOM.match(token)
+                if element is None:
+                    raise ValueError(f'Invalid atom "{token}" in SMILES "{smiles}".')
+                label = element[1]
+            atoms.append(label)
+            if previous is not None:
+                bonds.append(_bond(atoms, previous, len(atoms) - 1, bond))
+            previous = len(atoms) - 1
+            bond = None
+        elif match['bond']:
+            bond = token
+        elif token == '(':
+            branches.append(previous)
+        elif token == ')':
+            if not branches:
+                raise ValueError(f'Unbalanced parentheses in SMILES "{smiles}".')
+            previous = branches.pop()
+        elif match['ring']:
+            if previous is None:
+                raise ValueError(f'Ring bond without an atom in SMILES "{smiles}".')
+            if token in rings:
+                atom, ring_bond = rings.pop(token)
+                bonds.append(_bond(atoms, atom, previous, bond or ring_bond))
+            else:
+                rings[token] = (previous, bond)
+            bond = None
+        else:
+            previous = None
+    if position != len(smiles):
+        raise ValueError(f'Invalid character at {position} in SMILES "{smiles}".')
+    if branches or rings or not atoms:
+        raise ValueError(f'Incomplete SMILES "{smiles}".')
+    return atoms, bonds
+
+
+def _bond(atoms: list[str], first: int, second: int, symbol: Optional[str]) -> tuple:
+    if symbol is None:
+        aromatic = atoms[first].islower() and atoms[second].islower()
+        symbol = ':' if aromatic else '-'
+    return first, second, _BOND_LABELS[symbol]
+
+
+def _iter_paths(atoms: list[str], bonds: list[tuple], max_length: int):
+    # yields every path as its label string in both directions
+    neighbors = [[] for _ in atoms]
+    for first, second, label in bonds:
+        neighbors[first].append((second, label))
+        neighbors[second].append((first, label))
+
+    def extend(atom, visited, forward, reverse):
+        yield forward, reverse
+        if len(visited) == max_length:
+            return
+        for neighbor, label in neighbors[atom]:
+            if neighbor not in visited:
+                visited.add(neighbor)
+                yield from extend(
+                    neighbor,
+                    visited,
+                    f'{forward}{label}{atoms[neighbor]}',
+                    f'{atoms[neighbor]}{label}{reverse}',
+                )
+                visited.remove(neighbor)
+
+    for start, label in enumerate(atoms):
+        yield from extend(start, {start}, label, label)
+
+
+def smiles_fingerprint(
+    smiles: str,
+    n_bits: int = FINGERPRINT_BITS,
+    max_path_length: int = MAX_PATH_LENGTH,
+) -> np.ndarray:
+    """
+    Computes the hashed path fingerprint of a SMILES string: every linear path of
+    up to `max_path_length` atoms of the molecular graph, see `parse_smiles`, sets
+    one of `n_bits` bits. As every path of a substructure is also a path of the
+    molecule containing it, the fingerprint of a substructure only sets bits which
+    are also set in the fingerprint of the molecule.
+
+    Args:
+        smiles (str): The SMILES string.
+        n_bits (int): The number of bits, a multiple of 64.
+        max_path_length (int): The maximum number of atoms of the paths.
+
+    Returns:
+        np.ndarray: The bits packed into `n_bits / 64` unsigned 64 bit integers.
+    """
+    if n_bits % 64:
+        raise ValueError('The number of bits must be a multiple of 64.')
+    atoms, bonds = parse_smiles(smiles)
+    # a path and its reverse set the same bit
+    paths = {
+        min(forward, reverse)
+        for forward, reverse in _iter_paths(atoms, bonds, max_path_length)
+    }
+    bits = np.zeros(n_bits, dtype=bool)
+    bits[[zlib.crc32(path.encode()) % n_bits for path in paths]] = True
+    return np.packbits(bits, bitorder='little').view('<u8').astype(np.uint64)
+
+
+def _bit_count(words: np.ndarray) -> np.ndarray:
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    return _BYTE_BIT_COUNTS[words.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+@dataclass
+class MonomerMatch:
+    """
+    A monomer found in a `FingerprintIndex`: its SMILES, the first name it was
+    given, the identifiers of the reactions it is part of and its Tanimoto
+    similarity to the query.
+    """
+
+    smiles: str
+    name: Optional[str]
+    entries: list[str] = field(default_factory=list)
+    similarity: float = 0.0
+
+
+class FingerprintIndex:
+    """
+    The fingerprints of the distinct monomer SMILES of a corpus, see
+    `build_fingerprint_index`, answering similarity and substructure queries with
+    vectorized bit operations. The monomers are sorted by the number of set bits
+    of their fingerprints, so that a query only compares the contiguous range of
+    monomers whose number of set bits allows a match.
+
+    Args:
+        smiles (list[str]): The distinct monomer SMILES.
+        names (list[Optional[str]]): The first name given to every monomer.
+        fingerprints (np.ndarray): The fingerprints of the monomers, one row of
+        packed bits per monomer, sorted by their number of set bits.
+        entry_ids (list[str]): The identifiers of the reactions.
+        entry_offsets (np.ndarray): The reactions of the `i`-th monomer are
+        `entry_indices[entry_offsets[i]:entry_offsets[i + 1]]`.
+        entry_indices (np.ndarray): The indices into `entry_ids`.
+        max_path_length (int): The maximum number of atoms of the hashed paths.
+    """
+
+    def __init__(  # noqa: PLR0913, PLR0917
+        self,
+        smiles: list[str],
+        names: list[Optional[str]],
+        fingerprints: np.ndarray,
+        entry_ids: list[str],
+        entry_offsets: np.ndarray,
+        entry_indices: np.ndarray,
+        max_path_length: int = MAX_PATH_LENGTH,
+    ):
+        self.smiles = smiles
+        self.names = names
+        self.fingerprints = fingerprints
+        self.entry_ids = entry_ids
+        self.entry_offsets = entry_offsets
+        self.entry_indices = entry_indices
+        self.max_path_length = max_path_length
+        self._bit_counts = _bit_count(fingerprints)
+        if np.any(self._bit_counts[1:] < self._bit_counts[:-1]):
+            raise ValueError('The monomers must be sorted by their number of bits.')
+
+    @property
+    def n_bits(self) -> int:
+        return self.fingerprints.shape[1] * 64
+
+    def __len__(self) -> int:
+        return len(self.smiles)
+
+    def fingerprint(self, smiles: str) -> np.ndarray:
+        """
+        Computes the fingerprint of a query with the settings of the index.
+        """
+        return smiles_fingerprint(smiles, self.n_bits, self.max_path_length)
+
+    def _range(self, minimum: float, maximum: float) -> slice:
+        # the monomers with `minimum <= number of bits <= maximum`
+        return slice(
+            int(np.searchsorted(self._bit_counts, minimum, side='left')),
+            int(np.searchsorted(self._bit_counts, maximum, side='right')),
+        )
+
+    def _tanimoto(self, query: np.ndarray, monomers: slice) -> np.ndarray:
+        common = _bit_count(self.fingerprints[monomers] & query)
+        union = self._bit_counts[monomers] + _bit_count(query) - common
+        return common / np.maximum(union, 1)
+
+    def tanimoto(self, smiles: str) -> np.ndarray:
+        """
+        Returns the Tanimoto similarity of every monomer to a query SMILES.
+        """
+        return self._tanimoto(self.fingerprint(smiles), slice(None))
+
+    def _matches(self, indices: np.ndarray, similarities: np.ndarray, limit):
+        order = indices[np.argsort(-similarities[indices], kind='stable')][:limit]
+        return [
+            MonomerMatch(
+                self.smiles[i],
+                self.names[i],
+                [
+                    self.entry_ids[j]
+                    for j in self.entry_indices[
+                        self.entry_offsets[i] : self.entry_offsets[i + 1]
+                    ]
+                ],
+                float(similarities[i]),
+            )
+            for i in order
+        ]
+
+    def similar(
+        self, smiles: str, threshold: float = 0.7, limit: Optional[int] = None
+    ) -> list[MonomerMatch]:
+        """
+        Finds the monomers with a Tanimoto similarity of at least `threshold` to
+        a query SMILES, most similar first.
+        """
+        query = self.fingerprint(smiles)
+        similarities = np.zeros(len(self))
+        # a similarity of at least `threshold` requires a number of bits between
+        # `threshold` and `1 / threshold` times the number of bits of the query,
+        # with a tolerance for rounding
+        bits = _bit_count(query)
+        monomers = (
+            self._range(threshold * bits - 1e-9, bits / threshold + 1e-9)
+            if threshold > 0
+            else slice(None)
+        )
+        similarities[monomers] = self._tanimoto(query, monomers)
+        return self._matches(
+            np.flatnonzero(similarities >= threshold), similarities, limit
+        )
+
+    def substructure(
+        self, smiles: str, limit: Optional[int] = None
+    ) -> list[MonomerMatch]:
+        """
+        Finds the monomers whose fingerprint contains all bits of the fingerprint
+        of a query SMILES, most similar first. This is a prefilter: not every
+        monomer found contains the query. The SMILES are not canonicalized, so a
+        monomer is only found if the query is written in the same convention,
+        e.g. an aromatic ring as `c1ccccc1` and not in the Kekulé form `C1=CC=CC=C1`
+        or the other way around. Given that, every monomer containing the query is
+        found.
+        """
+        query = self.fingerprint(smiles)
+        bits = _bit_count(query)
+        monomers = self._range(bits, np.inf)
+        candidates = monomers.start + np.flatnonzero(
+            ((self.fingerprints[monomers] & query) == query).all(axis=1)
+        )
+        # the similarity of a monomer containing all bits of the query
+        similarities = np.zeros(len(self))
+        similarities[candidates] = bits / np.maximum(self._bit_counts[candidates], 1)
+        return self._matches(candidates, similarities, limit)
+
+    def save(self, path: str) -> None:
+        """
+        Writes the index into a NumPy `.npz` file.
+        """
+        with open(path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                smiles=np.array(self.smiles, dtype=str),
+                names=np.array([name or '' for name in self.names], dtype=str),
+                fingerprints=self.fingerprints,
+                entry_ids=np.array(self.entry_ids, dtype=str),
+                entry_offsets=self.entry_offsets,
+                entry_indices=self.entry_indices,
+                max_path_length=np.array(self.max_path_length),
+            )
+
+    @classmethod
+    def load(cls, path: str) -> 'FingerprintIndex':
+        """
+        Reads an index written by `save`.
+        """
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls(
+                arrays['smiles'].tolist(),
+                [name or None for name in arrays['names'].tolist()],
+                arrays['fingerprints'],
+                arrays['entry_ids'].tolist(),
+                arrays['entry_offsets'],
+                arrays['entry_indices'],
+                int(arrays['max_path_length']),
+            )
+
+
+@dataclass
+class FingerprintIndexBuild:
+    """
+    The outcome of `build_fingerprint_index`: the index, the number of reactions
+    and the monomer SMILES which could not be parsed.
+    """
+
+    index: FingerprintIndex
+    entries: int = 0
+    invalid_smiles: list[str] = field(default_factory=list)
+
+
+def build_fingerprint_index(
+    paths: Iterable[str],
+    nested: bool = False,
+    n_bits: int = FINGERPRINT_BITS,
+    max_path_length: int = MAX_PATH_LENGTH,
+) -> FingerprintIndexBuild:
+    """
+    Builds the `FingerprintIndex` of the monomers of LLM output JSON files or
+    generated archive files. Every distinct SMILES is parsed once. Monomers
+    without SMILES are not indexed.
+
+    Args:
+        paths (Iterable[str]): Paths of the JSON and archive files.
+        nested (bool): If True, the JSON files contain the nested multi-reaction
+        LLM output.
+        n_bits (int): The number of bits of the fingerprints, a multiple of 64.
+        max_path_length (int): The maximum number of atoms of the hashed paths.
+
+    Returns:
+        FingerprintIndexBuild: The index, the number of reactions and the invalid
+        SMILES.
+    """
+    monomers = dict()
+    invalid = dict()
+    entry_ids = []
+    for identifier, entry in iter_identified_entries(paths, nested):
+        entry_ids.append(identifier)
+        for monomer in (entry.get('data') or dict()).get('monomers') or []:
+            smiles = monomer.get('smiles')
+            if not smiles or smiles in invalid:
+                continue
+            if smiles not in monomers:
+                try:
+                    fingerprint = smiles_fingerprint(smiles, n_bits, max_path_length)
+                except ValueError:
+                    invalid[smiles] = None
+                    continue
+                monomers[smiles] = (monomer.get('substance_name'), fingerprint, [])
+            entries = monomers[smiles][2]
+            if not entries or entries[-1] != len(entry_ids) - 1:
+                entries.append(len(entry_ids) - 1)
+
+    fingerprints = np.array(
+        [fingerprint for _, fingerprint, _ in monomers.values()], dtype=np.uint64
+    ).reshape(len(monomers), n_bits // 64)
+    order = np.argsort(_bit_count(fingerprints), kind='stable')
+    smiles = list(monomers)
+    monomers = [monomers[smiles[i]] for i in order]
+    offsets = np.zeros(len(monomers) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(entries) for _, _, entries in monomers])
+    index = FingerprintIndex(
+        [smiles[i] for i in order],
+        [name for name, _, _ in monomers],
+        fingerprints[order],
+        entry_ids,
+        offsets,
+        np.array([i for _, _, entries in monomers for i in entries], dtype=np.int64),
+        max_path_length,
+    )
+    return FingerprintIndexBuild(index, len(entry_ids), list(invalid))
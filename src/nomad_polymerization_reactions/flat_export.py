@@ -0,0 +1,152 @@
+import json
+import os
+import zipfile
+from collections.abc import Iterable, Iterator
+from typing import IO, TYPE_CHECKING, Optional, Union
+
+import yaml
+
+from nomad_polymerization_reactions.bundles import batched, open_zip_file
+from nomad_polymerization_reactions.profiling import (
+    count,
+    map_ordered,
+    profile_stage,
+)
+from nomad_polymerization_reactions.utils import SafeLoader, build_flat_record
+
+if TYPE_CHECKING:
+    from structlog.stdlib import BoundLogger
+
+ARCHIVE_SUFFIXES = ('.archive.yaml', '.archive.yml', '.archive.json')
+
+# An archive input is either a plain file `(path, None)` or a member of a zip file
+# `(zip path, member name)`.
+ArchiveInput = tuple[str, Optional[str]]
+
+
+def iter_archive_inputs(paths: Iterable[str]) -> Iterator[ArchiveInput]:
+    """
+    Expands the given paths into archive inputs. Directories are searched
+    recursively for archive files and zip files, e.g. uploads downloaded from
+    NOMAD, are expanded into their archive members without extracting them.
+
+    Args:
+        paths (Iterable[str]): Paths of archive files, zip files or directories.
+
+    Yields:
+        ArchiveInput: The archive inputs in order, the files of a directory sorted
+        by path.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            found = []
+            for directory, _, names in os.walk(path):
+                found.extend(
+                    os.path.join(directory, name)
+                    for name in names
+                    if name.endswith(ARCHIVE_SUFFIXES) or name.endswith('.zip')
+                )
+            yield from iter_archive_inputs(sorted(found))
+        elif zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as zip_file:
+                members = [
+                    info.filename
+                    for info in zip_file.infolist()
+                    if not info.is_dir() and info.filename.endswith(ARCHIVE_SUFFIXES)
+                ]
+            for member in members:
+                yield path, member
+        else:
+            yield path, None
+
+
+def read_archive_input(archive_input: ArchiveInput) -> dict:
+    """
+    Reads an archive file or archive zip member with the libyaml based loader if
+    PyYAML was built with it.
+
+    Args:
+        archive_input (ArchiveInput): The archive input.
+
+    Returns:
+        dict: The archive entry.
+    """
+    path, member = archive_input
+    with profile_stage('file_read'):
+        if member is None:
+            with open(path, 'rb') as f:
+                content = f.read()
+        else:
+            zip_file = open_zip_file(path, os.stat(path).st_mtime_ns)
+            content = zip_file.read(member)
+    with profile_stage('archive_parse'):
+        if (member or path).endswith('.json'):
+            return json.loads(content)
+        return yaml.load(content, Loader=SafeLoader)
+
+
+def _export_records_task(
+    archive_inputs: list[ArchiveInput],
+) -> list[tuple[ArchiveInput, Optional[str], Optional[str]]]:
+    results = []
+    for archive_input in archive_inputs:
+        try:
+            record = build_flat_record(read_archive_input(archive_input))
+            with profile_stage('serialization'):
+                line = json.dumps(record, ensure_ascii=False)
+            count('records')
+            results.append((archive_input, line, None))
+        except Exception as e:
+            count('failures')
+            results.append((archive_input, None, f'{type(e).__name__}: {e}'))
+    return results
+
+
+def export_flat_records(  # noqa: PLR0913, PLR0917
+    paths: Iterable[str],
+    output: Union[str, IO],
+    jobs: int = 1,
+    batch_size: int = 256,
+    logger: 'BoundLogger' = None,
+) -> list[tuple[str, Optional[str]]]:
+    """
+    Exports archive files back into reaction records in the flat LLM output format,
+    see `build_flat_record`, and streams them into a JSONL file with one record per
+    line. Converting the lines with `generate_archive_from_json` gives back the
+    archives. A failing input does not stop the export of the remaining ones.
+
+    With `jobs > 1`, batches of `batch_size` inputs are read by a pool of worker
+    processes. At most `2 * jobs` batches are in flight and the records are
+    written in input order, so memory stays bounded and the output does not depend
+    on the number of workers.
+
+    Args:
+        paths (Iterable[str]): Paths of archive files, zip files of archives, e.g.
+        NOMAD uploads, or directories, see `iter_archive_inputs`.
+        output (str | IO): The path of the JSONL file or an open text stream, which
+        is not closed.
+        jobs (int): Number of worker processes.
+        batch_size (int): Number of inputs read per worker task.
+        logger (BoundLogger): A structlog logger.
+
+    Returns:
+        list[tuple[str, Optional[str]]]: One `(input, error)` pair per archive
+        input, in input order. Zip members are reported as `<zip path>/<member>`.
+    """
+    batches = batched(iter_archive_inputs(paths), batch_size)
+    stream = open(output, 'w', encoding='utf-8') if isinstance(output, str) else output
+    results = []
+    try:
+        for batch_results in map_ordered(_export_records_task, batches, jobs):
+            for (path, member), line, error in batch_results:
+                name = path if member is None else f'{path}/{member}'
+                if line is not None:
+                    with profile_stage('file_write'):
+                        stream.write(f'{line}\n')
+                if error is not None and logger is not None:
+                    logger.warning('Record export failed.', input=name, error=error)
+                results.append((name, error))
+    finally:
+        if stream is not output:
+            stream.close()
+    return results
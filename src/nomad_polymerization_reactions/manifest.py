@@ -0,0 +1,246 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+
+from nomad_polymerization_reactions.utils import CONVERTER_VERSION, run_archive_tasks
+
+if TYPE_CHECKING:
+    from structlog.stdlib import BoundLogger
+
+MANIFEST_VERSION = 2
+
+
+def get_converter_id(
+    nested: bool = False, archive_format: str = 'yaml', same_dir_as_input: bool = False
+) -> str:
+    """
+    Identifies the converter version together with the options that change the
+    generated archives.
+    """
+    layout = 'nested' if nested else 'flat'
+    location = 'same-dir' if same_dir_as_input else 'working-dir'
+    return f'{CONVERTER_VERSION}/{layout}/{archive_format}/{location}'
+
+
+def hash_file(path: str) -> str:
+    """
+    Returns the SHA-256 hex digest of the content of a file.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ConversionManifest:
+    """
+    Records for every converted input file the content hash, the converter that
+    converted it and the generated archives, so that later conversions can skip
+    unchanged inputs. The manifest is stored as a JSON file keyed by the input path.
+    The input and archive paths are stored relative to the directory of the
+    manifest file, so that the manifest can be used from any working directory.
+
+    To avoid rehashing unchanged files, the size and modification time of each input
+    are stored alongside its hash and the hash is only recomputed if they differ. If
+    the content turns out to be unchanged, e.g. after a touch, the stored size and
+    modification time are updated, so the file is not hashed again on the next run.
+
+    Args:
+        path (str): Path of the manifest file. It is created on `save` if it does
+        not exist.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.directory = os.path.dirname(os.path.abspath(path))
+        self.entries = dict()
+        self.orphaned_outputs = []
+        if os.path.exists(path):
+            with open(path) as f:
+                manifest = json.load(f)
+            if manifest.get('version') == MANIFEST_VERSION:
+                self.entries = manifest['entries']
+                self.orphaned_outputs = manifest['orphaned_outputs']
+
+    def _key(self, path: str) -> str:
+        path = os.path.abspath(path)
+        try:
+            return os.path.relpath(path, self.directory)
+        except ValueError:
+            # e.g. on another drive than the manifest
+            return path
+
+    def _resolve(self, key: str) -> str:
+        return os.path.normpath(os.path.join(self.directory, key))
+
+    def _fingerprint(self, input_path: str) -> dict:
+        stat = os.stat(input_path)
+        entry = self.entries.get(self._key(input_path))
+        if (
+            entry is not None
+            and entry['size'] == stat.st_size
+            and entry['mtime_ns'] == stat.st_mtime_ns
+        ):
+            sha256 = entry['sha256']
+        else:
+            sha256 = hash_file(input_path)
+        return dict(size=stat.st_size, mtime_ns=stat.st_mtime_ns, sha256=sha256)
+
+    def is_up_to_date(
+        self, input_path: str, converter: str, check_outputs: bool = True
+    ) -> bool:
+        """
+        Checks whether the input has been converted by the given converter since
+        its content last changed and, if `check_outputs` is True, all its archives
+        still exist.
+        """
+        entry = self.entries.get(self._key(input_path))
+        if entry is None or entry['converter'] != converter:
+            return False
+        fingerprint = self._fingerprint(input_path)
+        if fingerprint['sha256'] != entry['sha256']:
+            return False
+        entry.update(fingerprint)
+        return not check_outputs or all(
+            os.path.exists(self._resolve(output)) for output in entry['outputs']
+        )
+
+    def record(self, input_path: str, converter: str, outputs: list[str]) -> None:
+        """
+        Records a successful conversion. Archives of a previous conversion of the
+        same input which were not generated again are marked as orphaned.
+        """
+        key = self._key(input_path)
+        outputs = [self._key(output) for output in outputs]
+        previous = self.entries.get(key)
+        if previous is not None:
+            self._add_orphans(set(previous['outputs']).difference(outputs))
+        self.entries[key] = dict(
+            self._fingerprint(input_path), converter=converter, outputs=list(outputs)
+        )
+        self.orphaned_outputs = [
+            output for output in self.orphaned_outputs if output not in outputs
+        ]
+
+    def _add_orphans(self, outputs) -> None:
+        for output in sorted(outputs):
+            if output not in self.orphaned_outputs:
+                self.orphaned_outputs.append(output)
+
+    def find_orphans(self) -> list[str]:
+        """
+        Moves the entries of input files which no longer exist into the orphaned
+        archives and returns the paths of all orphaned archives which still exist.
+        """
+        for key in [
+            key for key in self.entries if not os.path.exists(self._resolve(key))
+        ]:
+            self._add_orphans(self.entries.pop(key)['outputs'])
+        self.orphaned_outputs = [
+            output
+            for output in self.orphaned_outputs
+            if os.path.exists(self._resolve(output))
+        ]
+        return [self._resolve(output) for output in self.orphaned_outputs]
+
+    def prune_orphans(self) -> list[str]:
+        """
+        Deletes the orphaned archives and returns their paths.
+        """
+        orphans = self.find_orphans()
+        for output in orphans:
+            os.remove(output)
+        self.orphaned_outputs = []
+        return orphans
+
+    def save(self) -> None:
+        """
+        Atomically writes the manifest file.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        temporary_path = f'{self.path}.tmp'
+        with open(temporary_path, 'w') as f:
+            json.dump(
+                dict(
+                    version=MANIFEST_VERSION,
+                    entries=self.entries,
+                    orphaned_outputs=self.orphaned_outputs,
+                ),
+                f,
+            )
+        os.replace(temporary_path, self.path)
+
+
+@dataclass
+class IncrementalConversion:
+    """
+    The outcome of `generate_archives_incrementally`.
+    """
+
+    results: list[tuple[str, Optional[str]]] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    orphaned_outputs: list[str] = field(default_factory=list)
+
+
+def generate_archives_incrementally(  # noqa: PLR0913, PLR0917
+    filepaths: list[str],
+    manifest_path: str,
+    same_dir_as_input: bool = False,
+    jobs: int = 1,
+    nested: bool = False,
+    archive_format: str = 'yaml',
+    prune_orphans: bool = False,
+    logger: 'BoundLogger' = None,
+) -> IncrementalConversion:
+    """
+    Like `generate_archives_from_json`, but skips the files whose content and
+    converter did not change since they were last converted according to the
+    manifest at `manifest_path`. The manifest is updated with the converted files.
+
+    Args:
+        filepaths (list[str]): Paths to the JSON files.
+        manifest_path (str): Path of the manifest file.
+        same_dir_as_input (bool): If True, the output is created inside the same
+        directory as the input JSON file.
+        jobs (int): Number of worker processes.
+        nested (bool): If True, the files contain the nested multi-reaction LLM
+        output.
+        archive_format (str): The archive format, `yaml` (default) or `json`.
+        prune_orphans (bool): If True, orphaned archives are deleted.
+        logger (BoundLogger): A structlog logger.
+
+    Returns:
+        IncrementalConversion: The results of the converted files, the skipped
+        files and the orphaned archives, i.e. archives in the manifest whose input
+        no longer exists or no longer generates them.
+    """
+    manifest = ConversionManifest(manifest_path)
+    converter = get_converter_id(nested, archive_format, same_dir_as_input)
+    conversion = IncrementalConversion()
+
+    pending = []
+    for filepath in dict.fromkeys(filepaths):
+        if manifest.is_up_to_date(filepath, converter):
+            conversion.skipped.append(filepath)
+        else:
+            pending.append(filepath)
+
+    for filepath, error, outputs in run_archive_tasks(
+        pending, same_dir_as_input, jobs, nested, archive_format
+    ):
+        if error is None:
+            manifest.record(filepath, converter, outputs)
+        elif logger is not None:
+            logger.warning('Archive creation failed.', filepath=filepath, error=error)
+        conversion.results.append((filepath, error))
+
+    if prune_orphans:
+        conversion.orphaned_outputs = manifest.prune_orphans()
+    else:
+        conversion.orphaned_outputs = manifest.find_orphans()
+    manifest.save()
+    return conversion
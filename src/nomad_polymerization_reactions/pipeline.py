@@ -0,0 +1,341 @@
+import asyncio
+import collections
+import contextlib
+import functools
+import io
+import os
+import time
+from collections.abc import Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional, Union
+
+from nomad_polymerization_reactions.profiling import (
+    count,
+    get_profiler,
+    profile_stage,
+    run_profiled,
+)
+from nomad_polymerization_reactions.utils import (
+    build_archive_entry,
+    dump_archive,
+    get_archive_path,
+    iter_archive_entries,
+    iter_records_from_nested_json,
+)
+
+if TYPE_CHECKING:
+    from structlog.stdlib import BoundLogger
+
+PIPELINE_STAGES = ('read', 'convert', 'write')
+
+# An input `(filepath, source, error)` of the conversion: the content of a file, or
+# a single record streamed from a nested file together with its archive path.
+_Input = tuple[str, Union[bytes, tuple[str, dict], None], Optional[str]]
+# Inputs that write to the same archive paths and hence are converted and written
+# together in input order.
+_InputGroup = list[_Input]
+# The conversion outcome `(filepath, error, [(archive_path, content)])` of a file.
+_OutputGroup = list[tuple[str, Optional[str], list[tuple[str, bytes]]]]
+
+
+@dataclass
+class PipelineReport:
+    """
+    The outcome and throughput of `run_pipeline`.
+
+    The busy time of a stage is the time its workers spent waiting for the
+    executor, summed over the workers. The maximum queue depths show how much of
+    the bounded queues between the stages was used.
+    """
+
+    results: list[tuple[str, Optional[str]]] = field(default_factory=list)
+    archives: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    elapsed: float = 0.0
+    busy: dict[str, float] = field(
+        default_factory=lambda: dict.fromkeys(PIPELINE_STAGES, 0.0)
+    )
+    max_queue_depth: dict[str, int] = field(default_factory=dict)
+
+    def throughput(self) -> dict[str, float]:
+        """
+        Returns the files, archives and megabytes read per second.
+        """
+        elapsed = self.elapsed or float('nan')
+        return dict(
+            files_per_second=len(self.results) / elapsed,
+            archives_per_second=self.archives / elapsed,
+            megabytes_per_second=self.bytes_read / 1e6 / elapsed,
+        )
+
+    def report(self) -> str:
+        """
+        Formats the throughput, the busy time of the stages and the queue depths.
+        """
+        throughput = self.throughput()
+        lines = [
+            f'{len(self.results)} file(s), {self.archives} archive(s) in '
+            f'{self.elapsed:.3f} s: {throughput["files_per_second"]:.1f} files/s, '
+            f'{throughput["archives_per_second"]:.1f} archives/s, '
+            f'{throughput["megabytes_per_second"]:.2f} MB/s read, '
+            f'{self.bytes_written / 1e6:.2f} MB written.',
+            f'{"Stage":<10} {"Busy [s]":>10} {"Max queued":>11}',
+        ]
+        for stage in PIPELINE_STAGES:
+            depth = self.max_queue_depth.get(stage)
+            lines.append(
+                f'{stage:<10} {self.busy[stage]:>10.4f} '
+                f'{"-" if depth is None else depth:>11}'
+            )
+        return '\n'.join(lines)
+
+
+def _read_group(filepaths: list[str]) -> _InputGroup:
+    group = []
+    for filepath in filepaths:
+        try:
+            with profile_stage('file_read'), open(filepath, 'rb') as f:
+                group.append((filepath, f.read(), None))
+        except Exception as e:
+            group.append((filepath, None, f'{type(e).__name__}: {e}'))
+    return group
+
+
+def _stream_nested_file(
+    filepath: str, same_dir_as_input: bool, archive_format: str
+) -> Iterator[_Input]:
+    # yields the records of a nested file one by one and ends with an error input
+    # if the file can not be read
+    archive_suffix = f'.archive.{archive_format}'
+    archive_prefix = get_archive_path(
+        filepath, same_dir_as_input, archive_format
+    ).removesuffix(archive_suffix)
+    try:
+        for number, record in enumerate(iter_records_from_nested_json(filepath), 1):
+            archive_path = f'{archive_prefix}_reaction_{number}{archive_suffix}'
+            yield filepath, (archive_path, record), None
+    except Exception as e:
+        yield filepath, None, f'{type(e).__name__}: {e}'
+
+
+def _convert_group(
+    group: _InputGroup, same_dir_as_input: bool, nested: bool, archive_format: str
+) -> _OutputGroup:
+    outputs = []
+    for filepath, source, error in group:
+        if error is not None:
+            outputs.append((filepath, error, []))
+            continue
+        try:
+            archives = []
+            if isinstance(source, bytes):
+                entries = iter_archive_entries(
+                    filepath,
+                    same_dir_as_input,
+                    nested,
+                    archive_format,
+                    open_file=functools.partial(io.BytesIO, source),
+                )
+            else:
+                archive_path, record = source
+                entries = [(archive_path, build_archive_entry(record))]
+            for archive_path, entry in entries:
+                with profile_stage('serialization'):
+                    archive = dump_archive(entry, archive_format).encode('utf-8')
+                archives.append((archive_path, archive))
+            outputs.append((filepath, None, archives))
+        except Exception as e:
+            outputs.append((filepath, f'{type(e).__name__}: {e}', []))
+    return outputs
+
+
+def _write_group(group: _OutputGroup) -> _OutputGroup:
+    outputs = []
+    for filepath, error, archives in group:
+        try:
+            for archive_path, archive in archives:
+                with profile_stage('file_write'), open(archive_path, 'wb') as f:
+                    f.write(archive)
+            outputs.append((filepath, error, archives))
+        except Exception as e:
+            outputs.append((filepath, f'{type(e).__name__}: {e}', archives))
+    return outputs
+
+
+async def run_pipeline(  # noqa: PLR0913, PLR0915, PLR0917
+    filepaths: list[str],
+    same_dir_as_input: bool = False,
+    jobs: int = 1,
+    nested: bool = False,
+    archive_format: str = 'yaml',
+    queue_size: int = 8,
+    io_workers: int = 4,
+    logger: 'BoundLogger' = None,
+) -> PipelineReport:
+    """
+    Generates the archives of several JSON files like `generate_archives_from_json`,
+    but in a pipeline of three overlapping stages: the files are read in a thread
+    pool, converted and serialized in a pool of `jobs` worker processes (or in a
+    single thread if `jobs` is 1) and the archives are written in the thread pool.
+    The stages are joined by queues holding at most `queue_size` items each, so a
+    stage waits for the next one once its queue is full and memory use does not
+    grow with the number of files.
+
+    An item is a flat file, or a single record of a nested file, which is streamed
+    with `iter_records_from_nested_json`, so memory use does not grow with the size
+    of a nested file either. A failing record of a nested file fails the file, but
+    the archives of its other records are still written.
+
+    Files that write to the same archive path are read whole, converted and
+    written together as one item in input order, so the generated archives are
+    the same as the ones of `generate_archives_from_json`.
+
+    Args:
+        filepaths (list[str]): Paths to the JSON files.
+        same_dir_as_input (bool): If True, the output is created inside the same
+        directory as the input JSON file.
+        jobs (int): Number of concurrent conversions. Above 1, the conversions run
+        in worker processes.
+        nested (bool): If True, the files contain the nested multi-reaction LLM
+        output.
+        archive_format (str): The archive format, `yaml` (default) or `json`.
+        queue_size (int): Maximum number of items waiting between two stages.
+        io_workers (int): Number of threads reading and writing files.
+        logger (BoundLogger): A structlog logger.
+
+    Returns:
+        PipelineReport: One `(filepath, error)` pair per input file, in input
+        order, and the throughput of the pipeline.
+    """
+    groups = collections.OrderedDict()
+    for filepath in filepaths:
+        archive_path = get_archive_path(filepath, same_dir_as_input, archive_format)
+        groups.setdefault(archive_path, []).append(filepath)
+
+    report = PipelineReport()
+    profiler = get_profiler()
+    loop = asyncio.get_running_loop()
+    queues = dict(
+        convert=asyncio.Queue(maxsize=queue_size),
+        write=asyncio.Queue(maxsize=queue_size),
+    )
+    outcomes = dict.fromkeys(filepaths)
+
+    async def run_stage(stage: str, executor: Executor, function, *args):
+        if profiler is not None:
+            function = functools.partial(run_profiled, function)
+        start = time.perf_counter()
+        result = await loop.run_in_executor(executor, function, *args)
+        report.busy[stage] += time.perf_counter() - start
+        if profiler is not None:
+            result, profile = result
+            profiler.merge(profile)
+        return result
+
+    async def put(stage: str, item) -> None:
+        await queues[stage].put(item)
+        report.max_queue_depth[stage] = max(
+            report.max_queue_depth.get(stage, 0), queues[stage].qsize()
+        )
+
+    async def stream(io_executor: Executor, filepath: str) -> None:
+        with contextlib.suppress(OSError):
+            report.bytes_read += os.path.getsize(filepath)
+        inputs = _stream_nested_file(filepath, same_dir_as_input, archive_format)
+        while (
+            item := await run_stage('read', io_executor, next, inputs, None)
+        ) is not None:
+            await put('convert', [item])
+
+    async def read(io_executor: Executor) -> None:
+        for group_filepaths in groups.values():
+            if nested and len(group_filepaths) == 1:
+                await stream(io_executor, group_filepaths[0])
+                continue
+            group = await run_stage('read', io_executor, _read_group, group_filepaths)
+            report.bytes_read += sum(len(source or b'') for _, source, _ in group)
+            await put('convert', group)
+
+    async def convert(conversion_executor: Executor) -> None:
+        while (group := await queues['convert'].get()) is not None:
+            group = await run_stage(
+                'convert',
+                conversion_executor,
+                _convert_group,
+                group,
+                same_dir_as_input,
+                nested,
+                archive_format,
+            )
+            await put('write', group)
+
+    async def write(io_executor: Executor) -> None:
+        while (group := await queues['write'].get()) is not None:
+            group = await run_stage('write', io_executor, _write_group, group)
+            for filepath, error, archives in group:
+                if outcomes[filepath] is None:
+                    outcomes[filepath] = error
+                if error is None:
+                    report.archives += len(archives)
+                    report.bytes_written += sum(len(archive) for _, archive in archives)
+                    count('archives', len(archives))
+                else:
+                    count('failures')
+
+    async def finish(workers: list, queue: str, consumers: int) -> None:
+        # Signals the consumers of the next stage that no more items follow.
+        await asyncio.gather(*workers)
+        for _ in range(consumers):
+            await queues[queue].put(None)
+
+    if jobs > 1:
+        conversion_executor = ProcessPoolExecutor(max_workers=jobs)
+    else:
+        conversion_executor = ThreadPoolExecutor(max_workers=1)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=io_workers) as io_executor, conversion_executor:
+        await asyncio.gather(
+            finish([read(io_executor)], 'convert', jobs),
+            finish(
+                [convert(conversion_executor) for _ in range(jobs)], 'write', io_workers
+            ),
+            *(write(io_executor) for _ in range(io_workers)),
+        )
+    report.elapsed = time.perf_counter() - start
+
+    for filepath in filepaths:
+        error = outcomes[filepath]
+        if error is not None and logger is not None:
+            logger.warning('Archive creation failed.', filepath=filepath, error=error)
+        report.results.append((filepath, error))
+    return report
+
+
+def generate_archives_pipelined(  # noqa: PLR0913, PLR0917
+    filepaths: list[str],
+    same_dir_as_input: bool = False,
+    jobs: int = 1,
+    nested: bool = False,
+    archive_format: str = 'yaml',
+    queue_size: int = 8,
+    io_workers: int = 4,
+    logger: 'BoundLogger' = None,
+) -> PipelineReport:
+    """
+    Runs `run_pipeline` in a new event loop. See `run_pipeline` for the arguments.
+    Use `run_pipeline` directly from within a running event loop.
+    """
+    return asyncio.run(
+        run_pipeline(
+            filepaths,
+            same_dir_as_input,
+            jobs,
+            nested,
+            archive_format,
+            queue_size,
+            io_workers,
+            logger,
+        )
+    )
@@ -0,0 +1,235 @@
+import collections
+import contextlib
+import contextvars
+import functools
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from structlog.stdlib import BoundLogger
+
+_active_profiler = contextvars.ContextVar('profiler', default=None)
+
+
+class _Stage:
+    """
+    Times one execution of a stage. Implemented as a class instead of a generator
+    based context manager as it is entered for every record.
+    """
+
+    __slots__ = ('logger', 'name', 'profiler', 'start')
+
+    def __init__(
+        self, name: str, profiler: Optional['Profiler'], logger: 'BoundLogger'
+    ):
+        self.name = name
+        self.profiler = profiler
+        self.logger = logger
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        duration = time.perf_counter() - self.start
+        if self.profiler is not None:
+            self.profiler.add_time(self.name, duration)
+        if self.logger is not None:
+            self.logger.debug('Stage finished.', stage=self.name, duration=duration)
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Profiler:
+    """
+    Aggregates the time spent in named stages and named counters, e.g. of the
+    conversion of many records. Profilers of worker processes are merged through
+    `to_dict` and `merge`.
+    """
+
+    def __init__(self):
+        self.stages = dict()
+        self.counters = dict()
+
+    def add_time(self, stage: str, duration: float) -> None:
+        calls, total, maximum = self.stages.get(stage, (0, 0.0, 0.0))
+        self.stages[stage] = (calls + 1, total + duration, max(maximum, duration))
+
+    def count(self, counter: str, n: int = 1) -> None:
+        self.counters[counter] = self.counters.get(counter, 0) + n
+
+    def to_dict(self) -> dict:
+        return dict(
+            stages={
+                stage: dict(calls=calls, total=total, max=maximum)
+                for stage, (calls, total, maximum) in self.stages.items()
+            },
+            counters=dict(self.counters),
+        )
+
+    def merge(self, profile: dict) -> None:
+        """
+        Adds the stages and counters of another profile created with `to_dict`.
+        """
+        for stage, timing in profile['stages'].items():
+            calls, total, maximum = self.stages.get(stage, (0, 0.0, 0.0))
+            self.stages[stage] = (
+                calls + timing['calls'],
+                total + timing['total'],
+                max(maximum, timing['max']),
+            )
+        for counter, n in profile['counters'].items():
+            self.count(counter, n)
+
+    def log(
+        self,
+        logger: 'BoundLogger',
+        event: str = 'Profile.',
+        duration: Optional[float] = None,
+    ) -> None:
+        """
+        Emits the aggregated profile as a single structured log event.
+        """
+        logger.info(event, duration=duration, **self.to_dict())
+
+    def report(self) -> str:
+        """
+        Formats the aggregated profile as a table, slowest stages first.
+        """
+        lines = [
+            f'{"Stage":<24} {"Calls":>9} {"Total [s]":>11} {"Mean [ms]":>11} '
+            f'{"Max [ms]":>11}'
+        ]
+        for stage, (calls, total, maximum) in sorted(
+            self.stages.items(), key=lambda item: item[1][1], reverse=True
+        ):
+            lines.append(
+                f'{stage:<24} {calls:>9} {total:>11.4f} {total / calls * 1e3:>11.4f} '
+                f'{maximum * 1e3:>11.4f}'
+            )
+        if self.counters:
+            lines.append('')
+            lines.append(f'{"Counter":<24} {"Count":>9}')
+            for counter, n in sorted(self.counters.items()):
+                lines.append(f'{counter:<24} {n:>9}')
+        return '\n'.join(lines)
+
+
+def get_profiler() -> Optional[Profiler]:
+    """
+    Returns the profiler activated with `profiling`, or None.
+    """
+    return _active_profiler.get()
+
+
+@contextlib.contextmanager
+def profiling(profiler: Optional[Profiler] = None):
+    """
+    Activates a profiler for the current context, so that the instrumented
+    functions of this package record their stages and counters in it.
+
+    Args:
+        profiler (Profiler): The profiler to activate. Defaults to a new one.
+
+    Yields:
+        Profiler: The active profiler.
+    """
+    if profiler is None:
+        profiler = Profiler()
+    token = _active_profiler.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _active_profiler.reset(token)
+
+
+def profile_stage(name: str, logger: 'BoundLogger' = None):
+    """
+    Returns a context manager timing a stage into the active profiler and, if a
+    logger is given, emitting a debug event with the duration of the stage. Does
+    nothing if neither is available.
+
+    Args:
+        name (str): The name of the stage.
+        logger (BoundLogger): A structlog logger.
+    """
+    profiler = _active_profiler.get()
+    if profiler is None and logger is None:
+        return _NULL_STAGE
+    return _Stage(name, profiler, logger)
+
+
+def count(counter: str, n: int = 1) -> None:
+    """
+    Increments a counter of the active profiler, if any.
+    """
+    profiler = _active_profiler.get()
+    if profiler is not None:
+        profiler.count(counter, n)
+
+
+def run_profiled(function, *args, **kwargs) -> tuple:
+    """
+    Calls the function with a new active profiler, e.g. in a worker process.
+
+    Returns:
+        tuple: The result of the function and the profile as created by
+        `Profiler.to_dict`.
+    """
+    with profiling() as profiler:
+        result = function(*args, **kwargs)
+    return result, profiler.to_dict()
+
+
+def map_ordered(task: Callable, items: Iterable, jobs: int = 1) -> Iterator:
+    """
+    Lazily applies a task to items, e.g. batches of inputs, and yields the results
+    in the order of the items. With `jobs > 1`, the task runs in a pool of worker
+    processes with at most `2 * jobs` items in flight, so memory stays bounded
+    while the workers are busy. The worker profiles are merged into the active
+    profiler, see `run_profiled`.
+
+    Args:
+        task (Callable): The picklable function called with a single item.
+        items (Iterable): The items, consumed lazily.
+        jobs (int): Number of worker processes.
+
+    Yields:
+        The results of the task.
+    """
+    if jobs <= 1:
+        for item in items:
+            yield task(item)
+        return
+    profiler = get_profiler()
+    if profiler is not None:
+        task = functools.partial(run_profiled, task)
+
+    def result(future):
+        if profiler is None:
+            return future.result()
+        task_result, profile = future.result()
+        profiler.merge(profile)
+        return task_result
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = collections.deque()
+        for item in items:
+            pending.append(executor.submit(task, item))
+            if len(pending) >= 2 * jobs:
+                yield result(pending.popleft())
+        while pending:
+            yield result(pending.popleft())
@@ -0,0 +1,174 @@
+from collections.abc import Iterable
+from typing import Optional, Union
+
+import numpy as np
+
+REGIMES = ('ideal', 'alternating', 'blocky', 'statistical')
+IDEAL_TOLERANCE = 0.1
+COMPOSITION_POINTS = 21
+
+ArrayLike = Union[float, Iterable[float], np.ndarray]
+
+
+def r_product(r1: ArrayLike, r2: ArrayLike) -> np.ndarray:
+    """
+    Computes the product of the reactivity ratios, `r1 * r2`.
+
+    Args:
+        r1 (array-like): The reactivity ratios of monomer 1.
+        r2 (array-like): The reactivity ratios of monomer 2.
+
+    Returns:
+        np.ndarray: The r-products, NaN where a ratio is missing.
+    """
+    return np.asarray(r1, dtype=np.float64) * np.asarray(r2, dtype=np.float64)
+
+
+def classify_regime(
+    r1: ArrayLike, r2: ArrayLike, tolerance: float = IDEAL_TOLERANCE
+) -> np.ndarray:
+    """
+    Classifies the copolymerization regime of pairs of reactivity ratios:
+
+    - `ideal`: `r1 * r2` is 1 within the relative `tolerance`, the monomers are
+      incorporated randomly according to the feed.
+    - `alternating`: both ratios are below 1, cross-propagation is preferred.
+    - `blocky`: both ratios are above 1, homo-propagation is preferred.
+    - `statistical`: one ratio is above and one below 1.
+
+    Args:
+        r1 (array-like): The reactivity ratios of monomer 1.
+        r2 (array-like): The reactivity ratios of monomer 2.
+        tolerance (float): The relative tolerance of the ideal regime.
+
+    Returns:
+        np.ndarray: The indices of the regimes into `REGIMES`, -1 where a ratio is
+        missing or negative.
+    """
+    r1 = np.asarray(r1, dtype=np.float64)
+    r2 = np.asarray(r2, dtype=np.float64)
+    product = r1 * r2
+    regimes = np.full(np.broadcast(r1, r2).shape, -1, dtype=np.int8)
+    valid = (r1 >= 0) & (r2 >= 0)
+    regimes[valid] = REGIMES.index('statistical')
+    regimes[valid & (r1 < 1) & (r2 < 1)] = REGIMES.index('alternating')
+    regimes[valid & (r1 > 1) & (r2 > 1)] = REGIMES.index('blocky')
+    regimes[valid & (np.abs(product - 1) <= tolerance)] = REGIMES.index('ideal')
+    return regimes
+
+
+def regime_names(regimes: np.ndarray) -> list[Optional[str]]:
+    """
+    Maps the regime indices of `classify_regime` onto their names.
+    """
+    return [REGIMES[regime] if regime >= 0 else None for regime in np.ravel(regimes)]
+
+
+def mayo_lewis(r1: ArrayLike, r2: ArrayLike, f1: ArrayLike) -> np.ndarray:
+    """
+    Computes the instantaneous copolymer composition with the Mayo-Lewis equation
+
+        F1 = (r1 f1^2 + f1 f2) / (r1 f1^2 + 2 f1 f2 + r2 f2^2)
+
+    for every pair of reactivity ratios and every feed fraction.
+
+    Args:
+        r1 (array-like): The `n` reactivity ratios of monomer 1.
+        r2 (array-like): The `n` reactivity ratios of monomer 2.
+        f1 (array-like): The `m` mole fractions of monomer 1 in the feed.
+
+    Returns:
+        np.ndarray: The `(n, m)` mole fractions of monomer 1 in the copolymer, NaN
+        where the composition is undefined.
+    """
+    r1 = np.asarray(r1, dtype=np.float64)[..., np.newaxis]
+    r2 = np.asarray(r2, dtype=np.float64)[..., np.newaxis]
+    f1 = np.asarray(f1, dtype=np.float64)
+    f2 = 1 - f1
+    numerator = r1 * f1**2 + f1 * f2
+    denominator = numerator + f1 * f2 + r2 * f2**2
+    return np.divide(
+        numerator,
+        denominator,
+        out=np.full(np.broadcast(numerator, denominator).shape, np.nan),
+        where=denominator != 0,
+    )
+
+
+def azeotropic_feed(r1: ArrayLike, r2: ArrayLike) -> np.ndarray:
+    """
+    Computes the feed fraction of monomer 1 at which the copolymer has the same
+    composition as the feed, `(1 - r2) / (2 - r1 - r2)`.
+
+    Returns:
+        np.ndarray: The azeotropic feed fractions, NaN where there is none, i.e.
+        unless both ratios are below or both are above 1.
+    """
+    r1 = np.asarray(r1, dtype=np.float64)
+    r2 = np.asarray(r2, dtype=np.float64)
+    exists = ((r1 < 1) & (r2 < 1)) | ((r1 > 1) & (r2 > 1))
+    denominator = np.where(exists, 2 - r1 - r2, 1.0)
+    return np.where(exists, (1 - r2) / denominator, np.nan)
+
+
+def analyze_reactivity_ratios(
+    r1: ArrayLike,
+    r2: ArrayLike,
+    feed_fractions: Optional[ArrayLike] = None,
+    tolerance: float = IDEAL_TOLERANCE,
+) -> dict[str, np.ndarray]:
+    """
+    Derives the r-products, copolymerization regimes, azeotropic feeds and
+    Mayo-Lewis composition curves of many reactions in vectorized operations.
+
+    Args:
+        r1 (array-like): The `n` reactivity ratios of monomer 1.
+        r2 (array-like): The `n` reactivity ratios of monomer 2.
+        feed_fractions (array-like): The `m` feed fractions of monomer 1 at which
+        the composition curves are evaluated. Defaults to `COMPOSITION_POINTS`
+        equidistant fractions from 0 to 1.
+        tolerance (float): The relative tolerance of the ideal regime.
+
+    Returns:
+        dict[str, np.ndarray]: The `r_product`, `regime` (see `classify_regime`)
+        and `azeotropic_feed` arrays of shape `(n,)`, the `feed_fraction` of shape
+        `(m,)` and the `copolymer_fraction` of shape `(n, m)`.
+    """
+    if feed_fractions is None:
+        feed_fractions = np.linspace(0, 1, COMPOSITION_POINTS)
+    feed_fractions = np.asarray(feed_fractions, dtype=np.float64)
+    return dict(
+        r_product=r_product(r1, r2),
+        regime=classify_regime(r1, r2, tolerance),
+        azeotropic_feed=azeotropic_feed(r1, r2),
+        feed_fraction=feed_fractions,
+        copolymer_fraction=mayo_lewis(r1, r2, feed_fractions),
+    )
+
+
+def reactivity_ratios_from_entries(
+    entries: Iterable[dict],
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Collects the first two reaction constants of archive entries into arrays for
+    `analyze_reactivity_ratios`.
+
+    Args:
+        entries (Iterable[dict]): The archive entries, i.e. dicts with a `data`
+        section.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The `r1` and `r2` arrays, NaN where a
+        constant is missing.
+    """
+    ratios = []
+    for entry in entries:
+        conditions = (entry.get('data') or dict()).get('reaction_conditions') or {}
+        constants = conditions.get('reaction_constants') or []
+        pair = [np.nan, np.nan]
+        for index, constant in enumerate(constants[:2]):
+            if constant.get('reaction_constant') is not None:
+                pair[index] = constant['reaction_constant']
+        ratios.append(pair)
+    ratios = np.array(ratios, dtype=np.float64).reshape(-1, 2)
+    return ratios[:, 0], ratios[:, 1]
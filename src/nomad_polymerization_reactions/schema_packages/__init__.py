@@ -1,9 +1,35 @@
-from nomad.config.models.plugins import SchemaPackageEntryPoint
+from typing import Optional
+
+from nomad.config.models.plugins import ParserEntryPoint, SchemaPackageEntryPoint
 from pydantic import Field
 
 
 class MySchemaPackageEntryPoint(SchemaPackageEntryPoint):
     parameter: int = Field(0, description='Custom configuration parameter')
+    substance_cache_enabled: bool = Field(
+        True, description='Cache PubChem substance lookups on disk.'
+    )
+    substance_cache_path: Optional[str] = Field(
+        None,
+        description=(
+            'Path of the SQLite substance cache. Defaults to a file in the NOMAD '
+            'tmp directory.'
+        ),
+    )
+    substance_cache_ttl: float = Field(
+        30 * 24 * 3600,
+        description='Seconds after which cached substances are looked up again.',
+    )
+    substance_cache_max_entries: int = Field(
+        100000, description='Maximum number of substances kept in the cache.'
+    )
+    composition_cache_max_entries: int = Field(
+        4096,
+        description=(
+            'Maximum number of polymer compositions reused across entries during '
+            'normalization. 0 disables the cache.'
+        ),
+    )
 
     def load(self):
         from nomad_polymerization_reactions.schema_packages.polymerization import (
@@ -17,3 +43,23 @@ polymerization = MySchemaPackageEntryPoint(
     name='Polymerization',
     description='Schema package defining FAIR datamodels for polymerization reactions.',
 )
+
+
+class PolymerizationJSONLParserEntryPoint(ParserEntryPoint):
+    def load(self):
+        from nomad_polymerization_reactions.schema_packages.parser import (  # noqa: PLC0415
+            PolymerizationJSONLParser,
+        )
+
+        return PolymerizationJSONLParser(**self.model_dump())
+
+
+jsonl_parser = PolymerizationJSONLParserEntryPoint(
+    name='PolymerizationJSONLParser',
+    description=(
+        'Parser creating one polymerization reaction entry per line of a JSONL file.'
+    ),
+    mainfile_name_re=r'.*\.jsonl',
+    mainfile_mime_re=r'(text|application)/.*',
+    mainfile_contents_re=r'"monomer1"',
+)
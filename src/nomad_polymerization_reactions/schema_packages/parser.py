@@ -0,0 +1,77 @@
+import json
+from collections.abc import Iterable
+from typing import (
+    TYPE_CHECKING,
+    Optional,
+    Union,
+)
+
+if TYPE_CHECKING:
+    from nomad.datamodel.datamodel import (
+        EntryArchive,
+    )
+    from structlog.stdlib import (
+        BoundLogger,
+    )
+
+from nomad.datamodel.datamodel import EntryMetadata
+from nomad.parsing import MatchingParser
+
+from nomad_polymerization_reactions.schema_packages.polymerization import (
+    PolymerizationReaction,
+)
+from nomad_polymerization_reactions.utils import build_archive_entry
+
+
+def _iter_lines(mainfile: str) -> Iterable[tuple[str, str]]:
+    with open(mainfile, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            if line.strip():
+                yield str(line_number), line
+
+
+class PolymerizationJSONLParser(MatchingParser):
+    """
+    Parses a JSONL file with one reaction per line in the flat LLM output format
+    described in `generate_archive_from_json`. Every non-empty line becomes a child
+    entry with a `PolymerizationReaction`, keyed by its line number.
+    """
+
+    creates_children = True
+
+    def is_mainfile(
+        self,
+        filename: str,
+        mime: str,
+        buffer: bytes,
+        decoded_buffer: str,
+        compression: Optional[str] = None,
+    ) -> Union[bool, Iterable[str]]:
+        if not super().is_mainfile(filename, mime, buffer, decoded_buffer, compression):
+            return False
+        try:
+            return [key for key, _ in _iter_lines(filename)] or False
+        except (OSError, UnicodeDecodeError):
+            return False
+
+    def parse(
+        self,
+        mainfile: str,
+        archive: 'EntryArchive',
+        logger: 'BoundLogger',
+        child_archives: Optional[dict[str, 'EntryArchive']] = None,
+    ) -> None:
+        child_archives = child_archives or dict()
+        for key, line in _iter_lines(mainfile):
+            child_archive = child_archives.get(key)
+            if child_archive is None:
+                continue
+            try:
+                entry = build_archive_entry(json.loads(line))
+                child_archive.data = PolymerizationReaction.m_from_dict(entry['data'])
+            except Exception as e:
+                logger.error('Could not parse reaction.', line=key, exc_info=e)
+                continue
+            if child_archive.metadata is None:
+                child_archive.metadata = EntryMetadata()
+            child_archive.metadata.entry_name = f'Reaction {key}'
@@ -1,5 +1,7 @@
+import functools
 from typing import (
     TYPE_CHECKING,
+    Optional,
 )
 
 if TYPE_CHECKING:
@@ -17,19 +19,91 @@ from nomad.datamodel.metainfo.annotations import ELNAnnotation, ELNComponentEnum
 from nomad.datamodel.metainfo.basesections import (
     Activity,
     CompositeSystem,
+    ElementalComposition,
     PubChemPureSubstanceSection,
     PublicationReference,
     PureSubstanceComponent,
 )
-from nomad.metainfo import Quantity, SchemaPackage, SubSection
+from nomad.metainfo import MEnum, Quantity, SchemaPackage, SubSection
 
-configuration = config.get_plugin_entry_point(
-    'nomad_polymerization_reactions.schema_packages:polymerization'
+from nomad_polymerization_reactions.composition import (
+    CompositionCache,
+    composition_key,
 )
+from nomad_polymerization_reactions.profiling import count, profile_stage
+from nomad_polymerization_reactions.reactivity import (
+    COMPOSITION_POINTS,
+    REGIMES,
+    ArrayLike,
+    analyze_reactivity_ratios,
+    mayo_lewis,
+)
+from nomad_polymerization_reactions.substances import (
+    PubChemLookupError,
+    lookup_substance,
+)
+
+
+@functools.cache
+def get_configuration():
+    """
+    Returns the `polymerization` schema package entry point. It is only looked up
+    on first use, so that importing the schema does not load the plugin
+    configuration.
+    """
+    return config.get_plugin_entry_point(
+        'nomad_polymerization_reactions.schema_packages:polymerization'
+    )
+
+
+@functools.cache
+def get_composition_cache() -> Optional[CompositionCache]:
+    """
+    Returns the process-wide cache of polymer compositions, or None if it is
+    disabled in the `polymerization` schema package entry point.
+    """
+    max_entries = getattr(get_configuration(), 'composition_cache_max_entries', 0)
+    if not max_entries:
+        return None
+    return CompositionCache(max_entries)
+
 
 m_package = SchemaPackage()
 
 
+class CachedPubChemPureSubstanceSection(PubChemPureSubstanceSection):
+    """
+    A `PubChemPureSubstanceSection` that resolves substances which are only given
+    by their name through the persistent substance cache before querying PubChem.
+    Substances with a PubChem link were already resolved and are not looked up.
+    """
+
+    def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger') -> None:
+        if self.pub_chem_link is not None:
+            # resolved beforehand, e.g. embedded by `resolve-substances`
+            super(PubChemPureSubstanceSection, self).normalize(archive, logger)
+            return
+        only_named = self.name and all(
+            getattr(self, quantity) is None
+            for quantity in self.m_def.all_quantities
+            if quantity != 'name'
+        )
+        if not only_named:
+            with profile_stage('substance_resolution', logger):
+                super().normalize(archive, logger)
+            return
+
+        try:
+            with profile_stage('substance_resolution', logger):
+                data = lookup_substance(self.name, logger)
+        except PubChemLookupError as e:
+            logger.warning('Could not resolve substance.', name=self.name, exc_info=e)
+            data = None
+        if data is not None:
+            self.m_update_from_dict(data)
+        super(PubChemPureSubstanceSection, self).normalize(archive, logger)
+
+
 class ReactionConstant(ArchiveSection):
     reaction_constant = Quantity(
         type=float, a_eln=ELNAnnotation(component=ELNComponentEnum.NumberEditQuantity)
@@ -45,7 +119,7 @@ class ReactionConditions(ArchiveSection):
         type=str,
         a_eln=ELNAnnotation(component=ELNComponentEnum.StringEditQuantity),
     )
-    solvent = SubSection(section_def=PubChemPureSubstanceSection)
+    solvent = SubSection(section_def=CachedPubChemPureSubstanceSection)
     method = Quantity(
         type=str, a_eln=ELNAnnotation(component=ELNComponentEnum.StringEditQuantity)
     )
@@ -70,12 +144,14 @@ class Monomer(PureSubstanceComponent):
         ),
     )
     pure_substance = SubSection(
-        section_def=PubChemPureSubstanceSection,
+        section_def=CachedPubChemPureSubstanceSection,
     )
 
     def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger') -> None:
         if self.substance_name and self.pure_substance is None:
-            self.pure_substance = PubChemPureSubstanceSection(name=self.substance_name)
+            self.pure_substance = CachedPubChemPureSubstanceSection(
+                name=self.substance_name
+            )
             self.pure_substance.normalize(archive, logger)
         if not self.smiles:
             self.smiles = self.pure_substance.smile
@@ -106,17 +182,189 @@ class PolymerizationReaction(Activity, Schema):
 
     reaction_conditions = SubSection(section_def=ReactionConditions)
 
+    monomer_1 = Quantity(
+        type=str,
+        description='Name of the first monomer, indexed for search.',
+    )
+    monomer_2 = Quantity(
+        type=str,
+        description='Name of the second monomer, indexed for search.',
+    )
+    monomer_1_smiles = Quantity(
+        type=str,
+        description='SMILES of the first monomer, indexed for search.',
+    )
+    monomer_2_smiles = Quantity(
+        type=str,
+        description='SMILES of the second monomer, indexed for search.',
+    )
+    r1 = Quantity(
+        type=float,
+        description='Reactivity ratio of the first monomer, indexed for search.',
+    )
+    r2 = Quantity(
+        type=float,
+        description='Reactivity ratio of the second monomer, indexed for search.',
+    )
+    r_product = Quantity(
+        type=float,
+        description='Product of the reactivity ratios r1 * r2.',
+        a_eln=ELNAnnotation(component=ELNComponentEnum.NumberEditQuantity),
+    )
+    derived_r_product = Quantity(
+        type=float,
+        description="""
+        Product of the reactivity ratios r1 * r2 derived from the reaction
+        constants, indexed for search.
+        """,
+    )
+    copolymerization_regime = Quantity(
+        type=MEnum(*REGIMES),
+        description="""
+        Copolymerization regime derived from the reactivity ratios: ideal if
+        r1 * r2 is close to 1, alternating if both ratios are below 1, blocky if
+        both are above 1 and statistical otherwise.
+        """,
+    )
+    azeotropic_feed_fraction = Quantity(
+        type=float,
+        description="""
+        Mole fraction of monomer 1 in the feed at which the copolymer has the
+        composition of the feed.
+        """,
+    )
+
+    def derive_reactivity(self, logger: 'BoundLogger') -> None:
+        """
+        Derives the reactivity ratios, the r-product, the copolymerization regime
+        and the azeotropic feed from the first two reaction constants. The derived
+        quantities are reset first, so that they follow edited reaction constants.
+        The reported `r_product` is never changed, only compared with the derived
+        one. The composition curve is not stored, see `copolymer_composition`.
+        """
+        for name in (
+            'r1',
+            'r2',
+            'derived_r_product',
+            'copolymerization_regime',
+            'azeotropic_feed_fraction',
+        ):
+            setattr(self, name, None)
+        if self.reaction_conditions is None:
+            return
+        constants = self.reaction_conditions.reaction_constants[:2]
+        for name, constant in zip(('r1', 'r2'), constants):
+            setattr(self, name, constant.reaction_constant)
+        if len(constants) < 2 or any(  # noqa: PLR2004
+            constant.reaction_constant is None for constant in constants
+        ):
+            return
+        analysis = analyze_reactivity_ratios(
+            [constants[0].reaction_constant], [constants[1].reaction_constant]
+        )
+        self.derived_r_product = float(analysis['r_product'][0])
+        if self.r_product is not None and not np.isclose(
+            self.r_product, self.derived_r_product, rtol=1e-2
+        ):
+            logger.warning(
+                'The r-product does not match the reaction constants.',
+                r_product=self.r_product,
+                derived_r_product=self.derived_r_product,
+            )
+        regime = analysis['regime'][0]
+        self.copolymerization_regime = REGIMES[regime] if regime >= 0 else None
+        azeotropic_feed = analysis['azeotropic_feed'][0]
+        if not np.isnan(azeotropic_feed):
+            self.azeotropic_feed_fraction = float(azeotropic_feed)
+
+    def copolymer_composition(
+        self, feed_fractions: Optional[ArrayLike] = None
+    ) -> Optional[tuple[np.ndarray, np.ndarray]]:
+        """
+        Computes the Mayo-Lewis composition curve from the reactivity ratios.
+
+        Args:
+            feed_fractions (array-like): The mole fractions of monomer 1 in the
+            feed. Defaults to `COMPOSITION_POINTS` equidistant fractions from 0
+            to 1.
+
+        Returns:
+            Optional[tuple[np.ndarray, np.ndarray]]: The feed fractions and the
+            mole fractions of monomer 1 in the copolymer, or `None` if the
+            reactivity ratios are not known.
+        """
+        if self.r1 is None or self.r2 is None:
+            return None
+        if feed_fractions is None:
+            feed_fractions = np.linspace(0, 1, COMPOSITION_POINTS)
+        feed_fractions = np.asarray(feed_fractions, dtype=np.float64)
+        return feed_fractions, mayo_lewis(self.r1, self.r2, feed_fractions)
+
     def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger') -> None:
         logger.info(
-            'PolymerizationReaction.normalize', parameter=configuration.parameter
+            'PolymerizationReaction.normalize', parameter=get_configuration().parameter
         )
+        self.derive_reactivity(logger)
+        self.derive_monomer_search_quantities()
         if self.monomers is not None:
             if self.polymer is None:
                 self.polymer = CompositeSystem()
             self.polymer.components = self.monomers
             self.polymer.elemental_composition = []
-            self.polymer.normalize(archive, logger)
+            with profile_stage('polymer_composition', logger):
+                self.normalize_polymer(archive, logger)
         super().normalize(archive, logger)
 
+    def derive_monomer_search_quantities(self) -> None:
+        """
+        Copies the names and SMILES of the first two monomers into scalar
+        quantities. Only scalar quantities of the entry are indexed as search
+        quantities, so that the app can filter and aggregate by monomer. The
+        quantities of removed monomers are cleared.
+        """
+        for number in (1, 2):
+            setattr(self, f'monomer_{number}', None)
+            setattr(self, f'monomer_{number}_smiles', None)
+        for number, monomer in enumerate(self.monomers[:2], start=1):
+            substance = monomer.pure_substance
+            name = monomer.substance_name or (substance.name if substance else None)
+            setattr(self, f'monomer_{number}', name)
+            setattr(self, f'monomer_{number}_smiles', monomer.smiles)
+
+    def normalize_polymer(self, archive: 'EntryArchive', logger: 'BoundLogger') -> None:
+        """
+        Normalizes the polymer. The elemental composition is computed from the
+        monomers only once per distinct monomer set and process, see
+        `get_composition_cache`, and otherwise filled in from the cache before the
+        normalization, which then only adds it to the results of the archive.
+        """
+        cache = get_composition_cache()
+        key = None if cache is None else composition_key(self.polymer.components)
+        composition = None if key is None else cache.get(key)
+        if composition is not None:
+            count('composition_cache_hits')
+            self.polymer.elemental_composition = [
+                ElementalComposition(
+                    element=element,
+                    atomic_fraction=atomic_fraction,
+                    mass_fraction=mass_fraction,
+                )
+                for element, atomic_fraction, mass_fraction in composition
+            ]
+        self.polymer.normalize(archive, logger)
+        if key is not None and composition is None:
+            count('composition_cache_misses')
+            cache.put(
+                key,
+                tuple(
+                    (
+                        section.element,
+                        section.atomic_fraction,
+                        section.mass_fraction,
+                    )
+                    for section in self.polymer.elemental_composition
+                ),
+            )
+
 
 m_package.__init_metainfo__()
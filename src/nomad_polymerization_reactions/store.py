@@ -0,0 +1,414 @@
+import json
+import math
+import sys
+from array import array
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from nomad_polymerization_reactions.units import temperature_to_kelvin
+from nomad_polymerization_reactions.utils import (
+    build_reaction_constants,
+    iter_records_from_nested_json,
+    read_archive,
+)
+
+if TYPE_CHECKING:
+    from structlog.stdlib import BoundLogger
+
+# The string columns of a `ReactionStore`, named as in `REACTION_COLUMNS` of the
+# table export.
+STRING_COLUMNS = (
+    'file',
+    'doi',
+    'method',
+    'solvent',
+    'polymerization_type',
+    'determination_method',
+)
+# The numeric columns of a `ReactionStore`. The temperature is in kelvin.
+NUMERIC_COLUMNS = ('temperature', 'r_product', 'logP')
+# The columns derived from the variable-length reaction constants.
+CONSTANT_COLUMNS = {
+    'r1': (0, 'values'),
+    'r2': (1, 'values'),
+    'r1_conf': (0, 'confs'),
+    'r2_conf': (1, 'confs'),
+}
+
+_NAN = float('nan')
+
+
+class StringTable:
+    """
+    Interns repeated strings: every distinct value is stored once and referred to
+    by its integer code. None is encoded as -1.
+    """
+
+    def __init__(self):
+        self.values = []
+        self._codes = dict()
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def code(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+    def value(self, code: int) -> Optional[str]:
+        return None if code < 0 else self.values[code]
+
+
+def _to_float(name: str, value) -> float:
+    if value is None:
+        return _NAN
+    try:
+        return float(value)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f'"{name}" is not a number: {value!r}.') from e
+
+
+def _to_value(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+class ReactionStore:
+    """
+    A compact, columnar in-memory store of reactions for batch processing. Instead
+    of one archive dict per reaction, the quantities of all reactions are kept in
+    typed arrays:
+
+    - the numeric quantities in float64 columns, with NaN for missing values,
+    - the repeated strings, e.g. methods, solvents and monomer names, as int32
+      codes into a shared `StringTable`,
+    - the variable-length reaction constants and monomers in flat arrays, with the
+      range of reaction `i` given by `offsets[i]:offsets[i + 1]`.
+
+    The store holds the quantities `build_archive_entry` maps the flat LLM output
+    onto, and `to_entry` builds the same archive entry again. Other quantities of
+    appended archive entries are dropped, numbers are returned as floats and NaN
+    is treated as a missing value.
+    """
+
+    def __init__(self):
+        self.strings = StringTable()
+        self.columns = {name: array('i') for name in STRING_COLUMNS}
+        self.columns.update((name, array('d')) for name in NUMERIC_COLUMNS)
+        self.constant_offsets = array('q', [0])
+        self.constant_values = array('d')
+        self.constant_confs = array('d')
+        self.monomer_offsets = array('q', [0])
+        self.monomer_names = array('i')
+        self.monomer_smiles = array('i')
+
+    def __len__(self) -> int:
+        return len(self.constant_offsets) - 1
+
+    def __iter__(self) -> Iterator[dict]:
+        for index in range(len(self)):
+            yield self.to_entry(index)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The approximate memory use of the arrays and interned strings in bytes.
+        """
+        arrays = [
+            *self.columns.values(),
+            self.constant_offsets,
+            self.constant_values,
+            self.constant_confs,
+            self.monomer_offsets,
+            self.monomer_names,
+            self.monomer_smiles,
+        ]
+        return sum(len(values) * values.itemsize for values in arrays) + sum(
+            sys.getsizeof(value) for value in self.strings.values
+        )
+
+    def _append(
+        self,
+        strings: Iterable[Optional[str]],
+        numbers: Iterable,
+        constants: list[dict],
+        monomers: Iterable[tuple[Optional[str], Optional[str]]],
+    ) -> None:
+        # convert everything first, so that a failing record leaves no partial row
+        numbers = [
+            _to_float(name, value) for name, value in zip(NUMERIC_COLUMNS, numbers)
+        ]
+        constants = [
+            (
+                _to_float('reaction_constant', constant.get('reaction_constant')),
+                _to_float(
+                    'reaction_constant_confi', constant.get('reaction_constant_confi')
+                ),
+            )
+            for constant in constants
+        ]
+        strings = [self.strings.code(value) for value in strings]
+        monomers = [
+            (self.strings.code(name), self.strings.code(smiles))
+            for name, smiles in monomers
+        ]
+        for name, code in zip(STRING_COLUMNS, strings):
+            self.columns[name].append(code)
+        for name, value in zip(NUMERIC_COLUMNS, numbers):
+            self.columns[name].append(value)
+        for value, conf in constants:
+            self.constant_values.append(value)
+            self.constant_confs.append(conf)
+        self.constant_offsets.append(len(self.constant_values))
+        for name, smiles in monomers:
+            self.monomer_names.append(name)
+            self.monomer_smiles.append(smiles)
+        self.monomer_offsets.append(len(self.monomer_names))
+
+    def append_record(self, record: dict) -> None:
+        """
+        Appends a reaction record in the flat LLM output format described in
+        `generate_archive_from_json`, without building its archive entry.
+
+        Args:
+            record (dict): The reaction record.
+
+        Raises:
+            ValueError: If a numeric quantity is not a number.
+        """
+        temperature = record.get('temperature')
+        if temperature is not None and record.get('temperature_unit') is not None:
+            temperature = temperature_to_kelvin(temperature, record['temperature_unit'])
+        monomers = []
+        iterator = 1
+        while record.get(f'monomer{iterator}') is not None:
+            monomers.append(
+                (record[f'monomer{iterator}'], record.get(f'monomer{iterator}_s'))
+            )
+            iterator += 1
+        self._append(
+            (
+                record.get('file'),
+                record.get('source'),
+                record.get('method'),
+                record.get('solvent'),
+                record.get('polymerization_type'),
+                record.get('determination_method'),
+            ),
+            (temperature, record.get('r-product'), record.get('logP')),
+            build_reaction_constants(
+                record.get('r_values'), record.get('conf_intervals')
+            ),
+            monomers,
+        )
+
+    def append_entry(self, entry: dict) -> None:
+        """
+        Appends an archive entry, i.e. a dict with the `data` section.
+
+        Args:
+            entry (dict): The archive entry.
+
+        Raises:
+            ValueError: If a numeric quantity is not a number.
+        """
+        data = entry.get('data') or dict()
+        conditions = data.get('reaction_conditions') or dict()
+        self._append(
+            (
+                data.get('data_file_name'),
+                (data.get('publication_reference') or dict()).get('DOI_number'),
+                conditions.get('method'),
+                (conditions.get('solvent') or dict()).get('name'),
+                conditions.get('polymerization_type'),
+                conditions.get('determination_method'),
+            ),
+            (conditions.get('temperature'), data.get('r_product'), data.get('logP')),
+            conditions.get('reaction_constants') or [],
+            (
+                (monomer.get('substance_name'), monomer.get('smiles'))
+                for monomer in data.get('monomers') or []
+            ),
+        )
+
+    def to_entry(self, index: int) -> dict:  # noqa: PLR0912
+        """
+        Builds the archive entry of a reaction, in the layout of
+        `build_archive_entry`.
+
+        Args:
+            index (int): The position of the reaction in the store.
+
+        Returns:
+            dict: The archive entry, i.e. a dict with the `data` section.
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('reaction index out of range')
+        value = self.strings.value
+        strings = {name: value(self.columns[name][index]) for name in STRING_COLUMNS}
+        numbers = {
+            name: _to_value(self.columns[name][index]) for name in NUMERIC_COLUMNS
+        }
+
+        reaction_conditions = dict()
+        if numbers['temperature'] is not None:
+            reaction_conditions['temperature'] = numbers['temperature']
+        if strings['solvent'] is not None:
+            reaction_conditions['solvent'] = dict(name=strings['solvent'])
+        for name in ('method', 'polymerization_type', 'determination_method'):
+            if strings[name] is not None:
+                reaction_conditions[name] = strings[name]
+        reaction_constants = []
+        for position in range(
+            self.constant_offsets[index], self.constant_offsets[index + 1]
+        ):
+            reaction_constant = dict()
+            constant = _to_value(self.constant_values[position])
+            if constant is not None:
+                reaction_constant['reaction_constant'] = constant
+            conf = _to_value(self.constant_confs[position])
+            if conf is not None:
+                reaction_constant['reaction_constant_confi'] = conf
+            reaction_constants.append(reaction_constant)
+        if reaction_constants:
+            reaction_conditions['reaction_constants'] = reaction_constants
+
+        monomers = []
+        for position in range(
+            self.monomer_offsets[index], self.monomer_offsets[index + 1]
+        ):
+            monomer = dict()
+            name = value(self.monomer_names[position])
+            if name is not None:
+                monomer['substance_name'] = name
+            smiles = value(self.monomer_smiles[position])
+            if smiles is not None:
+                monomer['smiles'] = smiles
+            monomers.append(monomer)
+
+        data = dict(
+            m_def='nomad_polymerization_reactions.schema_packages.polymerization.PolymerizationReaction'
+        )
+        if strings['file'] is not None:
+            data['data_file_name'] = strings['file']
+        if strings['doi'] is not None:
+            data['publication_reference'] = dict(DOI_number=strings['doi'])
+        if numbers['r_product'] is not None:
+            data['r_product'] = numbers['r_product']
+        if numbers['logP'] is not None:
+            data['logP'] = numbers['logP']
+        if monomers:
+            data['monomers'] = monomers
+        if reaction_conditions:
+            data['reaction_conditions'] = reaction_conditions
+        return dict(data=data)
+
+    def column(self, name: str):
+        """
+        Returns a column of the reaction table of `export_tables`, except for the
+        `reaction_id`.
+
+        Args:
+            name (str): The column name, e.g. `temperature`, `r1` or `solvent`.
+
+        Returns:
+            np.ndarray | list: The numeric columns as float64 arrays with NaN for
+            missing values, `n_monomers` as an int64 array and the string columns
+            as lists.
+        """
+        if name in STRING_COLUMNS:
+            return [self.strings.value(code) for code in self.columns[name]]
+        if name in NUMERIC_COLUMNS:
+            return np.frombuffer(self.columns[name], dtype=np.float64).copy()
+        offsets = np.frombuffer(self.constant_offsets, dtype=np.int64)
+        if name in CONSTANT_COLUMNS:
+            position, values = CONSTANT_COLUMNS[name]
+            values = np.frombuffer(getattr(self, f'constant_{values}'), np.float64)
+            column = np.full(len(self), np.nan)
+            present = np.diff(offsets) > position
+            column[present] = values[offsets[:-1][present] + position]
+            return column
+        if name == 'n_monomers':
+            return np.diff(np.frombuffer(self.monomer_offsets, dtype=np.int64))
+        raise KeyError(f'Unknown column "{name}".')
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict]) -> 'ReactionStore':
+        """
+        Builds a store from reaction records in the flat LLM output format.
+        """
+        store = cls()
+        for record in records:
+            store.append_record(record)
+        return store
+
+    @classmethod
+    def from_json_files(
+        cls, paths: Iterable[str], nested: bool = False
+    ) -> 'ReactionStore':
+        """
+        Builds a store from LLM output JSON files and generated `.archive.yaml` and
+        `.archive.json` files, in the order of `iter_entries`. Nested JSON files
+        are streamed with `iter_records_from_nested_json`.
+
+        Args:
+            paths (Iterable[str]): Paths of the JSON and archive files.
+            nested (bool): If True, the JSON files contain the nested
+            multi-reaction LLM output.
+
+        Returns:
+            ReactionStore: The store.
+        """
+        store = cls()
+        for path in paths:
+            if path.endswith(('.archive.yaml', '.archive.yml', '.archive.json')):
+                store.append_entry(read_archive(path))
+                continue
+            if nested:
+                for record in iter_records_from_nested_json(path):
+                    store.append_record(record)
+                continue
+            with open(path) as f:
+                store.append_record(json.load(f))
+        return store
+
+    @classmethod
+    def from_jsonl(
+        cls, corpus_path: str, logger: 'BoundLogger' = None
+    ) -> 'ReactionStore':
+        """
+        Builds a store from a JSONL corpus of flat reaction records. Blank lines
+        are ignored, malformed records are skipped with a warning.
+
+        Args:
+            corpus_path (str): Path of the JSONL file.
+            logger (BoundLogger): A structlog logger.
+
+        Returns:
+            ReactionStore: The store.
+        """
+        store = cls()
+        with open(corpus_path, 'rb') as f:
+            for line_number, line in enumerate(f, start=1):
+                if line.isspace():
+                    continue
+                try:
+                    store.append_record(json.loads(line))
+                except Exception as e:
+                    if logger is not None:
+                        logger.warning(
+                            'Skipped malformed record.',
+                            corpus=corpus_path,
+                            line=line_number,
+                            error=str(e),
+                        )
+        return store
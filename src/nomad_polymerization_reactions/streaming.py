@@ -0,0 +1,274 @@
+import contextlib
+import functools
+import io
+import json
+import os
+from collections.abc import Callable, Iterable, Iterator
+from typing import IO, Optional, Union
+
+from nomad_polymerization_reactions.bundles import DirectoryWriter, ZipBundleWriter
+from nomad_polymerization_reactions.profiling import profile_stage
+from nomad_polymerization_reactions.utils import (
+    build_archive_entry,
+    dump_archive,
+    iter_archives_from_nested_json,
+    nested_reaction_records,
+)
+
+# A source of LLM output: the path of a JSON file, an open text or binary stream
+# of a JSON document, or an already parsed JSON document.
+Source = Union[str, os.PathLike, IO, dict]
+
+
+def _source_name(source: Source, index: int) -> str:
+    if isinstance(source, dict):
+        return f'reaction_{index}'
+    path = (
+        source
+        if isinstance(source, (str, os.PathLike))
+        else getattr(source, 'name', None)
+    )
+    if not isinstance(path, (str, os.PathLike)):
+        return f'reaction_{index}'
+    return os.path.basename(os.fspath(path)).removesuffix('.json')
+
+
+def _stream_opener(stream: IO) -> Callable[[], IO]:
+    # The nested documents are read twice, so streams are rewound or, if that is
+    # not possible, buffered in memory. The stream is never closed.
+    if stream.seekable():
+        start = stream.tell()
+
+        def open_stream():
+            stream.seek(start)
+            return contextlib.nullcontext(stream)
+
+        return open_stream
+    content = stream.read()
+    if isinstance(content, bytes):
+        return functools.partial(io.BytesIO, content)
+    return functools.partial(io.StringIO, content)
+
+
+def _iter_source_entries(source: Source, name: str, nested: bool) -> Iterator[dict]:
+    if isinstance(source, dict):
+        if not nested:
+            yield build_archive_entry(source)
+            return
+        metadata = dict(source=source.get('source'))
+        for reaction in source.get('reactions') or []:
+            for record in nested_reaction_records(reaction, metadata):
+                yield build_archive_entry(record)
+        return
+
+    if isinstance(source, (str, os.PathLike)):
+        open_file = functools.partial(open, os.fspath(source), 'rb')
+    elif nested:
+        open_file = _stream_opener(source)
+    else:
+        open_file = functools.partial(contextlib.nullcontext, source)
+    if not nested:
+        with profile_stage('json_parse'), open_file() as f:
+            yield build_archive_entry(json.load(f))
+        return
+    yield from iter_archives_from_nested_json(f'{name}.json', open_file)
+
+
+def iter_archives(
+    sources: Union[Source, Iterable[Source]],
+    nested: bool = False,
+    on_error: Optional[Callable[[Source, Exception], None]] = None,
+) -> Iterator[tuple[str, dict]]:
+    """
+    Lazily converts LLM output into archive entries without writing any files.
+    Sources are read one at a time and nested documents one reaction at a time, so
+    memory use does not grow with the number of sources.
+
+    Every archive is named after its source: the name of the JSON file without
+    the `.json` extension, or `reaction_<n>` for parsed documents and unnamed
+    streams, with `n` counting the sources from 1. The archives of the nested LLM
+    output get a `_reaction_<n>` suffix like in `generate_archives_from_nested_json`.
+
+    Args:
+        sources (Source | Iterable[Source]): One source or an iterable of sources,
+        i.e. paths of JSON files, open streams of JSON documents or parsed JSON
+        documents.
+        nested (bool): If True, the sources contain the nested multi-reaction LLM
+        output.
+        on_error (Callable[[Source, Exception], None]): Called with the source and
+        the exception if a source can not be converted, instead of raising. The
+        remaining sources are still converted.
+
+    Yields:
+        tuple[str, dict]: The name of the archive and the archive entry.
+    """
+    if isinstance(sources, (str, os.PathLike, dict)) or hasattr(sources, 'read'):
+        sources = [sources]
+    for index, source in enumerate(sources, start=1):
+        name = _source_name(source, index)
+        try:
+            if not nested:
+                for entry in _iter_source_entries(source, name, nested):
+                    yield name, entry
+                continue
+            for iterator, entry in enumerate(
+                _iter_source_entries(source, name, nested), start=1
+            ):
+                yield f'{name}_reaction_{iterator}', entry
+        except Exception as e:
+            if on_error is None:
+                raise
+            on_error(source, e)
+
+
+class _WriterSink:
+    """
+    Serializes the archives and hands them to a writer of `bundles.py` as
+    `<name>.archive.<format>`.
+    """
+
+    def __init__(self, writer, archive_format: str = 'yaml'):
+        self.writer = writer
+        self.archive_format = archive_format
+
+    @property
+    def paths(self) -> list[str]:
+        return self.writer.paths
+
+    def add(self, name: str, entry: dict) -> None:
+        with profile_stage('serialization'):
+            content = dump_archive(entry, self.archive_format)
+        with profile_stage('file_write'):
+            self.writer.add(f'{name}.archive.{self.archive_format}', content)
+
+    def close(self) -> None:
+        self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class DirectorySink(_WriterSink):
+    """
+    Writes every archive into a file `<name>.archive.<format>` in a directory.
+
+    Args:
+        directory (str): The output directory. Defaults to the working directory.
+        archive_format (str): The archive format, `yaml` (default) or `json`.
+    """
+
+    def __init__(self, directory: str = '.', archive_format: str = 'yaml'):
+        super().__init__(DirectoryWriter(directory), archive_format)
+
+
+class ZipSink(_WriterSink):
+    """
+    Writes the archives as `<name>.archive.<format>` members into upload-ready zip
+    bundles, see `ZipBundleWriter`. `paths` lists the created bundles.
+
+    Args:
+        prefix (str): Path prefix of the bundles.
+        archive_format (str): The archive format, `yaml` (default) or `json`.
+        max_entries (int): Maximum number of archives per bundle.
+        max_bytes (int): Maximum size of a bundle in bytes.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        archive_format: str = 'yaml',
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        super().__init__(
+            ZipBundleWriter(prefix, max_entries, max_bytes), archive_format
+        )
+
+
+class _StreamSink:
+    """
+    Writes all archives into a single text file or stream. Only files opened by the
+    sink are closed by it.
+    """
+
+    def __init__(self, target: Union[str, IO]):
+        if isinstance(target, str):
+            self.stream = open(target, 'w')
+            self._owns_stream = True
+        else:
+            self.stream = target
+            self._owns_stream = False
+
+    def close(self) -> None:
+        if self._owns_stream and not self.stream.closed:
+            self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class YAMLStreamSink(_StreamSink):
+    """
+    Writes the archives as the documents of a single multi-document YAML file. The
+    name of each archive is given in a comment at the start of its document.
+
+    Args:
+        target (str | IO): The path of the file or an open text stream.
+    """
+
+    def add(self, name: str, entry: dict) -> None:
+        with profile_stage('serialization'):
+            content = dump_archive(entry, 'yaml')
+        with profile_stage('file_write'):
+            self.stream.write(f'--- # {name}\n{content}')
+
+
+class JSONLSink(_StreamSink):
+    """
+    Writes the archives into a JSONL file with one archive per line. Each line is an
+    object `{"name": <name>, "archive": <archive>}`, so the name of the archive is
+    kept next to it.
+
+    Args:
+        target (str | IO): The path of the file or an open text stream.
+    """
+
+    def add(self, name: str, entry: dict) -> None:
+        with profile_stage('serialization'):
+            content = json.dumps(dict(name=name, archive=entry), separators=(',', ':'))
+        with profile_stage('file_write'):
+            self.stream.write(f'{content}\n')
+
+
+def write_archives(
+    sources: Union[Source, Iterable[Source]],
+    sink,
+    nested: bool = False,
+    on_error: Optional[Callable[[Source, Exception], None]] = None,
+) -> int:
+    """
+    Converts LLM output with `iter_archives` and hands the archives to a sink one
+    at a time. The sink is not closed.
+
+    Args:
+        sources (Source | Iterable[Source]): The sources, see `iter_archives`.
+        sink: The sink receiving the archives through `add(name, entry)`, e.g. a
+        `DirectorySink`, `ZipSink`, `YAMLStreamSink` or `JSONLSink`.
+        nested (bool): If True, the sources contain the nested multi-reaction LLM
+        output.
+        on_error (Callable[[Source, Exception], None]): See `iter_archives`.
+
+    Returns:
+        int: The number of archives written.
+    """
+    archives = 0
+    for name, entry in iter_archives(sources, nested, on_error):
+        sink.add(name, entry)
+        archives += 1
+    return archives
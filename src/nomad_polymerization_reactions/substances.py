@@ -0,0 +1,372 @@
+import contextlib
+import functools
+import json
+import os
+import sqlite3
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Optional
+
+from nomad.config import config
+from nomad.datamodel.metainfo.basesections import PubChemPureSubstanceSection
+from nomad.datamodel.metainfo.basesections.v1 import (
+    pub_chem_add_throttle_header,
+    pub_chem_api_search,
+)
+
+if TYPE_CHECKING:
+    from structlog.stdlib import BoundLogger
+
+
+class PubChemLookupError(Exception):
+    """
+    Raised if PubChem could not be queried, e.g. because of throttling, as opposed
+    to PubChem not knowing the substance.
+    """
+
+
+class SubstanceCache:
+    """
+    A persistent, process-safe cache for substance lookups backed by SQLite.
+
+    Entries are keyed by the normalized substance name and hold the quantities of a
+    resolved `PubChemPureSubstanceSection`, or `None` if the substance could not be
+    found (negative result). Entries older than `ttl` seconds are treated as missing
+    and the least recently used entries are evicted once the cache holds more than
+    `max_entries` entries.
+    """
+
+    def __init__(
+        self, path: str, ttl: float = 30 * 24 * 3600, max_entries: int = 100000
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS substances ('
+                'key TEXT PRIMARY KEY, data TEXT, created REAL, accessed REAL)'
+            )
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS substances_accessed '
+                'ON substances (accessed)'
+            )
+
+    @contextlib.contextmanager
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    @staticmethod
+    def normalize_key(name: str) -> str:
+        """
+        Normalizes a substance name into a cache key. PubChem name searches are case
+        insensitive, so are the keys.
+        """
+        return ' '.join(name.split()).casefold()
+
+    def get(self, name: str) -> tuple[bool, Optional[dict]]:
+        """
+        Looks up a substance in the cache.
+
+        Args:
+            name (str): The substance name.
+
+        Returns:
+            tuple[bool, Optional[dict]]: Whether a valid entry exists and its data.
+            The data is None for cached negative results.
+        """
+        key = self.normalize_key(name)
+        now = time.time()
+        with self._connect() as connection:
+            row = connection.execute(
+                'SELECT data, created FROM substances WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return False, None
+            data, created = row
+            if now - created >= self.ttl:
+                connection.execute('DELETE FROM substances WHERE key = ?', (key,))
+                return False, None
+            connection.execute(
+                'UPDATE substances SET accessed = ? WHERE key = ?', (now, key)
+            )
+        return True, None if data is None else json.loads(data)
+
+    def set(self, name: str, data: Optional[dict]) -> None:
+        """
+        Stores a substance in the cache and evicts the least recently used entries
+        if the cache is full.
+
+        Args:
+            name (str): The substance name.
+            data (Optional[dict]): The quantities of the resolved substance or None
+            if the substance could not be found.
+        """
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO substances VALUES (?, ?, ?, ?)',
+                (
+                    self.normalize_key(name),
+                    None if data is None else json.dumps(data),
+                    now,
+                    now,
+                ),
+            )
+            (size,) = connection.execute('SELECT COUNT(*) FROM substances').fetchone()
+            if size > self.max_entries:
+                connection.execute(
+                    'DELETE FROM substances WHERE key IN ('
+                    'SELECT key FROM substances ORDER BY accessed ASC LIMIT ?)',
+                    (size - self.max_entries,),
+                )
+
+    def clear(self) -> None:
+        """
+        Removes all entries from the cache.
+        """
+        with self._connect() as connection:
+            connection.execute('DELETE FROM substances')
+
+    def __len__(self) -> int:
+        with self._connect() as connection:
+            (size,) = connection.execute('SELECT COUNT(*) FROM substances').fetchone()
+        return size
+
+
+@functools.cache
+def get_substance_cache() -> Optional[SubstanceCache]:
+    """
+    Returns the substance cache configured through the `polymerization` schema
+    package entry point, or None if the cache is disabled.
+    """
+    configuration = config.get_plugin_entry_point(
+        'nomad_polymerization_reactions.schema_packages:polymerization'
+    )
+    if not getattr(configuration, 'substance_cache_enabled', False):
+        return None
+    path = configuration.substance_cache_path or os.path.join(
+        config.fs.tmp, 'polymerization_substances.sqlite'
+    )
+    return SubstanceCache(
+        path,
+        ttl=configuration.substance_cache_ttl,
+        max_entries=configuration.substance_cache_max_entries,
+    )
+
+
+def _search_pubchem_cid(search: str, path: str) -> Optional[int]:
+    response = pub_chem_api_search(path=path, search=search)
+    if response.status_code == HTTPStatus.NOT_FOUND:
+        return None
+    if not response.ok:
+        raise PubChemLookupError(
+            pub_chem_add_throttle_header(
+                response,
+                f'PubChem search for {path}="{search}" failed with '
+                f'{response.status_code} {response.reason}.',
+            )
+        )
+    try:
+        cids = response.json()['IdentifierList']['CID']
+    except (KeyError, TypeError, ValueError) as e:
+        raise PubChemLookupError(
+            f'PubChem search for {path}="{search}" returned no CID list.'
+        ) from e
+    return cids[0] if cids else None
+
+
+def resolve_pubchem_substance(name: str, logger: 'BoundLogger') -> Optional[dict]:
+    """
+    Resolves a substance by its name with the PubChem PUG REST API. The CID is
+    searched by name and then by formula, like `PubChemPureSubstanceSection` does
+    for a substance only given by its name, but the responses are checked here, so
+    that a failed request is told apart from an unknown substance.
+
+    Args:
+        name (str): The substance name.
+        logger (BoundLogger): A structlog logger.
+
+    Raises:
+        PubChemLookupError: If a PubChem request failed, e.g. with 503 because of
+        throttling.
+
+    Returns:
+        Optional[dict]: The quantities of the resolved `PubChemPureSubstanceSection`
+        without the name, or None if PubChem does not know the substance, i.e. all
+        searches returned 404 or an empty CID list.
+    """
+    for path in ('name', 'fastformula'):
+        cid = _search_pubchem_cid(name, path)
+        if cid is not None:
+            break
+    else:
+        return None
+    section = PubChemPureSubstanceSection(name=name, pub_chem_cid=cid)
+    section.normalize(None, logger)
+    if section.pub_chem_link is None:
+        # only set once the properties of the CID were retrieved
+        raise PubChemLookupError(f'PubChem property request for CID {cid} failed.')
+    data = section.m_to_dict()
+    data.pop('name', None)
+    return data
+
+
+def lookup_substance(
+    name: str, logger: 'BoundLogger', cache: Optional[SubstanceCache] = None
+) -> Optional[dict]:
+    """
+    Resolves a substance by its name, consulting the cache first. Only found
+    substances and substances PubChem does not know are cached. Lookups that
+    raise, e.g. because PubChem is unreachable or throttles the requests, are not
+    cached.
+
+    Args:
+        name (str): The substance name.
+        logger (BoundLogger): A structlog logger.
+        cache (SubstanceCache): The cache to use. Defaults to the configured one.
+
+    Raises:
+        PubChemLookupError: See `resolve_pubchem_substance`.
+
+    Returns:
+        Optional[dict]: See `resolve_pubchem_substance`.
+    """
+    if cache is None:
+        cache = get_substance_cache()
+    if cache is not None:
+        found, data = cache.get(name)
+        if found:
+            return data
+    data = resolve_pubchem_substance(name, logger)
+    if cache is not None:
+        cache.set(name, data)
+    return data
+
+
+def collect_substance_names(entries: Iterable[dict]) -> list[str]:
+    """
+    Collects the distinct names of the monomers and solvents of several archive
+    entries which are only given by their name and hence resolved through the
+    substance cache during normalization.
+
+    Args:
+        entries (Iterable[dict]): The archive entries, i.e. dicts with a `data`
+        section as created by `generate_archive_from_json`.
+
+    Returns:
+        list[str]: The names in order of first occurrence, one per cache key.
+    """
+    names = dict()
+    for entry in entries:
+        data = entry.get('data') or dict()
+        for monomer in data.get('monomers') or []:
+            if monomer.get('substance_name') and monomer.get('pure_substance') is None:
+                names.setdefault(
+                    SubstanceCache.normalize_key(monomer['substance_name']),
+                    monomer['substance_name'],
+                )
+        solvent = (data.get('reaction_conditions') or dict()).get('solvent')
+        if solvent and solvent.get('name') and set(solvent) == {'name'}:
+            names.setdefault(
+                SubstanceCache.normalize_key(solvent['name']), solvent['name']
+            )
+    return list(names.values())
+
+
+def embed_substances(entry: dict, resolved: dict[str, Optional[dict]]) -> int:
+    """
+    Writes resolved substances into the monomers and the solvent of an archive
+    entry which are only given by their name, see `collect_substance_names`. The
+    normalization of the embedded substances does not look them up, so unlike the
+    substance cache, this also helps the normalization of uploads on a NOMAD server.
+
+    Args:
+        entry (dict): The archive entry, which is changed in place.
+        resolved (dict[str, Optional[dict]]): The resolved substances by name, see
+        `resolve_substances`.
+
+    Returns:
+        int: The number of embedded substances.
+    """
+    substances = {
+        SubstanceCache.normalize_key(name): data
+        for name, data in resolved.items()
+        if data is not None
+    }
+    data = entry.get('data') or dict()
+    embedded = 0
+    for monomer in data.get('monomers') or []:
+        name = monomer.get('substance_name')
+        substance = substances.get(SubstanceCache.normalize_key(name)) if name else None
+        if substance is not None and monomer.get('pure_substance') is None:
+            monomer['pure_substance'] = dict(name=name, **substance)
+            embedded += 1
+    solvent = (data.get('reaction_conditions') or dict()).get('solvent')
+    if solvent and solvent.get('name') and set(solvent) == {'name'}:
+        substance = substances.get(SubstanceCache.normalize_key(solvent['name']))
+        if substance is not None:
+            solvent.update(substance)
+            embedded += 1
+    return embedded
+
+
+def resolve_substances(
+    names: Iterable[str],
+    logger: 'BoundLogger',
+    cache: Optional[SubstanceCache] = None,
+    max_workers: int = 4,
+) -> dict[str, Optional[dict]]:
+    """
+    Resolves several substances concurrently and stores them in the substance cache,
+    so that the normalization of the entries using them does not block on PubChem.
+    Substances which are already cached are not looked up again and a failing
+    lookup does not stop the others.
+
+    Args:
+        names (Iterable[str]): The substance names.
+        logger (BoundLogger): A structlog logger.
+        cache (SubstanceCache): The cache to fill. Defaults to the configured one.
+        max_workers (int): The maximum number of concurrent lookups.
+
+    Returns:
+        dict[str, Optional[dict]]: The resolved substances by name, see
+        `resolve_pubchem_substance`. Names whose lookup failed are missing.
+    """
+    if cache is None:
+        cache = get_substance_cache()
+
+    resolved = dict()
+    pending = []
+    unique_names = dict()
+    for name in names:
+        unique_names.setdefault(SubstanceCache.normalize_key(name), name)
+    for name in unique_names.values():
+        found, data = cache.get(name) if cache is not None else (False, None)
+        if found:
+            resolved[name] = data
+        else:
+            pending.append(name)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(lookup_substance, name, logger, cache): name
+            for name in pending
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                resolved[name] = future.result()
+            except Exception as e:
+                logger.warning('Could not resolve substance.', name=name, exc_info=e)
+    return resolved
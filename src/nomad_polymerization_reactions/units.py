@@ -0,0 +1,97 @@
+import functools
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Union
+
+if TYPE_CHECKING:
+    import numpy as np
+
+_SAMPLE_TEMPERATURES = (0.0, 1.0, 1234.5)
+
+
+@functools.cache
+def get_temperature_transform(unit: str) -> tuple[float, float]:
+    """
+    Resolves a temperature unit string once and returns the affine transform
+    `kelvin = temperature * scale + offset` that pint applies for it.
+
+    The transform is taken from the converter of the pint unit definition, so the
+    converted values are identical to the ones of
+    `ureg.Quantity(temperature, unit).to('K')`. If the unit can not be mapped onto
+    a single converter, the transform is derived from two conversions with pint.
+
+    Args:
+        unit (str): The temperature unit, e.g. `°C`, `K` or `degF`.
+
+    Raises:
+        pint.errors.UndefinedUnitError: If the unit is not known to pint.
+        pint.errors.DimensionalityError: If the unit is not a temperature unit.
+
+    Returns:
+        tuple[float, float]: The `(scale, offset)` of the transform.
+    """
+    from nomad.units import ureg  # noqa: PLC0415
+
+    references = [
+        ureg.Quantity(temperature, unit).to('K').magnitude
+        for temperature in _SAMPLE_TEMPERATURES
+    ]
+
+    units = list(ureg.Quantity(1.0, unit).unit_items())
+    if len(units) == 1 and units[0][1] == 1:
+        converter = ureg._units[units[0][0]].converter
+        scale = getattr(converter, 'scale', None)
+        offset = getattr(converter, 'offset', 0)
+        if scale is not None and all(
+            temperature * scale + offset == reference
+            for temperature, reference in zip(_SAMPLE_TEMPERATURES, references)
+        ):
+            return scale, offset
+
+    return references[1] - references[0], references[0]
+
+
+def temperature_to_kelvin(temperature: float, unit: str) -> float:
+    """
+    Converts a temperature into kelvin using the cached transform of the unit.
+
+    Args:
+        temperature (float): The temperature.
+        unit (str): The temperature unit, e.g. `°C`, `K` or `degF`.
+
+    Returns:
+        float: The temperature in kelvin.
+    """
+    scale, offset = get_temperature_transform(unit)
+    if scale == 1 and offset == 0:
+        return temperature
+    return temperature * scale + offset
+
+
+def temperatures_to_kelvin(
+    temperatures: Union[Sequence[float], 'np.ndarray'],
+    units: Union[str, Sequence[str], 'np.ndarray'],
+) -> 'np.ndarray':
+    """
+    Converts an array of temperatures into kelvin in a single vectorized operation.
+    Every distinct unit string is resolved only once.
+
+    Args:
+        temperatures (array-like): The temperatures.
+        units (str | array-like): A single unit for all temperatures or one unit per
+        temperature.
+
+    Returns:
+        np.ndarray: The temperatures in kelvin as a float64 array.
+    """
+    import numpy as np  # noqa: PLC0415
+
+    temperatures = np.asarray(temperatures, dtype=np.float64)
+    if isinstance(units, str):
+        scale, offset = get_temperature_transform(units)
+        return temperatures * scale + offset
+
+    unique_units, inverse = np.unique(np.asarray(units, dtype=str), return_inverse=True)
+    transforms = np.array(
+        [get_temperature_transform(unit) for unit in unique_units], dtype=np.float64
+    ).reshape(-1, 2)
+    return temperatures * transforms[inverse, 0] + transforms[inverse, 1]
@@ -1,74 +1,97 @@
 import collections
+import functools
 import json
-from typing import TYPE_CHECKING
+import os
+from collections.abc import Callable, Iterator
+from typing import IO, TYPE_CHECKING, Optional
 
+import json_stream
 import yaml
-from nomad.units import ureg
+
+from nomad_polymerization_reactions.profiling import (
+    count,
+    get_profiler,
+    map_ordered,
+    profile_stage,
+)
+from nomad_polymerization_reactions.units import temperature_to_kelvin
 
 if TYPE_CHECKING:
     from structlog.stdlib import BoundLogger
 
 
-def generate_archive_from_json(  # noqa: PLR0912, PLR0915
-    filepath: str, same_dir_as_input: bool = False, logger: 'BoundLogger' = None
-):
+ARCHIVE_FORMATS = ('yaml', 'json')
+
+
+class OrderedDumper(getattr(yaml, 'CDumper', yaml.Dumper)):
     """
-    Generate an archive.yaml file from a JSON file coming from the LLM output.
-    Function expects a JSON of the following format:
-    ```json
-    {
-        "file": "paper_0.json",
-        "monomer1_s": "C=C",
-        "monomer2_s": "C=O",
-        "monomer1": "ethylene",
-        "monomer2": "carbon monoxide",
-        "r_values": {
-            "constant_1": 22.0,
-            "constant_2": 0.0
-        },
-        "conf_intervals": {
-            "constant_conf_1": null,
-            "constant_conf_2": null
-        },
-        "temperature": 20.0,
-        "temperature_unit": "\u00b0C",
-        "solvent": null,
-        "method": "bulk",
-        "r-product": null,
-        "source": "https://doi.org/10.1002/pol.1963.110010415"
-    }
-    ```
+    YAML dumper which keeps the order of `collections.OrderedDict` items. Uses the
+    libyaml based emitter if PyYAML was built with it.
+    """
+
+    def represent_dict(self, data):
+        return self.represent_mapping('tag:yaml.org,2002:map', data.items())
+
+
+OrderedDumper.add_representer(collections.OrderedDict, OrderedDumper.represent_dict)
+
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+# Increase whenever a change of the conversion changes the generated archives, so
+# that incremental conversions (see `manifest.py`) regenerate them.
+CONVERTER_VERSION = 2
+
+
+def get_archive_path(
+    filepath: str, same_dir_as_input: bool = False, archive_format: str = 'yaml'
+) -> str:
+    """
+    Returns the path of the archive file generated for the given JSON file.
 
     Args:
         filepath (str): Path to the JSON file.
-        same_dir_as_input (bool): If True, the output is created inside the same
-        directory as the input JSON file.
-        logger (BoundLogger): A structlog logger.
+        same_dir_as_input (bool): If True, the path points to the same directory as
+        the input JSON file, otherwise to the current working directory.
+        archive_format (str): The archive format, `yaml` or `json`.
 
     Returns:
-        dict: The dict used to generate archive.yaml file.
+        str: Path of the archive file.
     """
+    if archive_format not in ARCHIVE_FORMATS:
+        raise ValueError(f'Unknown archive format "{archive_format}".')
+    if not same_dir_as_input:
+        filepath = os.path.basename(filepath)
+    return f'{filepath.removesuffix(".json")}.archive.{archive_format}'
 
-    class OrderedDumper(yaml.Dumper):
-        def represent_dict(self, data):
-            return self.represent_mapping('tag:yaml.org,2002:map', data.items())
 
-    OrderedDumper.add_representer(collections.OrderedDict, OrderedDumper.represent_dict)
+def build_archive_entry(file_dict: dict) -> dict:  # noqa: PLR0912
+    """
+    Builds the archive entry for a single reaction record in the flat LLM output
+    format described in `generate_archive_from_json`.
 
-    with open(filepath) as f:
-        file_dict = json.load(f)
+    Args:
+        file_dict (dict): The reaction record.
 
+    Returns:
+        dict: The archive entry, i.e. a dict with the `data` section.
+    """
+    profiler = get_profiler()
+    if profiler is not None:
+        profiler.count('records')
+        profiler.count(
+            'skipped_fields', sum(value is None for value in file_dict.values())
+        )
     data_dict_ordered = collections.OrderedDict()
 
     reaction_conditions = dict()
     if file_dict.get('temperature', None) is not None:
         temperature = file_dict['temperature']
         if file_dict.get('temperature_unit', None) is not None:
-            temperature = (
-                ureg.Quantity(temperature, file_dict['temperature_unit'])
-                .to('K')
-                .magnitude
-            )
+            with profile_stage('unit_conversion'):
+                temperature = temperature_to_kelvin(
+                    temperature, file_dict['temperature_unit']
+                )
         reaction_conditions['temperature'] = temperature
     if file_dict.get('solvent', None) is not None:
         reaction_conditions['solvent'] = dict(name=file_dict['solvent'])
@@ -78,19 +101,25 @@ def generate_archive_from_json(  # noqa: PLR0912, PLR0915
         reaction_conditions['polymerization_type'] = file_dict['polymerization_type']
     if file_dict.get('determination_method', None) is not None:
         reaction_conditions['determination_method'] = file_dict['determination_method']
+    reaction_constants = build_reaction_constants(
+        file_dict.get('r_values', None), file_dict.get('conf_intervals', None)
+    )
+    if reaction_constants:
+        reaction_conditions['reaction_constants'] = reaction_constants
 
     monomers = []
-    iterator = 1
-    while True:
-        if file_dict.get(f'monomer{iterator}', None) is None:
-            break
-
-        monomer_dict = dict()
-        monomer_dict['substance_name'] = file_dict[f'monomer{iterator}']
-        if file_dict.get(f'monomer{iterator}_s', None) is not None:
-            monomer_dict['smiles'] = file_dict[f'monomer{iterator}_s']
-        monomers.append(monomer_dict)
-        iterator += 1
+    with profile_stage('monomer_extraction'):
+        iterator = 1
+        while True:
+            if file_dict.get(f'monomer{iterator}', None) is None:
+                break
+
+            monomer_dict = dict()
+            monomer_dict['substance_name'] = file_dict[f'monomer{iterator}']
+            if file_dict.get(f'monomer{iterator}_s', None) is not None:
+                monomer_dict['smiles'] = file_dict[f'monomer{iterator}_s']
+            monomers.append(monomer_dict)
+            iterator += 1
 
     data_dict_ordered['m_def'] = (
         'nomad_polymerization_reactions.schema_packages.polymerization.PolymerizationReaction'
@@ -111,12 +140,502 @@ def generate_archive_from_json(  # noqa: PLR0912, PLR0915
         data_dict_ordered['reaction_conditions'] = reaction_conditions
 
     data_dict = dict(data_dict_ordered)
-    entry = dict(data=data_dict)
-    if same_dir_as_input:
-        archive_path = filepath.replace('.json', '.archive.yaml')
-    else:
-        archive_path = filepath.split('/')[-1].replace('.json', '.archive.yaml')
-    with open(archive_path, 'w') as f:
-        yaml.dump(entry, f, Dumper=OrderedDumper, default_flow_style=False)
+    return dict(data=data_dict)
+
+
+def build_reaction_constants(
+    r_values: Optional[dict], conf_intervals: Optional[dict]
+) -> list[dict]:
+    """
+    Maps the `r_values` and `conf_intervals` of the LLM output onto a list of
+    `ReactionConstant` sections.
+
+    Args:
+        r_values (dict): Reaction constants keyed by `constant_<i>`.
+        conf_intervals (dict): Confidence intervals keyed by `constant_conf_<i>`.
+
+    Returns:
+        list[dict]: One dict per reaction constant, in the order of `i`.
+    """
+    r_values = r_values or dict()
+    conf_intervals = conf_intervals or dict()
+    reaction_constants = []
+    iterator = 1
+    while (
+        f'constant_{iterator}' in r_values
+        or f'constant_conf_{iterator}' in conf_intervals
+    ):
+        reaction_constant = dict()
+        if r_values.get(f'constant_{iterator}', None) is not None:
+            reaction_constant['reaction_constant'] = r_values[f'constant_{iterator}']
+        if conf_intervals.get(f'constant_conf_{iterator}', None) is not None:
+            reaction_constant['reaction_constant_confi'] = conf_intervals[
+                f'constant_conf_{iterator}'
+            ]
+        reaction_constants.append(reaction_constant)
+        iterator += 1
+    return reaction_constants
+
+
+def build_flat_record(entry: dict) -> dict:
+    """
+    Maps an archive entry back onto a reaction record in the flat LLM output
+    format described in `generate_archive_from_json`, i.e. the inverse of
+    `build_archive_entry`. The temperature is given in kelvin. Monomers without a
+    `substance_name` are named after their `pure_substance`, monomers without any
+    name are left out. Quantities the flat format has no field for, e.g. the ones
+    derived during normalization, are dropped.
+
+    Args:
+        entry (dict): The archive entry, i.e. a dict with the `data` section.
+
+    Returns:
+        dict: The reaction record.
+    """
+    data = entry.get('data') or dict()
+    conditions = data.get('reaction_conditions') or dict()
+    record = dict(file=data.get('data_file_name', None))
+
+    iterator = 1
+    for monomer in data.get('monomers') or []:
+        name = monomer.get('substance_name', None)
+        if name is None:
+            name = (monomer.get('pure_substance') or dict()).get('name', None)
+        if name is None:
+            continue
+        record[f'monomer{iterator}'] = name
+        record[f'monomer{iterator}_s'] = monomer.get('smiles', None)
+        iterator += 1
+
+    r_values = dict()
+    conf_intervals = dict()
+    for iterator, reaction_constant in enumerate(
+        conditions.get('reaction_constants') or [], start=1
+    ):
+        r_values[f'constant_{iterator}'] = reaction_constant.get(
+            'reaction_constant', None
+        )
+        conf_intervals[f'constant_conf_{iterator}'] = reaction_constant.get(
+            'reaction_constant_confi', None
+        )
+    record['r_values'] = r_values
+    record['conf_intervals'] = conf_intervals
+
+    temperature = conditions.get('temperature', None)
+    record['temperature'] = temperature
+    record['temperature_unit'] = None if temperature is None else 'K'
+    record['solvent'] = (conditions.get('solvent') or dict()).get('name', None)
+    record['method'] = conditions.get('method', None)
+    record['polymerization_type'] = conditions.get('polymerization_type', None)
+    record['determination_method'] = conditions.get('determination_method', None)
+    record['r-product'] = data.get('r_product', None)
+    record['logP'] = data.get('logP', None)
+    record['source'] = (data.get('publication_reference') or dict()).get(
+        'DOI_number', None
+    )
+    return record
+
+
+def dump_archive(entry: dict, archive_format: str = 'yaml') -> str:
+    """
+    Serializes the archive entry.
+
+    Args:
+        entry (dict): The archive entry.
+        archive_format (str): The archive format, `yaml` or `json`.
+
+    Returns:
+        str: The serialized archive.
+    """
+    if archive_format == 'json':
+        return json.dumps(entry, indent=2, sort_keys=True)
+    if archive_format == 'yaml':
+        return yaml.dump(entry, Dumper=OrderedDumper, default_flow_style=False)
+    raise ValueError(f'Unknown archive format "{archive_format}".')
+
+
+def write_archive(entry: dict, archive_path: str, logger: 'BoundLogger' = None) -> None:
+    """
+    Writes the archive entry into an archive.yaml or archive.json file, depending
+    on the extension of the path.
+
+    Args:
+        entry (dict): The archive entry.
+        archive_path (str): Path of the archive file.
+        logger (BoundLogger): A structlog logger.
+    """
+    archive_format = 'json' if archive_path.endswith('.json') else 'yaml'
+    with profile_stage('serialization', logger):
+        content = dump_archive(entry, archive_format)
+    with profile_stage('file_write', logger), open(archive_path, 'w') as f:
+        f.write(content)
+
+
+def read_archive(archive_path: str) -> dict:
+    """
+    Reads an archive.yaml or archive.json file.
+
+    Args:
+        archive_path (str): Path of the archive file.
+
+    Returns:
+        dict: The archive entry.
+    """
+    with open(archive_path) as f:
+        if archive_path.endswith('.json'):
+            return json.load(f)
+        return yaml.load(f, Loader=SafeLoader)
+
+
+def generate_archive_from_json(
+    filepath: str,
+    same_dir_as_input: bool = False,
+    logger: 'BoundLogger' = None,
+    archive_format: str = 'yaml',
+):
+    """
+    Generate an archive.yaml file from a JSON file coming from the LLM output.
+    Function expects a JSON of the following format:
+    ```json
+    {
+        "file": "paper_0.json",
+        "monomer1_s": "C=C",
+        "monomer2_s": "C=O",
+        "monomer1": "ethylene",
+        "monomer2": "carbon monoxide",
+        "r_values": {
+            "constant_1": 22.0,
+            "constant_2": 0.0
+        },
+        "conf_intervals": {
+            "constant_conf_1": null,
+            "constant_conf_2": null
+        },
+        "temperature": 20.0,
+        "temperature_unit": "\u00b0C",
+        "solvent": null,
+        "method": "bulk",
+        "r-product": null,
+        "source": "https://doi.org/10.1002/pol.1963.110010415"
+    }
+    ```
+
+    Args:
+        filepath (str): Path to the JSON file.
+        same_dir_as_input (bool): If True, the output is created inside the same
+        directory as the input JSON file.
+        logger (BoundLogger): A structlog logger.
+        archive_format (str): The archive format, `yaml` (default) or `json`.
+
+    Returns:
+        dict: The dict used to generate archive.yaml file.
+    """
+    with profile_stage('json_parse', logger), open(filepath) as f:
+        file_dict = json.load(f)
+
+    entry = build_archive_entry(file_dict)
+    write_archive(
+        entry, get_archive_path(filepath, same_dir_as_input, archive_format), logger
+    )
 
     return entry
+
+
+def nested_reaction_records(reaction: dict, metadata: dict) -> Iterator[dict]:
+    """
+    Flattens one reaction of the nested LLM output into one flat record per
+    reaction condition, see `iter_archives_from_nested_json` for the format.
+
+    Args:
+        reaction (dict): The reaction with its monomers and reaction conditions.
+        metadata (dict): The fields added to every record, e.g. the `file` and
+        the `source` of the document.
+
+    Yields:
+        dict: The reaction records in the flat LLM output format.
+    """
+    monomers = dict()
+    for iterator, monomer in enumerate(reaction.get('monomers') or [], start=1):
+        if isinstance(monomer, dict):
+            monomers[f'monomer{iterator}'] = monomer.get('name', None)
+            monomers[f'monomer{iterator}_s'] = monomer.get('smiles', None)
+        else:
+            monomers[f'monomer{iterator}'] = monomer
+
+    for condition in reaction.get('reaction_conditions') or []:
+        record = dict(metadata)
+        record.update(monomers)
+        record.update(condition)
+        record['r_values'] = condition.get('reaction_constants', None)
+        record['conf_intervals'] = condition.get('reaction_constant_conf', None)
+        yield record
+
+
+def iter_archives_from_nested_json(
+    filepath: str, open_file: Optional[Callable[[], IO]] = None
+) -> Iterator[dict]:
+    """
+    Lazily generates the archive entries for a JSON file containing the nested
+    multi-reaction LLM output. One entry is yielded per reaction and reaction
+    condition pair. Function expects a JSON of the following format:
+    ```json
+    {
+        "reactions": [
+            {
+                "monomers": ["Methacrylic acid", "Styrene"],
+                "reaction_conditions": [
+                    {
+                        "polymerization_type": "free radical",
+                        "solvent": "carbon tetrachloride",
+                        "method": "solvent",
+                        "temperature": 60.0,
+                        "temperature_unit": "\u00b0C",
+                        "reaction_constants": {
+                            "constant_1": 0.54,
+                            "constant_2": 0.06
+                        },
+                        "reaction_constant_conf": {
+                            "constant_conf_1": 0.01,
+                            "constant_conf_2": 0.03
+                        },
+                        "determination_method": "Kelen-Tudor"
+                    }
+                ]
+            }
+        ],
+        "source": "https://doi.org/10.1002/macp.1985.021860810",
+        "PDF_name": "The influence of molecular interaction on polymerization, 10",
+        "source_pdf": "paper01.pdf"
+    }
+    ```
+
+    The document is read with a streaming tokenizer in two passes: the first one
+    skips over the `reactions` to collect the document level metadata (which may
+    come after them), the second one materializes one reaction at a time. Memory
+    use therefore does not grow with the number of reactions.
+
+    Args:
+        filepath (str): Path to the JSON file.
+        open_file (Callable[[], IO]): Opens the JSON document as a text or binary
+        stream, e.g. a member of a zip file. Defaults to opening `filepath`.
+
+    Yields:
+        dict: The archive entries, in document order.
+    """
+    for record in iter_records_from_nested_json(filepath, open_file):
+        yield build_archive_entry(record)
+
+
+def iter_records_from_nested_json(
+    filepath: str, open_file: Optional[Callable[[], IO]] = None
+) -> Iterator[dict]:
+    """
+    Lazily flattens a JSON file containing the nested multi-reaction LLM output
+    into one reaction record in the flat LLM output format per reaction and
+    reaction condition pair, see `iter_archives_from_nested_json`.
+
+    Args:
+        filepath (str): Path to the JSON file.
+        open_file (Callable[[], IO]): Opens the JSON document as a text or binary
+        stream. Defaults to opening `filepath`.
+
+    Yields:
+        dict: The reaction records, in document order.
+    """
+    if open_file is None:
+        open_file = functools.partial(open, filepath)
+
+    metadata = dict(file=os.path.basename(filepath))
+    with open_file() as f:
+        for key, value in json_stream.load(f).items():
+            if key == 'source':
+                metadata['source'] = json_stream.to_standard_types(value)
+
+    with open_file() as f:
+        for key, value in json_stream.load(f).items():
+            if key != 'reactions':
+                continue
+            for streamed_reaction in value:
+                with profile_stage('json_parse'):
+                    reaction = json_stream.to_standard_types(streamed_reaction)
+                yield from nested_reaction_records(reaction, metadata)
+
+
+def generate_archives_from_nested_json(
+    filepath: str,
+    same_dir_as_input: bool = False,
+    logger: 'BoundLogger' = None,
+    archive_format: str = 'yaml',
+) -> list[str]:
+    """
+    Generate one archive.yaml file per reaction and reaction condition pair from a
+    JSON file containing the nested multi-reaction LLM output. See
+    `iter_archives_from_nested_json` for the expected format. The archives are
+    named `<input name>_reaction_<n>.archive.yaml` with `n` counting from 1.
+
+    Args:
+        filepath (str): Path to the JSON file.
+        same_dir_as_input (bool): If True, the output is created inside the same
+        directory as the input JSON file.
+        logger (BoundLogger): A structlog logger.
+        archive_format (str): The archive format, `yaml` (default) or `json`.
+
+    Returns:
+        list[str]: Paths of the generated archive files.
+    """
+    archive_paths = []
+    for archive_path, entry in iter_archive_entries(
+        filepath, same_dir_as_input, nested=True, archive_format=archive_format
+    ):
+        write_archive(entry, archive_path, logger)
+        archive_paths.append(archive_path)
+    return archive_paths
+
+
+def iter_archive_entries(
+    filepath: str,
+    same_dir_as_input: bool = False,
+    nested: bool = False,
+    archive_format: str = 'yaml',
+    open_file: Optional[Callable[[], IO]] = None,
+) -> Iterator[tuple[str, dict]]:
+    """
+    Lazily generates the archive entries of a JSON file together with the paths
+    their archives are written to by `generate_archive_from_json` and
+    `generate_archives_from_nested_json`, without writing them.
+
+    Args:
+        filepath (str): Path to the JSON file.
+        same_dir_as_input (bool): If True, the paths point to the same directory as
+        the input JSON file.
+        nested (bool): If True, the file contains the nested multi-reaction LLM
+        output.
+        archive_format (str): The archive format, `yaml` (default) or `json`.
+        open_file (Callable[[], IO]): Opens the JSON document as a text or binary
+        stream, e.g. its content read beforehand. Defaults to opening `filepath`.
+
+    Yields:
+        tuple[str, dict]: The archive path and the archive entry.
+    """
+    if open_file is None:
+        open_file = functools.partial(open, filepath)
+
+    archive_path = get_archive_path(filepath, same_dir_as_input, archive_format)
+    if not nested:
+        with profile_stage('json_parse'), open_file() as f:
+            file_dict = json.load(f)
+        yield archive_path, build_archive_entry(file_dict)
+        return
+
+    archive_suffix = f'.archive.{archive_format}'
+    archive_prefix = archive_path.removesuffix(archive_suffix)
+    for iterator, entry in enumerate(
+        iter_archives_from_nested_json(filepath, open_file), 1
+    ):
+        yield f'{archive_prefix}_reaction_{iterator}{archive_suffix}', entry
+
+
+def _generate_archives_task(
+    filepaths: list[str],
+    same_dir_as_input: bool,
+    nested: bool = False,
+    archive_format: str = 'yaml',
+) -> list[tuple[str, Optional[str], list[str]]]:
+    """
+    Converts the given JSON files one after the other and collects the outcome of
+    each conversion, i.e. the error and the created archive paths, instead of
+    raising.
+    """
+    results = []
+    for filepath in filepaths:
+        try:
+            if nested:
+                archive_paths = generate_archives_from_nested_json(
+                    filepath, same_dir_as_input, archive_format=archive_format
+                )
+            else:
+                generate_archive_from_json(
+                    filepath, same_dir_as_input, archive_format=archive_format
+                )
+                archive_paths = [
+                    get_archive_path(filepath, same_dir_as_input, archive_format)
+                ]
+            count('archives', len(archive_paths))
+            results.append((filepath, None, archive_paths))
+        except Exception as e:
+            count('failures')
+            results.append((filepath, f'{type(e).__name__}: {e}', []))
+    return results
+
+
+def run_archive_tasks(
+    filepaths: list[str],
+    same_dir_as_input: bool = False,
+    jobs: int = 1,
+    nested: bool = False,
+    archive_format: str = 'yaml',
+) -> list[tuple[str, Optional[str], list[str]]]:
+    """
+    Implements `generate_archives_from_json` and additionally returns the paths of
+    the archives created for every file as a third element of each result.
+    """
+    tasks = collections.OrderedDict()
+    for filepath in filepaths:
+        archive_path = get_archive_path(filepath, same_dir_as_input, archive_format)
+        tasks.setdefault(archive_path, []).append(filepath)
+
+    task = functools.partial(
+        _generate_archives_task,
+        same_dir_as_input=same_dir_as_input,
+        nested=nested,
+        archive_format=archive_format,
+    )
+    # the tasks are run in worker processes with at most `2 * jobs` in flight
+    task_results = map_ordered(task, tasks.values(), min(jobs, len(tasks)))
+
+    outcomes = dict()
+    for task_result in task_results:
+        for filepath, error, archive_paths in task_result:
+            outcomes[filepath] = (filepath, error, archive_paths)
+    return [outcomes[filepath] for filepath in filepaths]
+
+
+def generate_archives_from_json(  # noqa: PLR0913, PLR0917
+    filepaths: list[str],
+    same_dir_as_input: bool = False,
+    jobs: int = 1,
+    nested: bool = False,
+    logger: 'BoundLogger' = None,
+    archive_format: str = 'yaml',
+) -> list[tuple[str, Optional[str]]]:
+    """
+    Generate archive.yaml files from several JSON files coming from the LLM output.
+    A failing file does not stop the conversion of the remaining ones.
+
+    With `jobs > 1`, the files are spread over a pool of worker processes. Files
+    that write to the same archive path are always converted by the same worker in
+    input order, so the generated archives do not depend on the number of workers.
+
+    Args:
+        filepaths (list[str]): Paths to the JSON files.
+        same_dir_as_input (bool): If True, the output is created inside the same
+        directory as the input JSON file.
+        jobs (int): Number of worker processes. 1 converts the files in the current
+        process.
+        nested (bool): If True, the files contain the nested multi-reaction LLM
+        output and are converted with `generate_archives_from_nested_json`.
+        logger (BoundLogger): A structlog logger.
+        archive_format (str): The archive format, `yaml` (default) or `json`.
+
+    Returns:
+        list[tuple[str, Optional[str]]]: One `(filepath, error)` pair per input file,
+        in input order. `error` is None if the archive was created successfully.
+    """
+    results = []
+    for filepath, error, _ in run_archive_tasks(
+        filepaths, same_dir_as_input, jobs, nested, archive_format
+    ):
+        if error is not None and logger is not None:
+            logger.warning('Archive creation failed.', filepath=filepath, error=error)
+        results.append((filepath, error))
+    return results
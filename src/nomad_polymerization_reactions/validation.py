@@ -0,0 +1,278 @@
+import functools
+import json
+import os
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Optional
+
+from nomad_polymerization_reactions.utils import nested_reaction_records
+
+_NUMBER = (int, float)
+
+# The types of the fields of a flat LLM output record, see
+# `generate_archive_from_json`. Every field may also be null. Other fields are
+# ignored by the conversion and hence not validated.
+RECORD_FIELD_TYPES = {
+    'file': str,
+    'source': str,
+    'solvent': str,
+    'method': str,
+    'polymerization_type': str,
+    'determination_method': str,
+    'temperature': _NUMBER,
+    'temperature_unit': str,
+    'r-product': _NUMBER,
+    'logP': _NUMBER,
+    'r_values': dict,
+    'conf_intervals': dict,
+}
+
+# Temperature units accepted without asking pint. Other units are resolved with
+# pint once per unit string.
+TEMPERATURE_UNITS = frozenset(
+    (
+        'K',
+        'kelvin',
+        '°C',
+        'degC',
+        'celsius',
+        'degree_Celsius',
+        '°F',
+        'degF',
+        'fahrenheit',
+        'degree_Fahrenheit',
+    )
+)
+
+_MONOMER_KEY = re.compile(r'monomer(\d+)(_s)?')
+_CONSTANT_KEYS = dict(
+    r_values=re.compile(r'constant_(\d+)'),
+    conf_intervals=re.compile(r'constant_conf_(\d+)'),
+)
+_SMILES_CHARACTERS = re.compile(r'[A-Za-z0-9@+\-\[\]()=#$%/\\.:*~]+')
+_SMILES_BRACKET_ATOM = re.compile(r'\[[^\[\]]*\]')
+_SMILES_RING_BOND = re.compile(r'%\d{2}|\d')
+
+
+@dataclass
+class ValidationIssue:
+    """
+    A problem of a record: the file, the number of the record in a nested file,
+    the field, or None if the issue concerns the whole record or file, and the
+    reason.
+    """
+
+    file: str
+    record: Optional[int]
+    field: Optional[str]
+    reason: str
+
+    def to_dict(self) -> dict:
+        return dict(
+            file=self.file, record=self.record, field=self.field, reason=self.reason
+        )
+
+
+@dataclass
+class ValidationReport:
+    """
+    The outcome of `validate_files`.
+    """
+
+    records: int = 0
+    issues: list[ValidationIssue] = field(default_factory=list)
+
+    @property
+    def invalid_files(self) -> set[str]:
+        """
+        The files with at least one issue.
+        """
+        return {issue.file for issue in self.issues}
+
+    def to_dict(self) -> dict:
+        return dict(
+            records=self.records,
+            invalid_records=len({(issue.file, issue.record) for issue in self.issues}),
+            issues=[issue.to_dict() for issue in self.issues],
+        )
+
+
+@functools.cache
+def check_temperature_unit(unit: str) -> Optional[str]:
+    """
+    Checks that a unit is a temperature unit known to pint.
+
+    Returns:
+        Optional[str]: The reason why the unit is not accepted, or None.
+    """
+    if unit in TEMPERATURE_UNITS:
+        return None
+    from nomad_polymerization_reactions.units import (  # noqa: PLC0415
+        get_temperature_transform,
+    )
+
+    try:
+        get_temperature_transform(unit)
+    except Exception:
+        return f'"{unit}" is not a known temperature unit.'
+    return None
+
+
+def check_smiles(smiles: str) -> Optional[str]:
+    """
+    Checks the syntax of a SMILES string without parsing it: the characters, the
+    balance of the branches and bracket atoms and that every ring bond is closed.
+
+    Returns:
+        Optional[str]: The reason why the SMILES is not accepted, or None.
+    """
+    if not _SMILES_CHARACTERS.fullmatch(smiles):
+        return 'SMILES contains invalid characters.'
+    depth = 0
+    for character in smiles:
+        depth += (character == '(') - (character == ')')
+        if depth < 0:
+            break
+    if depth != 0:
+        return 'SMILES has unbalanced parentheses.'
+    organic = _SMILES_BRACKET_ATOM.sub('', smiles)
+    if '[' in organic or ']' in organic:
+        return 'SMILES has unbalanced brackets.'
+    ring_bonds = dict()
+    for ring_bond in _SMILES_RING_BOND.findall(organic):
+        ring_bonds[ring_bond] = not ring_bonds.get(ring_bond, False)
+    if any(ring_bonds.values()):
+        return 'SMILES has unclosed ring bonds.'
+    return None
+
+
+def _check_constants(name: str, constants: dict) -> Iterator[tuple[str, str]]:
+    for key, value in constants.items():
+        if not _CONSTANT_KEYS[name].fullmatch(key):
+            yield f'{name}.{key}', 'Unexpected key.'
+        elif value is not None and (
+            not isinstance(value, _NUMBER) or isinstance(value, bool)
+        ):
+            yield f'{name}.{key}', f'Expected a number, got {type(value).__name__}.'
+
+
+def _check_monomers(record: dict) -> Iterator[tuple[str, str]]:
+    names = set()
+    for key, value in record.items():
+        match = _MONOMER_KEY.fullmatch(key)
+        if match is None or value is None:
+            continue
+        if not isinstance(value, str):
+            yield key, f'Expected a string, got {type(value).__name__}.'
+        elif match.group(2) is None:
+            names.add(int(match.group(1)))
+        else:
+            reason = check_smiles(value)
+            if reason is not None:
+                yield key, reason
+            if record.get(f'monomer{match.group(1)}') is None:
+                yield key, 'SMILES without a monomer name.'
+    for number in sorted(names):
+        if number > 1 and number - 1 not in names:
+            yield (
+                f'monomer{number}',
+                f'Missing monomer{number - 1}, the monomer would be dropped.',
+            )
+
+
+def validate_record(record: dict) -> list[tuple[Optional[str], str]]:
+    """
+    Validates a record of the flat LLM output format against `RECORD_FIELD_TYPES`,
+    the temperature unit, the SMILES syntax of the monomers, the numbering of the
+    monomers and the keys and values of the reaction constants.
+
+    Args:
+        record (dict): The record.
+
+    Returns:
+        list[tuple[Optional[str], str]]: The field and reason of every issue.
+    """
+    if not isinstance(record, dict):
+        return [(None, f'Expected an object, got {type(record).__name__}.')]
+    issues = []
+    for key, types in RECORD_FIELD_TYPES.items():
+        value = record.get(key)
+        if value is not None and (
+            not isinstance(value, types) or isinstance(value, bool)
+        ):
+            issues.append((key, f'Unexpected type {type(value).__name__}.'))
+        elif key in _CONSTANT_KEYS and value is not None:
+            issues.extend(_check_constants(key, value))
+    unit = record.get('temperature_unit')
+    if record.get('temperature') is not None and isinstance(unit, str):
+        reason = check_temperature_unit(unit)
+        if reason is not None:
+            issues.append(('temperature_unit', reason))
+    issues.extend(_check_monomers(record))
+    return issues
+
+
+def iter_records(
+    path: str, nested: bool = False
+) -> Iterator[tuple[Optional[int], dict]]:
+    """
+    Reads the flat records of an LLM output JSON file together with their number,
+    counting the reaction conditions of a nested JSON file from 1, or None for a
+    flat JSON file.
+    """
+    with open(path, 'rb') as f:
+        document = json.load(f)
+    if not nested:
+        yield None, document
+        return
+    if not isinstance(document, dict) or not isinstance(
+        document.get('reactions', []), list
+    ):
+        raise ValueError('Expected an object with a list of reactions.')
+    metadata = dict(file=os.path.basename(path), source=document.get('source'))
+    iterator = 0
+    for reaction in document.get('reactions') or []:
+        if not isinstance(reaction, dict):
+            raise ValueError('Expected the reactions to be objects.')
+        for record in nested_reaction_records(reaction, metadata):
+            iterator += 1
+            yield iterator, record
+
+
+def validate_files(paths: Iterable[str], nested: bool = False) -> ValidationReport:
+    """
+    Validates the records of LLM output JSON files with `validate_record`. Files
+    which can not be read are reported as an issue without a field and do not stop
+    the validation of the remaining files.
+
+    Args:
+        paths (Iterable[str]): Paths of the JSON files.
+        nested (bool): If True, the files contain the nested multi-reaction LLM
+        output and every reaction condition is validated as a record.
+
+    Returns:
+        ValidationReport: The number of records and the issues.
+    """
+    report = ValidationReport()
+    for path in paths:
+        try:
+            for number, record in iter_records(path, nested):
+                report.records += 1
+                for field_name, reason in validate_record(record):
+                    report.issues.append(
+                        ValidationIssue(path, number, field_name, reason)
+                    )
+        except Exception as e:
+            report.issues.append(
+                ValidationIssue(path, None, None, f'{type(e).__name__}: {e}')
+            )
+    return report
+
+
+def write_validation_report(report: ValidationReport, path: str) -> None:
+    """
+    Writes the validation report into a JSON file.
+    """
+    with open(path, 'w') as f:
+        json.dump(report.to_dict(), f, indent=2)
@@ -0,0 +1,337 @@
+import fnmatch
+import os
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+
+from nomad_polymerization_reactions.bundles import (
+    ZipBundleWriter,
+    generate_archives_from_inputs,
+)
+from nomad_polymerization_reactions.manifest import (
+    ConversionManifest,
+    get_converter_id,
+)
+
+if TYPE_CHECKING:
+    from structlog.stdlib import BoundLogger
+
+# Bundles are written into this subdirectory of the output directory and only
+# moved into the output directory once they are complete.
+PARTIAL_DIRECTORY = '.partial'
+
+
+class DirectoryPoller:
+    """
+    Finds new and changed input files in a directory by comparing the size and
+    modification time of the files between polls. A file is only reported once
+    its size and modification time did not change between two polls, so that
+    files which are still being written are not read.
+
+    Args:
+        directory (str): The watched directory.
+        pattern (str): The glob pattern of the input file names.
+        recursive (bool): If True, the subdirectories are watched as well.
+        is_converted (Callable[[str], bool]): Called for every file the first time
+        it is seen. Files for which it returns True are not reported until they
+        change, e.g. files converted before a restart.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        pattern: str = '*.json',
+        recursive: bool = False,
+        is_converted: Optional[Callable[[str], bool]] = None,
+    ):
+        self.directory = directory
+        self.pattern = pattern
+        self.recursive = recursive
+        self.is_converted = is_converted
+        self._reported = dict()
+        self._pending = dict()
+
+    def _scan(self, directory: str) -> Iterable[os.DirEntry]:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_dir():
+                    if self.recursive:
+                        yield from self._scan(entry.path)
+                elif entry.is_file() and fnmatch.fnmatch(entry.name, self.pattern):
+                    yield entry
+
+    def poll(self) -> list[str]:
+        """
+        Scans the directory once.
+
+        Returns:
+            list[str]: The paths of the new or changed files which settled since
+            the previous poll, sorted by path.
+        """
+        settled = []
+        for entry in self._scan(self.directory):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            path = entry.path
+            fingerprint = (stat.st_size, stat.st_mtime_ns)
+            if self._reported.get(path) == fingerprint:
+                continue
+            if path not in self._reported and self.is_converted is not None:
+                if self.is_converted(path):
+                    self._reported[path] = fingerprint
+                    continue
+                self._reported[path] = None
+            if self._pending.get(path) == fingerprint:
+                del self._pending[path]
+                self._reported[path] = fingerprint
+                settled.append(path)
+            else:
+                self._pending[path] = fingerprint
+        return sorted(settled)
+
+
+class MicroBatcher:
+    """
+    Groups items into batches which are complete once they hold `max_size` items
+    or `max_wait` seconds passed since their first item was added.
+
+    Args:
+        max_size (int): Maximum number of items per batch.
+        max_wait (float): Maximum time in seconds an item waits for its batch.
+        clock (Callable[[], float]): Returns the current time in seconds.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 100,
+        max_wait: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self.clock = clock
+        self._items = []
+        self._started = None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, items: Iterable) -> None:
+        for item in items:
+            if item in self._items:
+                continue
+            if not self._items:
+                self._started = self.clock()
+            self._items.append(item)
+
+    def pop(self, flush: bool = False) -> list:
+        """
+        Removes and returns the next batch if it is complete or `flush` is True,
+        otherwise an empty list.
+        """
+        if not self._items:
+            return []
+        if (
+            not flush
+            and len(self._items) < self.max_size
+            and self.clock() - self._started < self.max_wait
+        ):
+            return []
+        batch = self._items[: self.max_size]
+        self._items = self._items[self.max_size :]
+        self._started = self.clock() if self._items else None
+        return batch
+
+
+@dataclass
+class WatchBatch:
+    """
+    The outcome of the conversion of a micro-batch by `convert_batch`.
+    """
+
+    name: str
+    results: list[tuple[str, Optional[str]]] = field(default_factory=list)
+    bundles: list[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+
+def convert_batch(  # noqa: PLR0913, PLR0917
+    inputs: list[str],
+    output_dir: str,
+    name: str,
+    nested: bool = False,
+    archive_format: str = 'yaml',
+    max_entries: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    jobs: int = 1,
+    base_dir: Optional[str] = None,
+    logger: 'BoundLogger' = None,
+) -> WatchBatch:
+    """
+    Converts a batch of JSON files into upload bundles `<name>_<n>.zip` with
+    `generate_archives_from_inputs`. The bundles are written into the
+    `PARTIAL_DIRECTORY` of the output directory and atomically moved into the
+    output directory once all of them are complete, so that consumers of the
+    output directory never see partial bundles.
+
+    Args:
+        inputs (list[str]): Paths of the JSON files.
+        output_dir (str): The directory receiving the bundles.
+        name (str): The name of the batch.
+        nested (bool): If True, the files contain the nested multi-reaction LLM
+        output.
+        archive_format (str): The archive format, `yaml` or `json`.
+        max_entries (int): Maximum number of archives per bundle.
+        max_bytes (int): Maximum size of a bundle in bytes.
+        jobs (int): Number of worker processes.
+        base_dir (str): If given, the archives are named by the path of their input
+        file relative to this directory, see `generate_archives_from_inputs`.
+        logger (BoundLogger): A structlog logger.
+
+    Returns:
+        WatchBatch: The results of the inputs and the paths of the bundles.
+    """
+    start = time.perf_counter()
+    partial_dir = os.path.join(output_dir, PARTIAL_DIRECTORY)
+    writer = ZipBundleWriter(os.path.join(partial_dir, name), max_entries, max_bytes)
+    try:
+        with writer:
+            results = generate_archives_from_inputs(
+                inputs,
+                writer,
+                jobs=jobs,
+                nested=nested,
+                archive_format=archive_format,
+                base_dir=base_dir,
+                logger=logger,
+            )
+    except BaseException:
+        for path in writer.paths:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    bundles = []
+    for path in writer.paths:
+        bundle = os.path.join(output_dir, os.path.basename(path))
+        os.replace(path, bundle)
+        bundles.append(bundle)
+    return WatchBatch(name, results, bundles, time.perf_counter() - start)
+
+
+def watch(  # noqa: PLR0913, PLR0917
+    directory: str,
+    output_dir: str,
+    nested: bool = False,
+    archive_format: str = 'yaml',
+    pattern: str = '*.json',
+    recursive: bool = False,
+    poll_interval: float = 1.0,
+    max_batch_size: int = 100,
+    max_batch_wait: float = 5.0,
+    max_entries: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    jobs: int = 1,
+    manifest_path: Optional[str] = None,
+    max_batches: Optional[int] = None,
+    on_batch: Optional[Callable[[WatchBatch], None]] = None,
+    logger: 'BoundLogger' = None,
+) -> int:
+    """
+    Watches a directory for new and changed JSON files of LLM output and converts
+    them in micro-batches into upload bundles, see `DirectoryPoller`,
+    `MicroBatcher` and `convert_batch`. A file is converted again whenever it
+    changes.
+
+    The archives are named by the path of their input file relative to the
+    watched directory, so that files with the same name in different
+    subdirectories do not collide in a bundle.
+
+    With a manifest, the converted files are recorded in a `ConversionManifest`
+    after every batch, and files which did not change since they were converted
+    are skipped after a restart. A bundle holds the archives of many files, so the
+    bundles are not recorded as outputs of the files and never become orphans.
+
+    Args:
+        directory (str): The watched directory.
+        output_dir (str): The directory receiving the bundles.
+        nested (bool): If True, the files contain the nested multi-reaction LLM
+        output.
+        archive_format (str): The archive format, `yaml` or `json`.
+        pattern (str): The glob pattern of the input file names.
+        recursive (bool): If True, the subdirectories are watched as well.
+        poll_interval (float): Time in seconds between two polls.
+        max_batch_size (int): Maximum number of files per batch.
+        max_batch_wait (float): Maximum time in seconds a settled file waits for
+        its batch.
+        max_entries (int): Maximum number of archives per bundle.
+        max_bytes (int): Maximum size of a bundle in bytes.
+        jobs (int): Number of worker processes converting a batch.
+        manifest_path (str): Path of the manifest file.
+        max_batches (int): Stop after this many batches. Runs until interrupted if
+        not given.
+        on_batch (Callable[[WatchBatch], None]): Called after every batch.
+        logger (BoundLogger): A structlog logger.
+
+    Returns:
+        int: The number of converted batches.
+    """
+    manifest = None if manifest_path is None else ConversionManifest(manifest_path)
+    # the archives are named differently than by `create-archive`, so files
+    # converted by either command are not up to date for the other one
+    converter = f'{get_converter_id(nested, archive_format)}/bundle'
+    poller = DirectoryPoller(
+        directory,
+        pattern,
+        recursive,
+        None
+        if manifest is None
+        else lambda path: manifest.is_up_to_date(path, converter, check_outputs=False),
+    )
+    batcher = MicroBatcher(max_batch_size, max_batch_wait)
+    # the start time keeps the bundle names of restarts apart
+    start = time.time()
+    prefix = (
+        f'batch_{time.strftime("%Y%m%dT%H%M%S", time.localtime(start))}'
+        f'{int(start * 1e6) % 1000000:06d}'
+    )
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        batcher.add(poller.poll())
+        inputs = batcher.pop()
+        if not inputs:
+            time.sleep(poll_interval)
+            continue
+        batches += 1
+        batch = convert_batch(
+            inputs,
+            output_dir,
+            f'{prefix}_{batches}',
+            nested,
+            archive_format,
+            max_entries,
+            max_bytes,
+            jobs,
+            directory,
+            logger,
+        )
+        if manifest is not None:
+            for path, error in batch.results:
+                if error is None and path in inputs:
+                    manifest.record(path, converter, [])
+            manifest.save()
+        if logger is not None:
+            logger.info(
+                'Converted micro-batch.',
+                batch=batch.name,
+                inputs=len(inputs),
+                bundles=len(batch.bundles),
+                elapsed=batch.elapsed,
+            )
+        if on_batch is not None:
+            on_batch(batch)
+    return batches
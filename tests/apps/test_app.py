@@ -1,3 +1,30 @@
+import importlib
+
+
 def test_importing_app():
     # this will raise an exception if pydantic model validation fails for the app
     from nomad_polymerization_reactions.apps.polymerization import app  # noqa: F401, I001
+
+
+def test_app_search_quantities():
+    from nomad_polymerization_reactions.apps import polymerization  # noqa: PLC0415
+
+    polymerization_module = importlib.import_module(
+        'nomad_polymerization_reactions.schema_packages.polymerization'
+    )
+    schema = polymerization_module.PolymerizationReaction.m_def
+    app = polymerization.app
+    search_quantities = [column.search_quantity for column in app.columns] + [
+        getattr(widget, 'x', widget).search_quantity for widget in app.dashboard.widgets
+    ]
+    for search_quantity in search_quantities:
+        path, _, section = search_quantity.partition('#')
+        if not section:
+            continue
+        assert section == schema.qualified_name()
+        definition = schema
+        names = path.split('.')[1:]
+        for name in names[:-1]:
+            definition = definition.all_sub_sections[name].sub_section
+        # only scalar quantities of custom schemas are indexed for search
+        assert definition.all_quantities[names[-1]].shape == []
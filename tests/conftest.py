@@ -0,0 +1,137 @@
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import pytest
+from nomad.datamodel.metainfo.basesections import v1 as basesections
+
+from nomad_polymerization_reactions import substances
+
+PUB_CHEM_COMPOUNDS = {
+    'styrene': {
+        'CID': 7501,
+        'Title': 'Styrene',
+        'IUPACName': 'styrene',
+        'MolecularFormula': 'C8H8',
+        'ExactMass': '104.062600255',
+        'MolecularWeight': '104.15',
+        'MonoisotopicMass': '104.062600255',
+        'InChI': 'InChI=1S/C8H8/c1-2-8-6-4-3-5-7-8/h2-7H,1H2',
+        'InChIKey': 'PPBRXRYQALVLMV-UHFFFAOYSA-N',
+        'SMILES': 'C=CC1=CC=CC=C1',
+        'CAS': '100-42-5',
+    },
+    'methacrylic acid': {
+        'CID': 4093,
+        'Title': 'Methacrylic Acid',
+        'IUPACName': '2-methylprop-2-enoic acid',
+        'MolecularFormula': 'C4H6O2',
+        'ExactMass': '86.036779430',
+        'MolecularWeight': '86.09',
+        'MonoisotopicMass': '86.036779430',
+        'InChI': 'InChI=1S/C4H6O2/c1-3(2)4(5)6/h1H2,2H3,(H,5,6)',
+        'InChIKey': 'CERQOIWHTDAKMF-UHFFFAOYSA-N',
+        'SMILES': 'CC(=C)C(=O)O',
+        'CAS': '79-41-4',
+    },
+    'chloroform': {
+        'CID': 6212,
+        'Title': 'Chloroform',
+        'IUPACName': 'chloroform',
+        'MolecularFormula': 'CHCl3',
+        'ExactMass': '117.914383',
+        'MolecularWeight': '119.37',
+        'MonoisotopicMass': '117.914383',
+        'InChI': 'InChI=1S/CHCl3/c2-1(3)4/h1H',
+        'InChIKey': 'HEDRZPFGACZZDS-UHFFFAOYSA-N',
+        'SMILES': 'C(Cl)(Cl)Cl',
+        'CAS': '67-66-3',
+    },
+}
+
+
+class PubChemStandIn:
+    """
+    A local stand-in for the PubChem PUG REST API serving `PUB_CHEM_COMPOUNDS` and
+    recording every request path it receives. While `failure` is set, every
+    request is answered with this status, e.g. 503 for throttling.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.failure = None
+        self._lock = threading.Lock()
+        by_cid = {compound['CID']: compound for compound in PUB_CHEM_COMPOUNDS.values()}
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with stand_in._lock:
+                    stand_in.requests.append(unquote(self.path))
+                if stand_in.failure is not None:
+                    self.send_response(stand_in.failure)
+                    self.end_headers()
+                    return
+                path = self.path.split('?')[0]
+                body = None
+                if match := re.fullmatch(r'/name/(.+)/cids/JSON', path):
+                    compound = PUB_CHEM_COMPOUNDS.get(unquote(match[1]).casefold())
+                    if compound is not None:
+                        body = {'IdentifierList': {'CID': [compound['CID']]}}
+                elif match := re.fullmatch(r'/cid/(\d+)/property/.+/JSON', path):
+                    compound = by_cid.get(int(match[1]))
+                    if compound is not None:
+                        body = {'PropertyTable': {'Properties': [compound]}}
+                elif match := re.fullmatch(r'/cid/(\d+)/synonyms/JSON', path):
+                    compound = by_cid.get(int(match[1]))
+                    if compound is not None:
+                        synonyms = [compound['Title'], compound['CAS']]
+                        body = {
+                            'InformationList': {'Information': [{'Synonym': synonyms}]}
+                        }
+                self.send_response(404 if body is None else 200)
+                self.send_header('Content-Type', 'application/json')
+                self.end_headers()
+                self.wfile.write(json.dumps(body or {}).encode())
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def searches(self, name=None):
+        return [
+            request
+            for request in self.requests
+            if request.startswith('/name/')
+            and (name is None or request == f'/name/{name}/cids/JSON')
+        ]
+
+
+@pytest.fixture
+def pub_chem(monkeypatch):
+    """
+    Redirects the PubChem requests of `PubChemPureSubstanceSection` to a local
+    stand-in without throttling.
+    """
+    stand_in = PubChemStandIn()
+    thread = threading.Thread(target=stand_in.server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(basesections, 'PUB_CHEM_PUG_PATH', stand_in.url)
+    monkeypatch.setattr(basesections, 'throttle_wait', lambda: None)
+    yield stand_in
+    stand_in.server.shutdown()
+    stand_in.server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def substance_cache(monkeypatch, tmp_path):
+    """
+    Uses a fresh substance cache in the temporary directory of each test.
+    """
+    cache = substances.SubstanceCache(str(tmp_path / 'substances.sqlite'))
+    monkeypatch.setattr(substances, 'get_substance_cache', lambda: cache)
+    return cache
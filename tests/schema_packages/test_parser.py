@@ -0,0 +1,32 @@
+import os.path
+
+from nomad.client import parse
+from nomad.parsing.parsers import match_parser
+
+TEST_FILE = os.path.join('tests', 'data', 'reactions.jsonl')
+
+
+def test_match_parser():
+    parser, keys = match_parser(TEST_FILE)
+    assert parser.creates_children
+    assert keys == ['1', '2', '4']
+
+
+def test_parse_jsonl():
+    main_archive, *child_archives = parse(TEST_FILE)
+    assert main_archive.data is None
+    reactions = {
+        archive.metadata.mainfile_key: archive.data for archive in child_archives
+    }
+
+    assert reactions['1'].monomers[0].substance_name == 'ethylene'
+    constants = reactions['1'].reaction_conditions.reaction_constants
+    assert [constant.reaction_constant for constant in constants] == [22.0, 0.0]
+    assert reactions['2'].monomers[1].smiles == 'C=C(C)C(=O)O'
+    assert reactions['2'].reaction_conditions.solvent.name == 'CC(C)O'
+    assert (
+        reactions['2'].publication_reference.DOI_number
+        == 'https://doi.org/10.1016/0014-3057(94)00111-1'
+    )
+    # the malformed line still gets an entry, but without data
+    assert reactions['4'] is None
@@ -1,6 +1,14 @@
+import importlib
 import os.path
 
+import pytest
+import structlog
+from nomad import utils
 from nomad.client import normalize_all, parse
+from nomad.datamodel import EntryArchive
+from structlog.testing import CapturingLogger
+
+from nomad_polymerization_reactions.composition import CompositionCache
 
 
 def test_schema():
@@ -19,3 +27,150 @@ def test_schema():
         == 'Synthesis and characterization of a rubber incorporated polyamideimide'
     )
     assert entry_archive.data.monomers[0].pure_substance.name == 'Methacrylic acid'
+
+
+def test_derive_reactivity():
+    polymerization = importlib.import_module(
+        'nomad_polymerization_reactions.schema_packages.polymerization'
+    )
+    reaction = polymerization.PolymerizationReaction.m_from_dict(
+        {
+            'reaction_conditions': {
+                'reaction_constants': [
+                    {'reaction_constant': 0.63, 'reaction_constant_confi': 0.03},
+                    {'reaction_constant': 0.25, 'reaction_constant_confi': 0.05},
+                ]
+            }
+        }
+    )
+    reaction.derive_reactivity(utils.get_logger(__name__))
+
+    assert (reaction.r1, reaction.r2) == (0.63, 0.25)  # noqa: PLR2004
+    assert reaction.r_product is None
+    assert reaction.derived_r_product == pytest.approx(0.1575)
+    assert reaction.copolymerization_regime == 'alternating'
+    assert reaction.azeotropic_feed_fraction == pytest.approx(0.75 / 1.12)
+    assert 'feed_fraction' not in reaction.m_to_dict()
+    feed_fraction, copolymer_fraction = reaction.copolymer_composition()
+    assert len(feed_fraction) == len(copolymer_fraction)
+    assert copolymer_fraction[0] == 0.0
+    assert copolymer_fraction[-1] == 1.0
+
+
+def test_derive_reactivity_after_edit():
+    polymerization = importlib.import_module(
+        'nomad_polymerization_reactions.schema_packages.polymerization'
+    )
+    reaction = polymerization.PolymerizationReaction.m_from_dict(
+        {
+            'reaction_conditions': {
+                'reaction_constants': [
+                    {'reaction_constant': 0.63},
+                    {'reaction_constant': 0.25},
+                ]
+            }
+        }
+    )
+    capturing = CapturingLogger()
+    logger = structlog.wrap_logger(capturing)
+    reaction.derive_reactivity(logger)
+
+    # the derived values follow the edited constants without a warning
+    constants = reaction.reaction_conditions.reaction_constants
+    constants[0].reaction_constant = 2.0
+    constants[1].reaction_constant = 0.25
+    reaction.derive_reactivity(logger)
+    assert (reaction.r1, reaction.r2) == (2.0, 0.25)  # noqa: PLR2004
+    assert reaction.r_product is None
+    assert reaction.derived_r_product == pytest.approx(0.5)
+    assert reaction.copolymerization_regime == 'statistical'
+    assert reaction.azeotropic_feed_fraction is None
+    assert capturing.calls == []
+
+    constants[1].reaction_constant = None
+    reaction.derive_reactivity(logger)
+    assert (reaction.r1, reaction.r2) == (2.0, None)  # noqa: PLR2004
+    assert reaction.derived_r_product is None
+    assert reaction.copolymerization_regime is None
+
+    reaction.r_product = 1.0
+    constants[1].reaction_constant = 0.25
+    reaction.derive_reactivity(logger)
+    assert [call.method_name for call in capturing.calls] == ['warning']
+
+
+def test_derive_monomer_search_quantities():
+    polymerization = importlib.import_module(
+        'nomad_polymerization_reactions.schema_packages.polymerization'
+    )
+    reaction = polymerization.PolymerizationReaction.m_from_dict(
+        {
+            'monomers': [
+                {'substance_name': 'styrene', 'smiles': 'C=Cc1ccccc1'},
+                {'pure_substance': {'name': 'acrylonitrile'}},
+                {'substance_name': 'butadiene'},
+            ]
+        }
+    )
+    reaction.derive_monomer_search_quantities()
+
+    assert (reaction.monomer_1, reaction.monomer_1_smiles) == ('styrene', 'C=Cc1ccccc1')
+    assert (reaction.monomer_2, reaction.monomer_2_smiles) == ('acrylonitrile', None)
+
+    # the quantities of removed monomers are cleared
+    reaction.monomers = reaction.monomers[1:2]
+    reaction.derive_monomer_search_quantities()
+    assert (reaction.monomer_1, reaction.monomer_1_smiles) == ('acrylonitrile', None)
+    assert (reaction.monomer_2, reaction.monomer_2_smiles) == (None, None)
+
+    reaction.monomers = []
+    reaction.derive_monomer_search_quantities()
+    assert reaction.monomer_1 is None
+
+
+def test_normalize_polymer_composition_cache(monkeypatch):
+    polymerization = importlib.import_module(
+        'nomad_polymerization_reactions.schema_packages.polymerization'
+    )
+
+    def normalize(cache):
+        monkeypatch.setattr(polymerization, 'get_composition_cache', lambda: cache)
+        reaction = polymerization.PolymerizationReaction.m_from_dict(
+            {
+                'monomers': [
+                    {
+                        'substance_name': name,
+                        'pure_substance': {
+                            'name': name,
+                            'pub_chem_cid': cid,
+                            'molecular_formula': formula,
+                        },
+                    }
+                    for name, cid, formula in (
+                        ('styrene', 7501, 'C8H8'),
+                        ('acrylonitrile', 7855, 'C3H3N'),
+                    )
+                ],
+            }
+        )
+        archive = EntryArchive(data=reaction)
+        reaction.polymer = polymerization.CompositeSystem()
+        reaction.polymer.components = reaction.monomers
+        reaction.normalize_polymer(archive, utils.get_logger(__name__))
+        polymer = reaction.polymer.m_to_dict()
+        polymer.pop('datetime')
+        return polymer, archive.results.material.m_to_dict()
+
+    reference = normalize(None)
+    assert [
+        section['element'] for section in reference[0]['elemental_composition']
+    ] == [
+        'C',
+        'H',
+        'N',
+    ]
+    cache = CompositionCache(max_entries=1)
+    assert normalize(cache) == reference
+    assert (cache.hits, cache.misses, len(cache)) == (0, 1, 1)
+    assert normalize(cache) == reference
+    assert cache.hits == 1
@@ -0,0 +1,73 @@
+import json
+import os
+import subprocess
+import sys
+
+BENCHMARKS = os.path.join(os.path.dirname(__file__), os.pardir, 'benchmarks')
+
+
+def test_synthetic_records_are_reproducible():
+    sys.path.insert(0, BENCHMARKS)
+    try:
+        from synthetic import generate_records  # noqa: PLC0415
+    finally:
+        sys.path.remove(BENCHMARKS)
+
+    records = list(generate_records(50, seed=1, missing=0.5))
+    assert records == list(generate_records(50, seed=1, missing=0.5))
+    assert records != list(generate_records(50, seed=2, missing=0.5))
+    assert {record['temperature_unit'] for record in records} == {'°C', 'K', '°F'}
+    assert any(record['temperature'] is None for record in records)
+
+
+def test_run_benchmarks(tmp_path):
+    output = tmp_path / 'results.json'
+    subprocess.run(
+        [
+            sys.executable,
+            os.path.join(BENCHMARKS, 'run_benchmarks.py'),
+            '--records',
+            '20',
+            '--stages',
+            'convert',
+            'serialize_json',
+            '--output',
+            str(output),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    with open(output) as f:
+        results = json.load(f)
+
+    assert results['config']['records'] == 20  # noqa: PLR2004
+    assert set(results['stages']) == {'convert', 'serialize_json'}
+    for result in results['stages'].values():
+        assert result['records'] == 20  # noqa: PLR2004
+        assert result['records_per_second'] > 0
+        assert result['latency_p50_ms'] <= result['latency_p99_ms']
+        assert result['peak_rss_bytes'] > 0
+
+
+def test_run_cli_benchmark(tmp_path):
+    output = tmp_path / 'results.json'
+    subprocess.run(
+        [
+            sys.executable,
+            os.path.join(BENCHMARKS, 'run_benchmarks.py'),
+            '--cli-records',
+            '5',
+            '--stages',
+            'cli',
+            '--output',
+            str(output),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    with open(output) as f:
+        result = json.load(f)['stages']['cli']
+
+    assert result['records'] == 5  # noqa: PLR2004
+    assert result['failed'] == 0
+    assert result['records_per_second'] > 0
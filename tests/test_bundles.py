@@ -0,0 +1,127 @@
+import glob
+import os
+import zipfile
+
+import pytest
+
+from nomad_polymerization_reactions.bundles import (
+    DirectoryWriter,
+    ZipBundleWriter,
+    generate_archives_from_inputs,
+    iter_json_inputs,
+)
+
+FLAT_FILES = sorted(glob.glob('tests/data/processed_reactions/*.json'))
+
+
+@pytest.fixture
+def input_zip(tmp_path):
+    path = tmp_path / 'inputs.zip'
+    with zipfile.ZipFile(path, 'w') as zip_file:
+        for file in FLAT_FILES:
+            zip_file.write(file, f'flat/{os.path.basename(file)}')
+        zip_file.writestr('flat/broken.json', '{')
+        zip_file.writestr('notes.txt', 'not a reaction')
+    return str(path)
+
+
+def _bundle_contents(paths):
+    contents = []
+    for path in paths:
+        with zipfile.ZipFile(path) as zip_file:
+            contents.append(
+                {name: zip_file.read(name).decode() for name in zip_file.namelist()}
+            )
+    return contents
+
+
+def test_iter_json_inputs(input_zip):
+    assert list(iter_json_inputs([FLAT_FILES[0], input_zip])) == [
+        (FLAT_FILES[0], None),
+        *[(input_zip, f'flat/{os.path.basename(file)}') for file in FLAT_FILES],
+        (input_zip, 'flat/broken.json'),
+    ]
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_zip_bundles_by_entries(input_zip, tmp_path, jobs):
+    with ZipBundleWriter(str(tmp_path / 'bundle'), max_entries=2) as writer:
+        results = generate_archives_from_inputs(
+            [input_zip], writer, jobs=jobs, batch_size=1
+        )
+
+    assert [name for name, _ in results] == [
+        f'{input_zip}/{member}' for _, member in iter_json_inputs([input_zip])
+    ]
+    assert [error is None for _, error in results] == [True, True, True, False]
+    assert writer.paths == [
+        str(tmp_path / 'bundle_1.zip'),
+        str(tmp_path / 'bundle_2.zip'),
+    ]
+
+    archives = {}
+    for bundle in _bundle_contents(writer.paths):
+        archives.update(bundle)
+    assert list(archives) == [
+        f'flat/{os.path.basename(file)}'.replace('.json', '.archive.yaml')
+        for file in FLAT_FILES
+    ]
+    for file in FLAT_FILES:
+        with open(file.replace('.json', '.archive.yaml')) as f:
+            assert (
+                archives[
+                    f'flat/{os.path.basename(file)}'.replace('.json', '.archive.yaml')
+                ]
+                == f.read()
+            )
+
+
+def test_zip_bundles_by_bytes(tmp_path):
+    max_bytes = 1000
+    with ZipBundleWriter(str(tmp_path / 'bundle'), max_bytes=max_bytes) as writer:
+        for index in range(20):
+            writer.add(
+                f'archive_{index}.archive.yaml', f'data:\n  index: {index}\n' * 5
+            )
+
+    assert len(writer.paths) > 1
+    for path in writer.paths:
+        assert os.path.getsize(path) <= max_bytes
+    contents = _bundle_contents(writer.paths)
+    assert sum(len(bundle) for bundle in contents) == 20  # noqa: PLR2004
+
+
+def test_nested_input_from_zip(tmp_path):
+    path = tmp_path / 'nested.zip'
+    with zipfile.ZipFile(path, 'w') as zip_file:
+        zip_file.write('tests/data/GPT4 Model Output.json', 'paper01.json')
+
+    writer = DirectoryWriter(str(tmp_path / 'out'))
+    results = generate_archives_from_inputs(
+        [str(path)], writer, nested=True, archive_format='json'
+    )
+
+    assert results == [(f'{path}/paper01.json', None)]
+    assert writer.paths == [
+        str(tmp_path / 'out' / f'paper01_reaction_{i}.archive.json')
+        for i in range(1, 6)
+    ]
+
+
+def test_zip_bundles_duplicate_member(tmp_path):
+    paths = []
+    for stem in ('first', 'second'):
+        path = tmp_path / f'{stem}.zip'
+        with zipfile.ZipFile(path, 'w') as zip_file:
+            zip_file.write(FLAT_FILES[0], 'flat/reaction.json')
+        paths.append(str(path))
+
+    with ZipBundleWriter(str(tmp_path / 'bundle')) as writer:
+        results = generate_archives_from_inputs(paths, writer)
+
+    assert results[0] == (f'{paths[0]}/flat/reaction.json', None)
+    assert results[1][0] == f'{paths[1]}/flat/reaction.json'
+    assert 'Duplicate archive name' in results[1][1]
+    assert [list(bundle) for bundle in _bundle_contents(writer.paths)] == [
+        ['flat/reaction.archive.yaml']
+    ]
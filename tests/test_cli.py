@@ -1,6 +1,12 @@
 import glob
+import json
 import os
+import shutil
+import subprocess
+import sys
+import zipfile
 
+import pytest
 from click.testing import CliRunner
 
 from nomad_polymerization_reactions.cli import cli
@@ -17,6 +23,41 @@ def test_cli_help():
     assert 'This is the entry point to nomad-polymerization-reactions' in result.output
 
 
+# Startup budget of `nomad-polymerization --help`: the heavy dependencies are only
+# imported by the commands that use them.
+HELP_TIME_BUDGET = 1.0
+HELP_MODULE_BUDGET = 400
+HEAVY_MODULES = ('nomad', 'numpy', 'pint', 'pyarrow', 'pydantic', 'structlog')
+
+HELP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from nomad_polymerization_reactions.cli import cli
+try:
+    cli(['--help'], standalone_mode=False)
+except SystemExit:
+    pass
+elapsed = time.perf_counter() - start
+print(json.dumps(dict(elapsed=elapsed, modules=sorted(sys.modules))))
+"""
+
+
+def test_cli_help_startup_budget():
+    result = subprocess.run(
+        [sys.executable, '-c', HELP_SCRIPT],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    startup = json.loads(result.stdout.splitlines()[-1])
+    heavy = [
+        module for module in startup['modules'] if module.split('.')[0] in HEAVY_MODULES
+    ]
+    assert heavy == []
+    assert len(startup['modules']) < HELP_MODULE_BUDGET
+    assert startup['elapsed'] < HELP_TIME_BUDGET
+
+
 def test_create_archive_help():
     result = invoke_cli(cli, ['create-archive', '--help'])
     assert result.exit_code == 0
@@ -34,3 +75,368 @@ def test_create_archive_success():
     )
     for file in files:
         os.remove(file.split('/')[-1].replace('.json', '.archive.yaml'))
+
+
+def test_create_archive_parallel(tmp_path):
+    files = []
+    for file in sorted(glob.glob('tests/data/processed_reactions/*.json')):
+        target = tmp_path / os.path.basename(file)
+        target.write_text(open(file).read())
+        files.append(str(target))
+    broken = tmp_path / 'broken.json'
+    broken.write_text('{"temperature": 20.0, "temperature_unit": "not-a-unit"}')
+    files.insert(1, str(broken))
+
+    result = invoke_cli(
+        cli, ['create-archive', '--same-dir-as-input', '--jobs', '2', *files]
+    )
+    assert result.exit_code == 0
+    assert 'Summary: 3 succeeded, 1 failed.' in result.output
+    assert f'FAILED {broken}' in result.output
+    for file in files:
+        if file != str(broken):
+            assert os.path.exists(file.replace('.json', '.archive.yaml'))
+    assert not os.path.exists(str(broken).replace('.json', '.archive.yaml'))
+
+
+def test_resolve_substances(pub_chem, substance_cache, tmp_path):
+    broken = tmp_path / 'broken.archive.yaml'
+    broken.write_text('data: [')
+    archives = glob.glob('tests/data/processed_reactions/*.archive.yaml')
+    result = invoke_cli(
+        cli, ['resolve-substances', '--jobs', '2', *archives, str(broken)]
+    )
+    assert result.exit_code == 0
+    assert 'Resolved 5 substances: 1 found, 4 not found, 0 failed.' in result.output
+    assert f'Skipped 1 unreadable archive(s):\n  {broken}: ' in result.output
+    assert len(substance_cache) == 5  # noqa: PLR2004
+
+    copies = []
+    for archive in archives:
+        copies.append(shutil.copy(archive, tmp_path))
+    result = invoke_cli(cli, ['resolve-substances', '--write-archives', *copies])
+    assert result.exit_code == 0
+    assert 'Wrote the resolved substances into 1 archive(s).' in result.output
+    assert sum('pub_chem_cid' in open(copy).read() for copy in copies) == 1
+
+
+def test_create_archive_json_format(tmp_path):
+    target = tmp_path / 'paper_0_reaction_1.json'
+    target.write_text(
+        open('tests/data/processed_reactions/paper_0_reaction_1.json').read()
+    )
+    result = invoke_cli(
+        cli, ['create-archive', '--same-dir-as-input', '--format', 'json', str(target)]
+    )
+    assert result.exit_code == 0
+    assert os.path.exists(tmp_path / 'paper_0_reaction_1.archive.json')
+    assert not os.path.exists(tmp_path / 'paper_0_reaction_1.archive.yaml')
+
+
+def test_create_archive_zip_bundles(tmp_path):
+    input_zip = tmp_path / 'inputs.zip'
+    with zipfile.ZipFile(input_zip, 'w') as zip_file:
+        for file in glob.glob('tests/data/processed_reactions/*.json'):
+            zip_file.write(file, os.path.basename(file))
+
+    result = invoke_cli(
+        cli,
+        [
+            'create-archive',
+            '--output-zip',
+            str(tmp_path / 'upload.zip'),
+            '--max-entries-per-zip',
+            '2',
+            str(input_zip),
+        ],
+    )
+    assert result.exit_code == 0
+    assert 'Summary: 3 succeeded, 0 failed.' in result.output
+    assert 'Created 2 zip bundle(s):' in result.output
+    assert os.path.exists(tmp_path / 'upload_1.zip')
+    assert os.path.exists(tmp_path / 'upload_2.zip')
+
+
+def test_create_archive_manifest(tmp_path):
+    target = tmp_path / 'paper_0_reaction_1.json'
+    target.write_text(
+        open('tests/data/processed_reactions/paper_0_reaction_1.json').read()
+    )
+    args = [
+        'create-archive',
+        '--same-dir-as-input',
+        '--manifest',
+        str(tmp_path / 'manifest.json'),
+        str(target),
+    ]
+    assert 'Summary: 1 succeeded, 0 failed.' in invoke_cli(cli, args).output
+    result = invoke_cli(cli, args)
+    assert 'Skipped 1 unchanged file(s).' in result.output
+    assert 'Summary: 0 succeeded, 0 failed.' in result.output
+
+
+def test_create_archive_profile(tmp_path):
+    input_zip = tmp_path / 'inputs.zip'
+    with zipfile.ZipFile(input_zip, 'w') as zip_file:
+        for file in glob.glob('tests/data/processed_reactions/*.json'):
+            zip_file.write(file, os.path.basename(file))
+
+    result = invoke_cli(
+        cli,
+        [
+            'create-archive',
+            '--profile',
+            '--output-zip',
+            str(tmp_path / 'upload.zip'),
+            str(input_zip),
+        ],
+    )
+    assert result.exit_code == 0
+    assert 'Profile (' in result.output
+    report = result.output.split('Profile (')[1]
+    for stage in ('json_parse', 'serialization', 'file_write'):
+        assert stage in report
+    assert 'records                          3' in report
+
+
+def test_export_tables(tmp_path):
+    pytest.importorskip('pyarrow')
+    files = glob.glob('tests/data/processed_reactions/*.json')
+    result = invoke_cli(cli, ['export-tables', '--output-dir', str(tmp_path), *files])
+    assert result.exit_code == 0
+    assert f'Wrote {len(files)} rows to {tmp_path / "reactions.parquet"}.' in (
+        result.output
+    )
+    assert os.path.exists(tmp_path / 'monomers.parquet')
+
+
+def test_create_archive_duplicates(tmp_path):
+    files = []
+    for index in range(2):
+        target = tmp_path / f'paper_5_reaction_{index}.json'
+        target.write_text(
+            open('tests/data/processed_reactions/paper_5_reaction_1.json').read()
+        )
+        files.append(str(target))
+    report = tmp_path / 'duplicates.json'
+
+    result = invoke_cli(
+        cli,
+        [
+            'create-archive',
+            '--same-dir-as-input',
+            '--duplicates',
+            'skip',
+            '--duplicates-report',
+            str(report),
+            *files,
+        ],
+    )
+    assert result.exit_code == 0
+    assert 'Found 1 duplicate cluster(s):' in result.output
+    assert 'Skipped 1 duplicate archive(s).' in result.output
+    assert os.path.exists(files[0].replace('.json', '.archive.yaml'))
+    assert not os.path.exists(files[1].replace('.json', '.archive.yaml'))
+    (cluster,) = json.loads(report.read_text())
+    assert len(cluster['members']) == 2  # noqa: PLR2004
+
+    result = invoke_cli(cli, ['find-duplicates', *files])
+    assert result.exit_code == 0
+    assert 'Found 1 duplicate cluster(s):' in result.output
+    assert f'    {files[1]}' in result.output
+
+    result = invoke_cli(cli, ['create-archive', '--duplicates-report', 'x', *files])
+    assert result.exit_code != 0
+
+    # the temperatures differ by 0.2 K, which only splits the cluster with decimals
+    record = json.loads(open(files[1]).read())
+    record['temperature'] = 70.2
+    with open(files[1], 'w') as f:
+        json.dump(record, f)
+    result = invoke_cli(
+        cli,
+        [
+            'create-archive',
+            '--same-dir-as-input',
+            '--duplicates',
+            'skip',
+            '--temperature-decimals',
+            '1',
+            *files,
+        ],
+    )
+    assert result.exit_code == 0
+    assert 'Found 0 duplicate cluster(s):' in result.output
+    assert os.path.exists(files[1].replace('.json', '.archive.yaml'))
+
+    result = invoke_cli(cli, ['create-archive', '--temperature-decimals', '1', *files])
+    assert result.exit_code != 0
+
+
+def test_create_archive_pipeline(tmp_path):
+    files = []
+    for file in sorted(glob.glob('tests/data/processed_reactions/*.json')):
+        target = tmp_path / os.path.basename(file)
+        target.write_text(open(file).read())
+        files.append(str(target))
+
+    result = invoke_cli(
+        cli,
+        ['create-archive', '--same-dir-as-input', '--pipeline', '-j', '2', *files],
+    )
+    assert result.exit_code == 0
+    assert f'Summary: {len(files)} succeeded, 0 failed.' in result.output
+    assert 'Pipeline throughput:' in result.output
+    for file in files:
+        assert os.path.exists(file.replace('.json', '.archive.yaml'))
+
+    result = invoke_cli(
+        cli, ['create-archive', '--pipeline', '--duplicates', 'skip', *files]
+    )
+    assert result.exit_code != 0
+
+
+def test_create_archive_validate(tmp_path):
+    files = []
+    for file in sorted(glob.glob('tests/data/processed_reactions/*.json')):
+        target = tmp_path / os.path.basename(file)
+        target.write_text(open(file).read())
+        files.append(str(target))
+    invalid = tmp_path / 'invalid.json'
+    invalid.write_text('{"temperature": 20.0, "temperature_unit": "not-a-unit"}')
+    files.insert(1, str(invalid))
+    report = tmp_path / 'validation.json'
+
+    result = invoke_cli(cli, ['validate', '--output', str(report), *files])
+    assert result.exit_code == 1
+    assert f'{invalid}: temperature_unit:' in result.output
+    assert len(json.loads(report.read_text())['issues']) == 1
+
+    result = invoke_cli(
+        cli, ['create-archive', '--same-dir-as-input', '--validate', *files]
+    )
+    assert result.exit_code == 0
+    assert 'Validated 4 record(s): 1 issue(s) in 1 file(s).' in result.output
+    assert f'Summary: {len(files) - 1} succeeded, 1 failed.' in result.output
+    assert f'Archive creation failed for {invalid}. Error: Invalid ' in result.output
+    assert not os.path.exists(str(invalid).replace('.json', '.archive.yaml'))
+
+    # the files skipped by the manifest are not reported
+    manifest = str(tmp_path / 'manifest.json')
+    arguments = ['create-archive', '--same-dir-as-input', '--validate']
+    arguments += ['--manifest', manifest, *files]
+    result = invoke_cli(cli, arguments)
+    assert result.exit_code == 0
+    result = invoke_cli(cli, arguments)
+    assert result.exit_code == 0
+    assert f'Skipped {len(files) - 1} unchanged file(s).' in result.output
+    assert 'Summary: 0 succeeded, 1 failed.' in result.output
+
+
+def test_index_and_convert_jsonl(tmp_path):
+    corpus = tmp_path / 'reactions.jsonl'
+    corpus.write_text(open('tests/data/reactions.jsonl').read())
+
+    result = invoke_cli(cli, ['index-jsonl', str(corpus)])
+    assert result.exit_code == 0
+    assert f'Indexed 3 records of 2 papers in {corpus} into {corpus}.idx.' in (
+        result.output
+    )
+
+    output = tmp_path / 'output'
+    result = invoke_cli(
+        cli,
+        [
+            'convert-jsonl',
+            str(corpus),
+            '--file',
+            'paper_5.json',
+            '--output-dir',
+            output,
+        ],
+    )
+    assert result.exit_code == 0
+    assert f'Created 1 archives from 1 records of {corpus}.' in result.output
+    assert os.listdir(output) == ['reactions_reaction_2.archive.yaml']
+
+    result = invoke_cli(
+        cli, ['convert-jsonl', str(corpus), '-j', '2', '--output-dir', output]
+    )
+    assert result.exit_code == 0
+    assert 'Created 2 archives from 3 records' in result.output
+    assert 'Failed records: 3' in result.output
+
+
+def test_watch(tmp_path):
+    inbox = tmp_path / 'inbox'
+    inbox.mkdir()
+    for file in sorted(glob.glob('tests/data/processed_reactions/*.json')):
+        (inbox / os.path.basename(file)).write_text(open(file).read())
+    (inbox / 'broken.json').write_text('{')
+    output = tmp_path / 'output'
+
+    result = invoke_cli(
+        cli,
+        [
+            'watch',
+            str(inbox),
+            str(output),
+            '--poll-interval',
+            '0',
+            '--max-batch-wait',
+            '0',
+            '--max-batches',
+            '1',
+        ],
+    )
+    assert result.exit_code == 0
+    assert 'converted 3 of 4 file(s) into 1 bundle(s)' in result.output
+    assert f'Archive creation failed for {inbox / "broken.json"}.' in result.output
+    assert len(glob.glob(str(output / '*.zip'))) == 1
+
+
+def test_index_and_search_monomers(tmp_path):
+    files = sorted(glob.glob('tests/data/processed_reactions/*.json'))
+    index = tmp_path / 'monomers.npz'
+
+    result = invoke_cli(cli, ['index-monomers', '--output', str(index), *files])
+    assert result.exit_code == 0
+    assert f'Indexed 4 distinct monomers of 3 reaction(s) into {index}.' in (
+        result.output
+    )
+
+    result = invoke_cli(
+        cli, ['search-monomers', str(index), 'C=CC(=O)O', '--substructure']
+    )
+    assert result.exit_code == 0
+    assert 'Found 2 of 4 monomers' in result.output
+    assert 'C=C(C)C(=O)OC (Methyl Methacrylate, 1 reaction(s))' in result.output
+
+    result = invoke_cli(
+        cli, ['search-monomers', str(index), 'C=C(C)C(=O)O', '--threshold', '1']
+    )
+    assert result.exit_code == 0
+    assert '1.000 C=C(C)C(=O)O (Methacrylic Acid, 1 reaction(s))' in result.output
+
+    result = invoke_cli(cli, ['search-monomers', str(index), 'C=C('])
+    assert result.exit_code != 0
+    assert 'Incomplete SMILES' in result.output
+
+
+def test_export_flat(tmp_path):
+    archives = sorted(glob.glob('tests/data/processed_reactions/*.archive.yaml'))
+    upload = tmp_path / 'upload.zip'
+    with zipfile.ZipFile(upload, 'w') as zip_file:
+        for path in archives:
+            zip_file.write(path, os.path.basename(path))
+    output = tmp_path / 'records.jsonl'
+
+    result = invoke_cli(
+        cli, ['export-flat', '--output', str(output), '-j', '2', *archives, str(upload)]
+    )
+    assert result.exit_code == 0
+    assert f'Exported 6 of 6 archives to {output}.' in result.output
+    with open(output) as f:
+        records = [json.loads(line) for line in f]
+    assert records[:3] == records[3:]
+    assert records[1]['monomer1'] == 'ethylene'
@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+
+from nomad_polymerization_reactions.composition import (
+    CompositionCache,
+    composition_key,
+)
+
+
+def monomer(name, cid=None, formula=None, smiles=None, mass_fraction=None):
+    substance = SimpleNamespace(pub_chem_cid=cid, molecular_formula=formula)
+    return SimpleNamespace(
+        name=None,
+        substance_name=name,
+        smiles=smiles,
+        pure_substance=substance,
+        mass=None,
+        mass_fraction=mass_fraction,
+    )
+
+
+def test_composition_key():
+    styrene = monomer('styrene', 7501, 'C8H8', 'C=Cc1ccccc1')
+    key = composition_key([styrene, monomer('acrylonitrile', smiles='C=CC#N')])
+    assert key == (
+        (7501, 'C8H8', None, None),
+        ('C=CC#N', None, None, None),
+    )
+    assert composition_key([monomer('Styrene', 7501, 'C8H8')]) == key[:1]
+    assert composition_key([styrene, SimpleNamespace(mass=None)]) is None
+
+
+def test_composition_cache_eviction():
+    cache = CompositionCache(max_entries=2)
+    cache.put('a', (('C', 1.0, 1.0),))
+    cache.put('b', (('H', 1.0, 1.0),))
+    assert cache.get('a') == (('C', 1.0, 1.0),)
+    cache.put('c', (('N', 1.0, 1.0),))
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert len(cache) == 2  # noqa: PLR2004
+    assert (cache.hits, cache.misses) == (2, 1)
+    cache.clear()
+    assert len(cache) == 0
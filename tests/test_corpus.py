@@ -0,0 +1,135 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from nomad_polymerization_reactions.bundles import DirectoryWriter
+from nomad_polymerization_reactions.corpus import (
+    Corpus,
+    CorpusIndex,
+    build_index,
+    convert_corpus,
+    get_index_path,
+    load_index,
+)
+from nomad_polymerization_reactions.utils import build_archive_entry, dump_archive
+
+TEST_FILE = os.path.join('tests', 'data', 'reactions.jsonl')
+
+
+@pytest.fixture
+def corpus_path(tmp_path):
+    path = tmp_path / 'reactions.jsonl'
+    shutil.copy(TEST_FILE, path)
+    return str(path)
+
+
+def _lines():
+    with open(TEST_FILE, 'rb') as f:
+        return [line for line in f if line.strip()]
+
+
+def test_build_index(corpus_path):
+    index = build_index(corpus_path)
+    lines = _lines()
+
+    assert len(index) == len(lines)
+    with open(corpus_path, 'rb') as f:
+        content = f.read()
+    assert [content[start:end] for start, end in zip(index.starts, index.ends)] == lines
+    assert index.lookup('paper_5.json') == [1]
+    assert index.lookup('https://doi.org/10.1002/pol.1963.110010415', 'source') == [0]
+    assert index.lookup('unknown.json') == []
+    with pytest.raises(KeyError):
+        index.lookup('C=C', 'monomer1_s')
+
+
+def test_load_index(corpus_path):
+    index = load_index(corpus_path)
+    index_path = get_index_path(corpus_path)
+    assert os.path.exists(index_path)
+
+    read_index = CorpusIndex.read(index_path)
+    assert list(read_index.starts) == list(index.starts)
+    assert list(read_index.ends) == list(index.ends)
+    assert read_index.keys == index.keys
+    assert read_index.is_current(corpus_path)
+
+    with open(corpus_path, 'a') as f:
+        f.write('{"file": "paper_9.json"}\n')
+    assert not read_index.is_current(corpus_path)
+    assert load_index(corpus_path).lookup('paper_9.json') == [len(index)]
+
+
+def test_corpus_records(corpus_path):
+    with Corpus(corpus_path) as corpus:
+        assert len(corpus) == len(_lines())
+        assert corpus.read(0) == _lines()[0]
+        assert corpus.find('paper_5.json') == [json.loads(_lines()[1])]
+        with pytest.raises(ValueError):
+            corpus.record(len(corpus) - 1)
+
+
+def test_index_chunks(tmp_path):
+    path = tmp_path / 'corpus.jsonl'
+    path.write_text(
+        ''.join(
+            f'{{"file": "paper_{i}.json", "pad": "{"x" * i}"}}\n' for i in range(40)
+        )
+    )
+    index = build_index(str(path))
+    chunks = index.chunks(4)
+
+    assert [number for chunk in chunks for number in chunk] == list(range(40))
+    sizes = [index.ends[chunk[-1]] - index.starts[chunk[0]] for chunk in chunks]
+    assert max(sizes) < 1.5 * min(sizes)  # noqa: PLR2004
+    assert index.chunks(100) == [range(i, i + 1) for i in range(40)]
+    assert build_index(str(tmp_path / 'corpus.jsonl'), keys=()).keys == {}
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_convert_corpus(corpus_path, tmp_path, jobs):
+    output = tmp_path / 'output'
+    with DirectoryWriter(str(output)) as writer:
+        results = convert_corpus(corpus_path, writer, jobs=jobs)
+
+    assert [number for number, _ in results] == [0, 1, 2]
+    assert [error is None for _, error in results] == [True, True, False]
+    assert sorted(os.listdir(output)) == [
+        'reactions_reaction_1.archive.yaml',
+        'reactions_reaction_2.archive.yaml',
+    ]
+    assert (output / 'reactions_reaction_2.archive.yaml').read_text() == dump_archive(
+        build_archive_entry(json.loads(_lines()[1]))
+    )
+
+    with DirectoryWriter(str(tmp_path / 'paper')) as writer:
+        results = convert_corpus(
+            corpus_path, writer, numbers=load_index(corpus_path).lookup('paper_5.json')
+        )
+    assert results == [(1, None)]
+    assert writer.paths == [
+        str(tmp_path / 'paper' / 'reactions_reaction_2.archive.yaml')
+    ]
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_convert_corpus_chunks(tmp_path, jobs):
+    path = tmp_path / 'corpus.jsonl'
+    path.write_text(''.join(f'{{"file": "paper_{i}.json"}}\n' for i in range(40)))
+
+    # chunks of a single record each, more than the workers have in flight
+    with DirectoryWriter(str(tmp_path / 'all')) as writer:
+        results = convert_corpus(str(path), writer, jobs=jobs, chunk_bytes=1)
+    assert results == [(number, None) for number in range(40)]
+    assert writer.paths == [
+        str(tmp_path / 'all' / f'corpus_reaction_{number + 1}.archive.yaml')
+        for number in range(40)
+    ]
+
+    with DirectoryWriter(str(tmp_path / 'selected')) as writer:
+        results = convert_corpus(
+            str(path), writer, [30, 3, 10, 3], jobs=jobs, chunk_bytes=1
+        )
+    assert results == [(3, None), (10, None), (30, None)]
@@ -0,0 +1,156 @@
+import json
+import os
+
+import pytest
+
+from nomad_polymerization_reactions.dedup import (
+    DuplicateIndex,
+    find_duplicates,
+    generate_archives_deduplicated,
+    iter_identified_entries,
+    merge_entries,
+    reaction_key,
+)
+from nomad_polymerization_reactions.utils import read_archive
+
+RECORD = {
+    'file': 'paper_0.json',
+    'monomer1': 'Styrene',
+    'monomer1_s': 'C=Cc1ccccc1',
+    'monomer2': 'Methyl Methacrylate',
+    'r_values': {'constant_1': 0.52, 'constant_2': 0.46},
+    'conf_intervals': {'constant_conf_1': None, 'constant_conf_2': None},
+    'temperature': 60.0,
+    'temperature_unit': '°C',
+    'method': 'bulk',
+    'solvent': None,
+    'source': 'https://doi.org/10.0000/paper.0',
+}
+# the same system, extracted from another paper with the monomers swapped
+DUPLICATE = {
+    'file': 'paper_1.json',
+    'monomer1': 'methyl  methacrylate',
+    'monomer2': 'styrene',
+    'monomer2_s': 'C=Cc1ccccc1',
+    'r_values': {'constant_1': 0.46, 'constant_2': 0.52},
+    'conf_intervals': {'constant_conf_1': 0.02, 'constant_conf_2': 0.03},
+    'temperature': 333.2,
+    'temperature_unit': 'K',
+    'method': 'Bulk',
+    'solvent': None,
+    'polymerization_type': 'free radical',
+    'source': 'https://doi.org/10.0000/paper.1',
+}
+OTHER = dict(RECORD, method='solvent', solvent='toluene')
+
+
+def write_records(directory, records):
+    filepaths = []
+    for index, record in enumerate(records):
+        filepath = directory / f'reaction_{index}.json'
+        filepath.write_text(json.dumps(record))
+        filepaths.append(str(filepath))
+    return filepaths
+
+
+def test_reaction_key(tmp_path):
+    filepaths = write_records(tmp_path, [RECORD, DUPLICATE, OTHER])
+    entries = dict(iter_identified_entries(filepaths))
+    keys = [reaction_key(archive_entry) for archive_entry in entries.values()]
+    assert keys[0] == (
+        ('C=Cc1ccccc1', 'methyl methacrylate'),
+        333.0,  # 60 °C and 333.2 K both round to 333 K
+        'bulk',
+        None,
+    )
+    assert keys[1] == keys[0]
+    assert keys[2] != keys[0]
+    assert reaction_key({'data': {}}) is None
+
+
+def test_duplicate_index():
+    index = DuplicateIndex(temperature_decimals=1)
+    first = {'data': {'monomers': [{'smiles': 'C=C'}, {'smiles': 'C=O'}]}}
+    second = {'data': {'monomers': [{'smiles': 'C=O'}, {'smiles': 'C=C'}]}}
+    assert index.add('a', first) is None
+    assert index.add('b', second) == 'a'
+    assert index.add('c', {'data': {}}) is None
+    assert index.add('d', second) == 'a'
+    (cluster,) = index.clusters()
+    assert cluster.members == ['a', 'b', 'd']
+    assert cluster.to_dict()['monomers'] == ['C=C', 'C=O']
+
+
+def test_find_duplicates(tmp_path):
+    filepaths = write_records(tmp_path, [RECORD, OTHER, DUPLICATE, RECORD])
+    (cluster,) = find_duplicates(iter_identified_entries(filepaths))
+    assert cluster.members == [filepaths[0], filepaths[2], filepaths[3]]
+
+
+def test_merge_entries():
+    merged = merge_entries(
+        {'data': {'a': 1, 'list': [1], 'section': {'b': None}}},
+        {'data': {'a': 2, 'list': [2, 3], 'section': {'b': 3, 'c': 4}, 'd': 5}},
+    )
+    assert merged == {
+        'data': {'a': 1, 'list': [1], 'section': {'b': 3, 'c': 4}, 'd': 5}
+    }
+
+
+@pytest.mark.parametrize(
+    'policy, written',
+    [('keep', [0, 1, 2]), ('skip', [0, 1]), ('merge', [0, 1])],
+)
+def test_generate_archives_deduplicated(tmp_path, policy, written):
+    filepaths = write_records(tmp_path, [RECORD, OTHER, DUPLICATE])
+    archive_paths = [path.replace('.json', '.archive.yaml') for path in filepaths]
+    deduplication = generate_archives_deduplicated(
+        [*filepaths, str(tmp_path / 'missing.json')],
+        same_dir_as_input=True,
+        policy=policy,
+    )
+
+    assert [error is None for _, error in deduplication.results] == [
+        True,
+        True,
+        True,
+        False,
+    ]
+    (cluster,) = deduplication.clusters
+    assert cluster.members == [archive_paths[0], archive_paths[2]]
+    assert [
+        index for index, path in enumerate(archive_paths) if os.path.exists(path)
+    ] == written
+    if policy == 'keep':
+        assert deduplication.skipped == []
+        return
+    assert deduplication.skipped == [archive_paths[2]]
+
+    data = read_archive(archive_paths[0])['data']
+    assert data['publication_reference']['DOI_number'] == RECORD['source']
+    conditions = data['reaction_conditions']
+    if policy == 'merge':
+        assert conditions['polymerization_type'] == 'free radical'
+    else:
+        assert 'polymerization_type' not in conditions
+
+
+def test_generate_archives_deduplicated_failing_file(tmp_path):
+    with open(os.path.join('tests', 'data', 'GPT4 Model Output.json')) as f:
+        document = json.load(f)
+    valid = tmp_path / 'valid.json'
+    valid.write_text(json.dumps(document))
+    document['reactions'][-1]['reaction_conditions'][-1]['temperature_unit'] = 'pc'
+    broken = tmp_path / 'broken.json'
+    broken.write_text(json.dumps(document))
+
+    deduplication = generate_archives_deduplicated(
+        [str(broken), str(valid)], same_dir_as_input=True, nested=True
+    )
+
+    # the reactions read before the failure are neither indexed nor written
+    assert [error is None for _, error in deduplication.results] == [False, True]
+    assert deduplication.clusters == []
+    assert deduplication.skipped == []
+    assert not list(tmp_path.glob('broken_reaction_*'))
+    assert list(tmp_path.glob('valid_reaction_*'))
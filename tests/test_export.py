@@ -0,0 +1,109 @@
+import glob
+import json
+
+import pytest
+import structlog
+
+from nomad_polymerization_reactions.export import (
+    export_tables,
+    iter_entries,
+    tabulate_entry,
+)
+
+pa = pytest.importorskip('pyarrow')
+pq = pytest.importorskip('pyarrow.parquet')
+
+FLAT_FILES = sorted(glob.glob('tests/data/processed_reactions/paper_*.json'))
+NESTED_FILE = 'tests/data/GPT4 Model Output.json'
+
+
+def test_tabulate_entry():
+    (entry,) = iter_entries(['tests/data/processed_reactions/paper_0_reaction_1.json'])
+    reaction, monomers = tabulate_entry(7, entry)
+    assert reaction['reaction_id'] == 7  # noqa: PLR2004
+    assert reaction['temperature'] == pytest.approx(293.15)
+    assert reaction['method'] == 'bulk'
+    assert reaction['r1'] == 22.0  # noqa: PLR2004
+    assert reaction['r2'] == 0.0
+    assert reaction['r1_conf'] is None
+    assert reaction['doi'] == 'https://doi.org/10.1002/pol.1963.110010415'
+    assert reaction['n_monomers'] == 2  # noqa: PLR2004
+    assert monomers == [
+        dict(reaction_id=7, position=1, name='ethylene', smiles='C=C'),
+        dict(reaction_id=7, position=2, name='carbon monoxide', smiles='C=O'),
+    ]
+
+
+def test_iter_entries_archives():
+    archive = 'tests/data/processed_reactions/paper_0_reaction_1.archive.yaml'
+    (entry,) = iter_entries([archive])
+    reaction, monomers = tabulate_entry(0, entry)
+    assert reaction['temperature'] == pytest.approx(293.15)
+    assert [monomer['name'] for monomer in monomers] == [
+        'ethylene',
+        'carbon monoxide',
+    ]
+
+
+def test_export_parquet(tmp_path):
+    tables = export_tables(
+        [*FLAT_FILES, 'tests/data/processed_reactions/missing.json'],
+        str(tmp_path),
+        batch_size=1,
+    )
+    reactions_path, reaction_rows = tables['reactions']
+    monomers_path, monomer_rows = tables['monomers']
+    assert reaction_rows == len(FLAT_FILES)
+
+    reactions = pq.read_table(reactions_path)
+    monomers = pq.read_table(monomers_path)
+    assert reactions.num_rows == reaction_rows
+    assert monomers.num_rows == monomer_rows
+    assert pa.types.is_dictionary(reactions.schema.field('method').type)
+    assert pa.types.is_dictionary(monomers.schema.field('name').type)
+    assert reactions.schema.field('temperature').type == pa.float64()
+    assert reactions.column('reaction_id').to_pylist() == list(range(reaction_rows))
+
+
+def test_export_arrow_nested(tmp_path):
+    tables = export_tables([NESTED_FILE], str(tmp_path), 'arrow', nested=True)
+    with pa.ipc.open_stream(tables['reactions'][0]) as reader:
+        reactions = reader.read_all()
+    with pa.ipc.open_stream(tables['monomers'][0]) as reader:
+        monomers = reader.read_all()
+
+    assert reactions.num_rows == 5  # noqa: PLR2004
+    assert reactions.column('solvent').to_pylist() == [
+        'carbon tetrachloride',
+        'chloroform',
+        'acetone',
+        '1,4-dioxane',
+        'acetonitrile',
+    ]
+    assert reactions.column('r1').to_pylist() == [0.54, 0.51, 0.43, 0.41, 0.06]
+    assert set(reactions.column('temperature').to_pylist()) == {333.15}
+    assert monomers.num_rows == 10  # noqa: PLR2004
+
+
+def test_export_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        export_tables(FLAT_FILES, str(tmp_path), 'csv')
+
+
+def test_export_skips_failing_reactions(tmp_path):
+    with open(NESTED_FILE) as f:
+        document = json.load(f)
+    conditions = document['reactions'][0]['reaction_conditions']
+    conditions[0]['temperature_unit'] = 'parsec'
+    nested_file = tmp_path / 'nested.json'
+    nested_file.write_text(json.dumps(document))
+    broken_file = tmp_path / 'broken.json'
+    broken_file.write_text('{"reactions": [')
+
+    tables = export_tables(
+        [str(nested_file), str(broken_file)],
+        str(tmp_path / 'tables'),
+        nested=True,
+        logger=structlog.wrap_logger(structlog.ReturnLogger()),
+    )
+    assert tables['reactions'][1] == 4  # noqa: PLR2004
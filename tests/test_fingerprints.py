@@ -0,0 +1,126 @@
+import json
+
+import numpy as np
+import pytest
+
+from nomad_polymerization_reactions.fingerprints import (
+    FingerprintIndex,
+    build_fingerprint_index,
+    parse_smiles,
+    smiles_fingerprint,
+)
+
+MONOMERS = [
+    ('styrene', 'C=Cc1ccccc1'),
+    ('methyl acrylate', 'C=CC(=O)OC'),
+    ('butyl acrylate', 'C=CC(=O)OCCCC'),
+    ('methyl methacrylate', 'C=C(C)C(=O)OC'),
+    ('acrylonitrile', 'C=CC#N'),
+    ('sodium acrylate', 'C=CC(=O)[O-].[Na+]'),
+]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    paths = []
+    for iterator, ((name_1, smiles_1), (name_2, smiles_2)) in enumerate(
+        zip(MONOMERS, [*MONOMERS[1:], MONOMERS[0]])
+    ):
+        path = tmp_path / f'paper_{iterator}.json'
+        path.write_text(
+            json.dumps(
+                dict(
+                    monomer1=name_1,
+                    monomer1_s=smiles_1,
+                    monomer2=name_2,
+                    monomer2_s=smiles_2,
+                )
+            )
+        )
+        paths.append(str(path))
+    broken = tmp_path / 'paper_broken.json'
+    broken.write_text(json.dumps(dict(monomer1='unknown', monomer1_s='C1CC(')))
+    paths.append(str(broken))
+    return paths
+
+
+def test_parse_smiles():
+    atoms, bonds = parse_smiles('C=Cc1ccccc1')
+    assert atoms == ['C', 'C', 'c', 'c', 'c', 'c', 'c', 'c']
+    assert bonds[:3] == [(0, 1, '='), (1, 2, '-'), (2, 3, ':')]
+    assert (2, 7, ':') in bonds
+
+    atoms, bonds = parse_smiles('[13CH2]=C/C(=O)[O-].[Na+]')
+    assert atoms == ['C', 'C', 'C', 'O', 'O', 'Na']
+    assert len(bonds) == 4  # noqa: PLR2004
+
+    for smiles in ('', 'C(C', 'C)C', 'C1CC', 'CXC', '1CC'):
+        with pytest.raises(ValueError):
+            parse_smiles(smiles)
+
+
+def test_smiles_fingerprint():
+    fingerprint = smiles_fingerprint('C=CC(=O)OC', n_bits=256)
+    assert fingerprint.dtype == np.uint64
+    assert fingerprint.shape == (4,)
+    # the order of the atoms in the SMILES does not matter
+    assert np.array_equal(fingerprint, smiles_fingerprint('COC(=O)C=C', n_bits=256))
+    # a substructure only sets bits of the molecule containing it
+    acrylate = smiles_fingerprint('C=CC(=O)O')
+    for smiles in ('C=CC(=O)OC', 'C=C(C)C(=O)OCCCC'):
+        molecule = smiles_fingerprint(smiles)
+        assert np.array_equal(acrylate & molecule, acrylate)
+    with pytest.raises(ValueError):
+        smiles_fingerprint('C', n_bits=100)
+
+
+def test_build_fingerprint_index(corpus, tmp_path):
+    build = build_fingerprint_index(corpus)
+    index = build.index
+
+    assert build.entries == len(corpus)
+    assert build.invalid_smiles == ['C1CC(']
+    assert sorted(index.smiles) == sorted(smiles for _, smiles in MONOMERS)
+    styrene = index.smiles.index('C=Cc1ccccc1')
+    assert index.names[styrene] == 'styrene'
+
+    matches = index.similar('C=Cc1ccccc1', threshold=1.0)
+    assert [match.smiles for match in matches] == ['C=Cc1ccccc1']
+    assert matches[0].similarity == 1.0
+    assert matches[0].entries == [corpus[0], corpus[len(MONOMERS) - 1]]
+    assert np.isclose(index.tanimoto('C=Cc1ccccc1')[styrene], 1.0)
+
+    acrylates = index.substructure('C=CC(=O)O')
+    assert {match.smiles for match in acrylates} == {
+        'C=CC(=O)OC',
+        'C=CC(=O)OCCCC',
+        'C=C(C)C(=O)OC',
+        'C=CC(=O)[O-].[Na+]',
+    }
+    assert [match.similarity for match in acrylates] == sorted(
+        (match.similarity for match in acrylates), reverse=True
+    )
+    assert len(index.substructure('C=CC(=O)O', limit=2)) == 2  # noqa: PLR2004
+
+    path = str(tmp_path / 'monomers.npz')
+    index.save(path)
+    loaded = FingerprintIndex.load(path)
+    assert loaded.smiles == index.smiles
+    assert loaded.names == index.names
+    assert loaded.n_bits == index.n_bits
+    assert loaded.substructure('C=CC(=O)O') == acrylates
+
+
+def test_similar_matches_brute_force(corpus):
+    index = build_fingerprint_index(corpus).index
+    for query in ('C=CC(=O)OCC', 'C=Cc1ccc(C)cc1', 'CC#N'):
+        similarities = index.tanimoto(query)
+        for threshold in (0.0, 0.3, 0.6):
+            expected = {
+                smiles
+                for smiles, similarity in zip(index.smiles, similarities)
+                if similarity >= threshold
+            }
+            assert {
+                match.smiles for match in index.similar(query, threshold)
+            } == expected
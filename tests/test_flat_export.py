@@ -0,0 +1,129 @@
+import glob
+import io
+import json
+import os
+import shutil
+import zipfile
+
+import pytest
+
+from nomad_polymerization_reactions.flat_export import (
+    export_flat_records,
+    iter_archive_inputs,
+)
+from nomad_polymerization_reactions.utils import (
+    build_archive_entry,
+    build_flat_record,
+    generate_archive_from_json,
+    generate_archives_from_nested_json,
+    iter_archives_from_nested_json,
+    read_archive,
+)
+
+PROCESSED = os.path.join('tests', 'data', 'processed_reactions')
+NESTED = os.path.join('tests', 'data', 'GPT4 Model Output.json')
+
+
+def test_build_flat_record():
+    entries = [read_archive(path) for path in glob.glob(f'{PROCESSED}/*.yaml')]
+    entries.extend(iter_archives_from_nested_json(NESTED))
+    for entry in entries:
+        assert build_archive_entry(build_flat_record(entry)) == entry
+
+    curated = dict(
+        data=dict(
+            data_file_name='paper_0.json',
+            monomers=[
+                dict(substance_name='styrene', smiles='C=Cc1ccccc1'),
+                dict(pure_substance=dict(name='acrylonitrile')),
+                dict(smiles='C=C'),
+            ],
+            reaction_conditions=dict(
+                temperature=333.15, reaction_constants=[dict(reaction_constant=0.4)]
+            ),
+            copolymerization_regime='random',
+        )
+    )
+    record = build_flat_record(curated)
+    assert (record['monomer2'], record['monomer2_s']) == ('acrylonitrile', None)
+    assert 'monomer3' not in record
+    assert (record['temperature'], record['temperature_unit']) == (333.15, 'K')
+    assert record['r_values'] == {'constant_1': 0.4}
+    assert 'copolymerization_regime' not in record
+
+
+@pytest.fixture
+def archives(tmp_path, monkeypatch):
+    """
+    Archives of the test data in `tmp_path / 'archives'`, the ones of the nested
+    LLM output as JSON zipped into an upload.
+    """
+    directory = tmp_path / 'archives'
+    directory.mkdir()
+    for path in glob.glob(f'{PROCESSED}/*.json'):
+        shutil.copy(path, directory)
+    nested_path = os.path.abspath(NESTED)
+    monkeypatch.chdir(directory)
+    for path in sorted(glob.glob('*.json')):
+        generate_archive_from_json(path)
+        os.remove(path)
+    nested = generate_archives_from_nested_json(nested_path, archive_format='json')
+    with zipfile.ZipFile('upload.zip', 'w') as zip_file:
+        for path in nested:
+            zip_file.write(path, f'raw/{path}')
+            os.remove(path)
+    monkeypatch.chdir(tmp_path)
+    return directory
+
+
+def test_iter_archive_inputs(archives):
+    inputs = list(iter_archive_inputs([str(archives)]))
+
+    assert [member for _, member in inputs if member is not None] == [
+        f'raw/GPT4 Model Output_reaction_{n}.archive.json' for n in range(1, 6)
+    ]
+    assert len(inputs) == 8  # noqa: PLR2004
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_export_flat_records_round_trip(archives, tmp_path, jobs):
+    output = tmp_path / 'records.jsonl'
+    results = export_flat_records([str(archives)], str(output), jobs, batch_size=2)
+
+    assert len(results) == 8  # noqa: PLR2004
+    assert all(error is None for _, error in results)
+    with open(output, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert len(lines) == len(results)
+
+    # converting the records again gives back identical archives
+    regenerated = tmp_path / 'regenerated'
+    regenerated.mkdir()
+    for (name, _), line in zip(results, lines):
+        archive_format = name.rsplit('.', 1)[1]
+        stem = os.path.basename(name).removesuffix(f'.archive.{archive_format}')
+        path = str(regenerated / f'{stem}.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(line)
+        generate_archive_from_json(path, True, archive_format=archive_format)
+        if '.zip/' in name:
+            zip_path, member = name.split('.zip/')
+            with zipfile.ZipFile(f'{zip_path}.zip') as zip_file:
+                original = zip_file.read(member).decode()
+        else:
+            with open(name, encoding='utf-8') as f:
+                original = f.read()
+        with open(f'{path.removesuffix(".json")}.archive.{archive_format}') as f:
+            assert f.read() == original
+
+
+def test_export_flat_records_failure(archives):
+    broken = archives / 'broken.archive.yaml'
+    broken.write_text('data: [')
+    stream = io.StringIO()
+
+    results = export_flat_records([str(archives)], stream)
+
+    assert [name for name, error in results if error is not None] == [str(broken)]
+    assert len(stream.getvalue().splitlines()) == len(results) - 1
+    assert json.loads(stream.getvalue().splitlines()[0])['file'] is None
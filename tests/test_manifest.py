@@ -0,0 +1,134 @@
+import glob
+import json
+import os
+
+from nomad_polymerization_reactions import manifest as manifest_module
+from nomad_polymerization_reactions.manifest import (
+    ConversionManifest,
+    generate_archives_incrementally,
+    get_converter_id,
+)
+
+
+def _copy_inputs(directory):
+    files = []
+    for file in sorted(glob.glob('tests/data/processed_reactions/*.json')):
+        target = directory / os.path.basename(file)
+        target.write_text(open(file).read())
+        files.append(str(target))
+    return files
+
+
+def test_incremental_conversion(tmp_path):
+    files = _copy_inputs(tmp_path)
+    manifest_path = str(tmp_path / 'manifest.json')
+
+    first = generate_archives_incrementally(files, manifest_path, True)
+    assert [error for _, error in first.results] == [None] * len(files)
+    assert first.skipped == []
+
+    second = generate_archives_incrementally(files, manifest_path, True)
+    assert second.results == []
+    assert second.skipped == files
+
+    with open(files[1]) as f:
+        record = json.load(f)
+    record['temperature'] = 80.0
+    with open(files[1], 'w') as f:
+        json.dump(record, f)
+    os.remove(files[2].replace('.json', '.archive.yaml'))
+
+    third = generate_archives_incrementally(files, manifest_path, True)
+    assert third.results == [(files[1], None), (files[2], None)]
+    assert third.skipped == [files[0]]
+
+    fourth = generate_archives_incrementally(files, manifest_path, True, nested=True)
+    assert len(fourth.results) == len(files)
+
+
+def test_unchanged_content_is_not_reconverted(tmp_path):
+    files = _copy_inputs(tmp_path)
+    manifest_path = str(tmp_path / 'manifest.json')
+    generate_archives_incrementally(files, manifest_path, True)
+
+    os.utime(files[0], ns=(0, 0))
+    manifest = ConversionManifest(manifest_path)
+    assert manifest.is_up_to_date(files[0], get_converter_id(same_dir_as_input=True))
+
+
+def test_touched_file_is_not_rehashed(tmp_path, monkeypatch):
+    files = _copy_inputs(tmp_path)
+    manifest_path = str(tmp_path / 'manifest.json')
+    generate_archives_incrementally(files, manifest_path, True)
+
+    os.utime(files[0], ns=(0, 0))
+    hashed = []
+    hash_file = manifest_module.hash_file
+
+    def counting_hash_file(path):
+        hashed.append(path)
+        return hash_file(path)
+
+    monkeypatch.setattr(manifest_module, 'hash_file', counting_hash_file)
+    second = generate_archives_incrementally(files, manifest_path, True)
+    assert second.skipped == files
+    assert hashed == [files[0]]
+
+    hashed.clear()
+    third = generate_archives_incrementally(files, manifest_path, True)
+    assert third.skipped == files
+    assert hashed == []
+
+
+def test_orphaned_outputs(tmp_path):
+    files = _copy_inputs(tmp_path)
+    manifest_path = str(tmp_path / 'manifest.json')
+    generate_archives_incrementally(files, manifest_path, True)
+
+    os.remove(files[0])
+    orphan = files[0].replace('.json', '.archive.yaml')
+    conversion = generate_archives_incrementally(files[1:], manifest_path, True)
+    assert conversion.orphaned_outputs == [orphan]
+    assert os.path.exists(orphan)
+
+    conversion = generate_archives_incrementally(
+        files[1:], manifest_path, True, prune_orphans=True
+    )
+    assert conversion.orphaned_outputs == [orphan]
+    assert not os.path.exists(orphan)
+    assert generate_archives_incrementally(files[1:], manifest_path, True) == (
+        generate_archives_incrementally(files[1:], manifest_path, True)
+    )
+
+
+def test_manifest_is_independent_of_working_directory(tmp_path, monkeypatch):
+    inputs = tmp_path / 'inputs'
+    inputs.mkdir()
+    files = _copy_inputs(inputs)
+    monkeypatch.chdir(inputs)
+    names = [os.path.basename(file) for file in files]
+    generate_archives_incrementally(names, 'manifest.json', True)
+
+    # the same relative paths exist in another working directory
+    other = tmp_path / 'other'
+    other.mkdir()
+    decoy = other / names[0].replace('.json', '.archive.yaml')
+    decoy.write_text('data: {}')
+    monkeypatch.chdir(other)
+    manifest_path = str(inputs / 'manifest.json')
+    conversion = generate_archives_incrementally(
+        files, manifest_path, True, prune_orphans=True
+    )
+    assert conversion.skipped == files
+    assert conversion.orphaned_outputs == []
+    assert decoy.exists()
+    assert len(ConversionManifest(manifest_path).entries) == len(files)
+
+    os.remove(files[0])
+    conversion = generate_archives_incrementally(
+        files[1:], manifest_path, True, prune_orphans=True
+    )
+    assert conversion.orphaned_outputs == [
+        str(inputs / names[0].replace('.json', '.archive.yaml'))
+    ]
+    assert decoy.exists()
@@ -0,0 +1,103 @@
+import asyncio
+import glob
+import os
+
+import pytest
+
+from nomad_polymerization_reactions import pipeline
+from nomad_polymerization_reactions.pipeline import (
+    generate_archives_pipelined,
+    run_pipeline,
+)
+from nomad_polymerization_reactions.profiling import profiling
+from nomad_polymerization_reactions.utils import (
+    generate_archives_from_json,
+    generate_archives_from_nested_json,
+)
+
+
+def copy_inputs(directory, copies=1):
+    files = []
+    for copy in range(copies):
+        for file in sorted(glob.glob('tests/data/processed_reactions/*.json')):
+            target = directory / f'{copy}_{os.path.basename(file)}'
+            target.write_text(open(file).read())
+            files.append(str(target))
+    broken = directory / 'broken.json'
+    broken.write_text('{"temperature": 20.0, "temperature_unit": "not-a-unit"}')
+    files.insert(1, str(broken))
+    return files
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_generate_archives_pipelined(tmp_path, jobs):
+    reference_dir = tmp_path / 'reference'
+    pipeline_dir = tmp_path / 'pipeline'
+    reference_dir.mkdir()
+    pipeline_dir.mkdir()
+    reference = generate_archives_from_json(copy_inputs(reference_dir), True)
+    files = copy_inputs(pipeline_dir)
+
+    with profiling() as profiler:
+        report = generate_archives_pipelined(files, True, jobs=jobs, queue_size=1)
+
+    assert [error is None for _, error in report.results] == [
+        error is None for _, error in reference
+    ]
+    assert [filepath for filepath, _ in report.results] == files
+    assert report.archives == len(files) - 1
+    assert profiler.counters['archives'] == report.archives
+    assert profiler.counters['failures'] == 1
+    for file in files[:1] + files[2:]:
+        archive = os.path.basename(file).replace('.json', '.archive.yaml')
+        with open(reference_dir / archive) as f, open(pipeline_dir / archive) as g:
+            assert f.read() == g.read()
+
+
+def test_pipeline_backpressure(tmp_path):
+    files = copy_inputs(tmp_path, copies=10)
+    report = generate_archives_pipelined(files, True, queue_size=2, io_workers=1)
+    assert max(report.max_queue_depth.values()) <= 2  # noqa: PLR2004
+    assert report.bytes_read == sum(os.path.getsize(file) for file in files)
+    assert report.throughput()['archives_per_second'] > 0
+    assert 'archives/s' in report.report()
+
+
+def test_run_pipeline_nested(tmp_path):
+    target = tmp_path / 'nested.json'
+    target.write_text(open('tests/data/GPT4 Model Output.json').read())
+
+    report = asyncio.run(run_pipeline([str(target)], True, nested=True))
+    assert report.results == [(str(target), None)]
+    assert report.archives == len(glob.glob(str(tmp_path / '*.archive.yaml')))
+    assert os.path.exists(tmp_path / 'nested_reaction_1.archive.yaml')
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_run_pipeline_streams_nested_files(tmp_path, monkeypatch, jobs):
+    reference_dir = tmp_path / 'reference'
+    pipeline_dir = tmp_path / 'pipeline'
+    for directory in (reference_dir, pipeline_dir):
+        directory.mkdir()
+        target = directory / 'nested.json'
+        target.write_text(open('tests/data/GPT4 Model Output.json').read())
+    reference = generate_archives_from_nested_json(
+        str(reference_dir / 'nested.json'), True
+    )
+
+    # the nested file is not read whole but queued one record at a time
+    def read_group(filepaths):
+        raise AssertionError('The nested file was read whole.')
+
+    monkeypatch.setattr(pipeline, '_read_group', read_group)
+    report = generate_archives_pipelined(
+        [str(pipeline_dir / 'nested.json')], True, jobs, nested=True, queue_size=1
+    )
+
+    assert report.results == [(str(pipeline_dir / 'nested.json'), None)]
+    assert report.archives == len(reference) > 1
+    assert max(report.max_queue_depth.values()) <= 1
+    for path in reference:
+        archive = os.path.basename(path)
+        with open(path) as f, open(pipeline_dir / archive) as g:
+            assert f.read() == g.read()
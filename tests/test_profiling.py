@@ -0,0 +1,150 @@
+import json
+import os
+
+import pytest
+
+from nomad_polymerization_reactions.profiling import (
+    Profiler,
+    count,
+    get_profiler,
+    map_ordered,
+    profile_stage,
+    profiling,
+    run_profiled,
+)
+from nomad_polymerization_reactions.utils import (
+    build_archive_entry,
+    generate_archives_from_json,
+)
+
+RECORD = {
+    'file': 'paper_0.json',
+    'monomer1': 'styrene',
+    'monomer2': 'methacrylic acid',
+    'monomer1_s': None,
+    'temperature': 60.0,
+    'temperature_unit': '°C',
+    'solvent': None,
+}
+
+
+class RecordingLogger:
+    def __init__(self):
+        self.events = []
+
+    def debug(self, event, **kwargs):
+        self.events.append(('debug', event, kwargs))
+
+    def info(self, event, **kwargs):
+        self.events.append(('info', event, kwargs))
+
+
+def test_profile_stage_without_profiler():
+    assert get_profiler() is None
+    with profile_stage('stage'):
+        count('counter')
+
+
+def test_profile_stage_logs_duration():
+    logger = RecordingLogger()
+    with profile_stage('stage', logger):
+        pass
+    ((level, event, kwargs),) = logger.events
+    assert level == 'debug'
+    assert event == 'Stage finished.'
+    assert kwargs['stage'] == 'stage'
+    assert kwargs['duration'] >= 0
+
+
+def test_profiling_build_archive_entry():
+    with profiling() as profiler:
+        build_archive_entry(RECORD)
+        build_archive_entry(RECORD)
+    assert get_profiler() is None
+
+    profile = profiler.to_dict()
+    assert profile['counters'] == {'records': 2, 'skipped_fields': 4}
+    assert profile['stages']['unit_conversion']['calls'] == 2  # noqa: PLR2004
+    assert profile['stages']['monomer_extraction']['calls'] == 2  # noqa: PLR2004
+
+
+def test_merge():
+    profiler = Profiler()
+    profiler.add_time('stage', 1.0)
+    profiler.count('records', 3)
+    other = Profiler()
+    other.add_time('stage', 2.0)
+    other.add_time('other', 0.5)
+    other.count('records')
+    other.count('failures')
+    profiler.merge(other.to_dict())
+
+    assert profiler.to_dict() == {
+        'stages': {
+            'stage': {'calls': 2, 'total': 3.0, 'max': 2.0},
+            'other': {'calls': 1, 'total': 0.5, 'max': 0.5},
+        },
+        'counters': {'records': 4, 'failures': 1},
+    }
+    report = profiler.report().splitlines()
+    assert report[1].split()[0] == 'stage'
+    assert report[2].split()[0] == 'other'
+
+    logger = RecordingLogger()
+    profiler.log(logger, 'Profile.', duration=4.0)
+    ((level, event, kwargs),) = logger.events
+    assert (level, event) == ('info', 'Profile.')
+    assert kwargs['counters'] == {'records': 4, 'failures': 1}
+    assert kwargs['duration'] == 4.0  # noqa: PLR2004
+
+
+def test_run_profiled():
+    def function(n):
+        count('calls', n)
+        return n
+
+    result, profile = run_profiled(function, 3)
+    assert result == 3  # noqa: PLR2004
+    assert profile == {'stages': {}, 'counters': {'calls': 3}}
+
+
+def count_items(items):
+    count('items', len(items))
+    return sum(items)
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_map_ordered(jobs):
+    batches = ([n, n] for n in range(10))
+
+    with profiling() as profiler:
+        results = list(map_ordered(count_items, batches, jobs))
+
+    assert results == [2 * n for n in range(10)]
+    assert profiler.counters == {'items': 20}
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_profiling_generate_archives_from_json(tmp_path, jobs):
+    filepaths = []
+    for index in range(3):
+        filepath = os.path.join(tmp_path, f'reaction_{index}.json')
+        with open(filepath, 'w') as f:
+            json.dump(RECORD, f)
+        filepaths.append(filepath)
+    filepaths.append(os.path.join(tmp_path, 'missing.json'))
+
+    with profiling() as profiler:
+        generate_archives_from_json(filepaths, same_dir_as_input=True, jobs=jobs)
+
+    profile = profiler.to_dict()
+    assert profile['counters'] == {
+        'records': 3,
+        'skipped_fields': 6,
+        'archives': 3,
+        'failures': 1,
+    }
+    # the failing file is only attempted to be parsed
+    assert profile['stages']['json_parse']['calls'] == 4  # noqa: PLR2004
+    for stage in ('serialization', 'file_write'):
+        assert profile['stages'][stage]['calls'] == 3  # noqa: PLR2004
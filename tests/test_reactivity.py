@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from nomad_polymerization_reactions.reactivity import (
+    COMPOSITION_POINTS,
+    analyze_reactivity_ratios,
+    azeotropic_feed,
+    classify_regime,
+    mayo_lewis,
+    r_product,
+    reactivity_ratios_from_entries,
+    regime_names,
+)
+
+
+def test_r_product():
+    np.testing.assert_allclose(r_product([0.63, 22.0], [0.25, 0.0]), [0.1575, 0.0])
+    assert np.isnan(r_product([np.nan], [1.0])[0])
+
+
+@pytest.mark.parametrize(
+    'r1, r2, regime',
+    [
+        (1.0, 1.0, 'ideal'),
+        (2.0, 0.52, 'ideal'),
+        (0.63, 0.25, 'alternating'),
+        (0.0, 0.0, 'alternating'),
+        (5.0, 2.0, 'blocky'),
+        (22.0, 0.0, 'statistical'),
+        (np.nan, 0.5, None),
+        (-1.0, 0.5, None),
+    ],
+)
+def test_classify_regime(r1, r2, regime):
+    assert regime_names(classify_regime(r1, r2)) == [regime]
+
+
+def test_mayo_lewis():
+    f1 = np.linspace(0, 1, 5)
+    composition = mayo_lewis([1.0, 0.63, 0.0], [1.0, 0.25, 0.0], f1)
+    assert composition.shape == (3, 5)
+    # ideal random copolymerization follows the feed
+    np.testing.assert_allclose(composition[0], f1)
+    assert composition[1, 0] == 0.0
+    assert composition[1, -1] == 1.0
+    # perfectly alternating, except for the undefined homopolymerization limits
+    np.testing.assert_allclose(composition[2, 1:-1], 0.5)
+    assert np.isnan(composition[2, 0])
+    assert np.isnan(composition[2, -1])
+
+
+def test_azeotropic_feed():
+    feed = azeotropic_feed([0.63, 5.0, 22.0], [0.25, 2.0, 0.0])
+    np.testing.assert_allclose(feed[:2], [0.75 / 1.12, -1.0 / -5.0])
+    assert np.isnan(feed[2])
+    # at the azeotrope, the copolymer has the composition of the feed
+    np.testing.assert_allclose(mayo_lewis([0.63], [0.25], feed[:1])[0], feed[:1])
+
+
+def test_analyze_reactivity_ratios_batch():
+    rng = np.random.default_rng(0)
+    r1, r2 = rng.lognormal(size=(2, 10000))
+    analysis = analyze_reactivity_ratios(r1, r2)
+    assert analysis['r_product'].shape == (10000,)
+    assert analysis['regime'].shape == (10000,)
+    assert analysis['feed_fraction'].shape == (COMPOSITION_POINTS,)
+    assert analysis['copolymer_fraction'].shape == (10000, COMPOSITION_POINTS)
+    np.testing.assert_allclose(analysis['copolymer_fraction'][:, 0], 0.0)
+    np.testing.assert_allclose(analysis['copolymer_fraction'][:, -1], 1.0)
+    np.testing.assert_array_equal(analysis['regime'][:3], classify_regime(r1, r2)[:3])
+
+
+def test_reactivity_ratios_from_entries():
+    entries = [
+        {
+            'data': {
+                'reaction_conditions': {
+                    'reaction_constants': [
+                        {'reaction_constant': 0.63},
+                        {'reaction_constant': 0.25},
+                    ]
+                }
+            }
+        },
+        {'data': {'reaction_conditions': {'reaction_constants': [{}]}}},
+        {'data': {}},
+    ]
+    r1, r2 = reactivity_ratios_from_entries(entries)
+    np.testing.assert_array_equal(r1, [0.63, np.nan, np.nan])
+    np.testing.assert_array_equal(r2, [0.25, np.nan, np.nan])
+    assert reactivity_ratios_from_entries([])[0].shape == (0,)
@@ -0,0 +1,104 @@
+import glob
+import json
+import os
+
+import numpy as np
+import pytest
+import structlog
+
+from nomad_polymerization_reactions.export import iter_entries, tabulate_entry
+from nomad_polymerization_reactions.store import ReactionStore
+from nomad_polymerization_reactions.utils import build_archive_entry
+
+RECORDS = [
+    {
+        'file': 'paper_0.json',
+        'monomer1': 'styrene',
+        'monomer1_s': 'C=Cc1ccccc1',
+        'monomer2': 'acrylonitrile',
+        'monomer2_s': None,
+        'monomer3': 'butadiene',
+        'r_values': {'constant_1': 0.4, 'constant_2': None, 'constant_3': 2},
+        'conf_intervals': {'constant_conf_1': 0.01, 'constant_conf_2': 0.02},
+        'temperature': 60,
+        'temperature_unit': '°C',
+        'solvent': 'toluene',
+        'method': 'solvent',
+        'polymerization_type': 'free radical',
+        'determination_method': 'Kelen-Tudor',
+        'r-product': 0.2,
+        'logP': 1.5,
+        'source': 'https://doi.org/10.1002/pol.1963.110010415',
+    },
+    {
+        'file': 'paper_0.json',
+        'monomer1': 'styrene',
+        'monomer2': 'acrylonitrile',
+        'temperature': 333,
+        'solvent': 'toluene',
+    },
+    {'file': 'paper_1.json'},
+]
+
+
+def test_round_trip():
+    store = ReactionStore.from_records(RECORDS)
+
+    assert len(store) == len(RECORDS)
+    assert list(store) == [build_archive_entry(record) for record in RECORDS]
+    assert store.to_entry(-1) == build_archive_entry(RECORDS[-1])
+    with pytest.raises(IndexError):
+        store.to_entry(len(RECORDS))
+    # the repeated strings are interned once
+    assert sorted(store.strings.values).count('toluene') == 1
+
+    copy = ReactionStore()
+    for entry in store:
+        copy.append_entry(entry)
+    assert list(copy) == list(store)
+
+
+def test_columns():
+    store = ReactionStore.from_records(RECORDS)
+    rows = [tabulate_entry(0, build_archive_entry(record))[0] for record in RECORDS]
+
+    for name in ('temperature', 'r1', 'r2', 'r1_conf', 'r2_conf', 'r_product'):
+        expected = [np.nan if row[name] is None else row[name] for row in rows]
+        np.testing.assert_array_equal(store.column(name), expected)
+    assert store.column('solvent') == [row['solvent'] for row in rows]
+    assert store.column('n_monomers').tolist() == [3, 2, 0]
+    with pytest.raises(KeyError):
+        store.column('reaction_id')
+
+
+def test_invalid_record():
+    store = ReactionStore.from_records(RECORDS[:1])
+
+    with pytest.raises(ValueError, match='not a number'):
+        store.append_record({'monomer1': 'styrene', 'r-product': 'high'})
+    assert len(store) == 1
+    assert store.column('n_monomers').tolist() == [3]
+
+
+def test_from_json_files():
+    paths = sorted(glob.glob(os.path.join('tests', 'data', 'processed_reactions', '*')))
+    assert list(ReactionStore.from_json_files(paths)) == list(iter_entries(paths))
+
+    paths = [os.path.join('tests', 'data', 'GPT4 Model Output.json')]
+    assert list(ReactionStore.from_json_files(paths, nested=True)) == list(
+        iter_entries(paths, nested=True)
+    )
+
+
+def test_from_jsonl(tmp_path):
+    corpus_path = tmp_path / 'reactions.jsonl'
+    with open(corpus_path, 'w') as f:
+        for record in RECORDS:
+            f.write(json.dumps(record) + '\n')
+        f.write('\n{"file": \n')
+
+    logger = structlog.wrap_logger(structlog.ReturnLogger())
+    store = ReactionStore.from_jsonl(str(corpus_path), logger)
+
+    assert list(store) == [build_archive_entry(record) for record in RECORDS]
+    assert store.nbytes > 0
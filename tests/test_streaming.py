@@ -0,0 +1,112 @@
+import glob
+import io
+import json
+import os
+import zipfile
+
+import pytest
+import yaml
+
+from nomad_polymerization_reactions.streaming import (
+    DirectorySink,
+    JSONLSink,
+    YAMLStreamSink,
+    ZipSink,
+    iter_archives,
+    write_archives,
+)
+from nomad_polymerization_reactions.utils import read_archive
+
+FLAT_FILE = 'tests/data/processed_reactions/paper_0_reaction_1.json'
+NESTED_FILE = 'tests/data/GPT4 Model Output.json'
+
+
+def test_iter_archives_sources(tmp_path, monkeypatch):
+    reference = read_archive(FLAT_FILE.replace('.json', '.archive.yaml'))
+    with open(FLAT_FILE) as f:
+        document = json.load(f)
+    with open(FLAT_FILE, 'rb') as f:
+        content = f.read()
+    cwd = os.getcwd()
+
+    monkeypatch.chdir(tmp_path)
+    files = os.listdir(tmp_path)
+    with open(os.path.join(cwd, FLAT_FILE)) as f:
+        archives = list(
+            iter_archives(
+                [os.path.join(cwd, FLAT_FILE), document, io.BytesIO(content), f]
+            )
+        )
+    assert [name for name, _ in archives] == [
+        'paper_0_reaction_1',
+        'reaction_2',
+        'reaction_3',
+        'paper_0_reaction_1',
+    ]
+    for _, entry in archives:
+        assert entry == reference
+    assert os.listdir(tmp_path) == files
+
+
+def test_iter_archives_nested():
+    from_path = list(iter_archives(NESTED_FILE, nested=True))
+    with open(NESTED_FILE) as f:
+        document = json.load(f)
+    from_document = list(iter_archives(document, nested=True))
+    with open(NESTED_FILE, 'rb') as f:
+        from_stream = list(iter_archives([f], nested=True))
+
+    assert from_path[0][0] == 'GPT4 Model Output_reaction_1'
+    assert [entry for _, entry in from_stream] == [entry for _, entry in from_path]
+    # parsed documents do not know their file name
+    for (_, entry), (_, reference) in zip(from_document, from_path):
+        reference['data'].pop('data_file_name')
+        assert entry == reference
+
+
+def test_iter_archives_errors():
+    broken = io.StringIO('{')
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_archives([broken, FLAT_FILE]))
+
+    errors = []
+    archives = list(
+        iter_archives(
+            [io.StringIO('{'), FLAT_FILE],
+            on_error=lambda source, e: errors.append(source),
+        )
+    )
+    assert [name for name, _ in archives] == ['paper_0_reaction_1']
+    assert len(errors) == 1
+
+
+def test_sinks(tmp_path):
+    files = sorted(glob.glob('tests/data/processed_reactions/*.json'))
+    references = [
+        read_archive(file.replace('.json', '.archive.yaml')) for file in files
+    ]
+
+    with DirectorySink(str(tmp_path / 'archives'), archive_format='json') as sink:
+        assert write_archives(files, sink) == len(files)
+    assert [read_archive(path) for path in sink.paths] == references
+
+    with ZipSink(str(tmp_path / 'upload'), max_entries=2) as sink:
+        write_archives(files, sink)
+    assert len(sink.paths) == 2  # noqa: PLR2004
+    with zipfile.ZipFile(sink.paths[0]) as zip_file:
+        assert zip_file.namelist()[0] == 'empty.archive.yaml'
+
+    with YAMLStreamSink(str(tmp_path / 'archives.yaml')) as sink:
+        write_archives(files, sink)
+    with open(tmp_path / 'archives.yaml') as f:
+        assert list(yaml.safe_load_all(f)) == references
+
+    stream = io.StringIO()
+    with JSONLSink(stream) as sink:
+        write_archives(files, sink)
+    assert not stream.closed
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line['name'] for line in lines] == [
+        os.path.basename(file).replace('.json', '') for file in files
+    ]
+    assert [line['archive'] for line in lines] == references
@@ -0,0 +1,156 @@
+import pytest
+from nomad import utils
+from nomad.datamodel import EntryArchive
+
+from nomad_polymerization_reactions.schema_packages.polymerization import (
+    Monomer,
+    PolymerizationReaction,
+)
+from nomad_polymerization_reactions.substances import (
+    PubChemLookupError,
+    SubstanceCache,
+    collect_substance_names,
+    embed_substances,
+    lookup_substance,
+    resolve_substances,
+)
+from nomad_polymerization_reactions.utils import build_archive_entry
+
+logger = utils.get_logger(__name__)
+
+STYRENE_CID = 7501
+CHLOROFORM_CID = 6212
+
+
+def _normalize_monomers(*names):
+    reaction = PolymerizationReaction(
+        monomers=[Monomer(substance_name=name) for name in names]
+    )
+    archive = EntryArchive(data=reaction)
+    for monomer in reaction.monomers:
+        monomer.normalize(archive, logger)
+    return reaction.monomers
+
+
+def test_monomer_normalize_uses_cache(pub_chem, substance_cache):
+    monomers = _normalize_monomers('Styrene', 'styrene', ' STYRENE ')
+    monomers += _normalize_monomers('Styrene')
+
+    assert len(pub_chem.searches()) == 1
+    assert len(pub_chem.requests) == 3  # search, properties, synonyms  # noqa: PLR2004
+    assert len(substance_cache) == 1
+    for monomer in monomers:
+        assert monomer.pure_substance.pub_chem_cid == STYRENE_CID
+        assert monomer.pure_substance.molecular_formula == 'C8H8'
+        assert monomer.pure_substance.cas_number == '100-42-5'
+        assert monomer.smiles == 'C=CC1=CC=CC=C1'
+    assert [monomer.pure_substance.name for monomer in monomers] == [
+        'Styrene',
+        'styrene',
+        ' STYRENE ',
+        'Styrene',
+    ]
+
+
+def test_negative_results_are_cached(pub_chem, substance_cache):
+    for _ in range(3):
+        assert lookup_substance('unobtainium', logger) is None
+    assert pub_chem.searches() == ['/name/unobtainium/cids/JSON']
+    assert len(pub_chem.requests) == 2  # name and formula  # noqa: PLR2004
+    assert substance_cache.get('Unobtainium') == (True, None)
+
+
+def test_failed_lookups_are_not_cached(pub_chem, substance_cache):
+    pub_chem.failure = 503
+    with pytest.raises(PubChemLookupError, match='503'):
+        lookup_substance('styrene', logger)
+    assert len(substance_cache) == 0
+    monomers = _normalize_monomers('styrene')
+    assert monomers[0].pure_substance.pub_chem_cid is None
+    assert len(substance_cache) == 0
+
+    pub_chem.failure = None
+    assert lookup_substance('styrene', logger)['pub_chem_cid'] == STYRENE_CID
+    assert substance_cache.get('styrene')[0]
+
+
+def test_substance_cache_ttl(pub_chem, tmp_path):
+    cache = SubstanceCache(str(tmp_path / 'expired.sqlite'), ttl=0)
+    lookup_substance('chloroform', logger, cache)
+    lookup_substance('chloroform', logger, cache)
+    assert len(pub_chem.searches('chloroform')) == 2  # noqa: PLR2004
+
+
+def test_substance_cache_eviction(tmp_path):
+    cache = SubstanceCache(str(tmp_path / 'small.sqlite'), max_entries=2)
+    cache.set('styrene', {'pub_chem_cid': 7501})
+    cache.set('chloroform', {'pub_chem_cid': 6212})
+    assert cache.get('styrene') == (True, {'pub_chem_cid': 7501})
+    cache.set('methacrylic acid', {'pub_chem_cid': 4093})
+
+    assert len(cache) == 2  # noqa: PLR2004
+    assert cache.get('chloroform') == (False, None)
+    assert cache.get('styrene') == (True, {'pub_chem_cid': 7501})
+
+    reopened = SubstanceCache(cache.path, max_entries=2)
+    assert reopened.get('methacrylic acid') == (True, {'pub_chem_cid': 4093})
+
+
+def test_resolve_substances_before_normalization(pub_chem, substance_cache):
+    entries = []
+    for index in range(10):
+        entry = build_archive_entry(
+            {
+                'monomer1': 'Methacrylic acid',
+                'monomer2': 'Styrene' if index % 2 else 'styrene',
+                'solvent': 'chloroform' if index % 3 else 'unobtainium',
+            }
+        )
+        entries.append(entry)
+    names = collect_substance_names(entries)
+    assert names == ['Methacrylic acid', 'styrene', 'unobtainium', 'chloroform']
+
+    resolved = resolve_substances(names, logger, max_workers=4)
+    assert set(resolved) == set(names)
+    assert resolved['unobtainium'] is None
+    assert resolved['chloroform']['pub_chem_cid'] == CHLOROFORM_CID
+    assert sorted(pub_chem.searches()) == sorted(
+        f'/name/{name}/cids/JSON' for name in names
+    )
+
+    requests = len(pub_chem.requests)
+    resolve_substances(names, logger)
+    monomers = _normalize_monomers('Styrene', 'Methacrylic acid')
+    assert len(pub_chem.requests) == requests
+    assert monomers[0].pure_substance.pub_chem_cid == STYRENE_CID
+
+
+def test_embed_substances(pub_chem, substance_cache, monkeypatch):
+    entry = build_archive_entry(
+        {'monomer1': 'Styrene', 'monomer2': 'unobtainium', 'solvent': 'chloroform'}
+    )
+    resolved = resolve_substances(collect_substance_names([entry]), logger)
+
+    assert embed_substances(entry, resolved) == 2  # noqa: PLR2004
+    monomers = entry['data']['monomers']
+    assert monomers[0]['pure_substance']['name'] == 'Styrene'
+    assert monomers[0]['pure_substance']['pub_chem_cid'] == STYRENE_CID
+    assert 'pure_substance' not in monomers[1]
+    solvent = entry['data']['reaction_conditions']['solvent']
+    assert solvent['pub_chem_cid'] == CHLOROFORM_CID
+    assert embed_substances(entry, resolved) == 0
+
+    # the embedded substances are normalized without a cache and without lookups
+    monkeypatch.setattr(
+        'nomad_polymerization_reactions.substances.get_substance_cache',
+        lambda: None,
+    )
+    requests = len(pub_chem.requests)
+    reaction = PolymerizationReaction.m_from_dict(entry['data'])
+    archive = EntryArchive(data=reaction)
+    reaction.monomers[0].normalize(archive, logger)
+    reaction.monomers[0].pure_substance.normalize(archive, logger)
+    reaction.reaction_conditions.solvent.normalize(archive, logger)
+    assert len(pub_chem.requests) == requests
+    assert reaction.monomers[0].smiles == 'C=CC1=CC=CC=C1'
+    assert reaction.reaction_conditions.solvent.molecular_formula == 'CHCl3'
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from nomad.units import ureg
+from pint.errors import DimensionalityError
+
+from nomad_polymerization_reactions.units import (
+    get_temperature_transform,
+    temperature_to_kelvin,
+    temperatures_to_kelvin,
+)
+
+TEMPERATURES = [-273.15, -40.0, 0.0, 20.0, 60.0, 70.0, 123.456, 1000.0]
+
+
+@pytest.mark.parametrize('unit', ['°C', 'K', '°F', 'degC', 'degR', 'mK'])
+def test_temperature_to_kelvin_matches_pint(unit):
+    for temperature in TEMPERATURES:
+        assert (
+            temperature_to_kelvin(temperature, unit)
+            == ureg.Quantity(temperature, unit).to('K').magnitude
+        )
+
+
+def test_temperature_transform_is_cached():
+    get_temperature_transform.cache_clear()
+    for temperature in TEMPERATURES:
+        temperature_to_kelvin(temperature, '°C')
+    info = get_temperature_transform.cache_info()
+    assert info.misses == 1
+    assert info.hits == len(TEMPERATURES) - 1
+
+
+def test_temperatures_to_kelvin():
+    units = ['°C', 'K', '°F', '°C'] * 2
+    expected = [
+        ureg.Quantity(temperature, unit).to('K').magnitude
+        for temperature, unit in zip(TEMPERATURES, units)
+    ]
+    np.testing.assert_array_equal(temperatures_to_kelvin(TEMPERATURES, units), expected)
+    np.testing.assert_array_equal(
+        temperatures_to_kelvin(np.array(TEMPERATURES), '°C'),
+        np.array(TEMPERATURES) + 273.15,
+    )
+
+
+def test_temperature_to_kelvin_invalid_unit():
+    with pytest.raises(DimensionalityError):
+        temperature_to_kelvin(20.0, 'm')
@@ -1,9 +1,21 @@
+import glob
+import json
 import os
+import tracemalloc
 
 import pytest
 import yaml
 
-from nomad_polymerization_reactions.utils import generate_archive_from_json
+from nomad_polymerization_reactions.utils import (
+    build_archive_entry,
+    dump_archive,
+    generate_archive_from_json,
+    generate_archives_from_json,
+    generate_archives_from_nested_json,
+    get_archive_path,
+    iter_archives_from_nested_json,
+    read_archive,
+)
 
 
 @pytest.mark.parametrize(
@@ -36,3 +48,130 @@ def test_generate_archive_from_llm_output(params):
     # remove the generated file
     generated_file = f'{params["filepath"].split("/")[-1].split(".")[0]}.archive.yaml'
     os.remove(generated_file)
+
+
+def test_generate_archives_from_json_jobs(tmp_path):
+    files = []
+    for file in sorted(glob.glob('tests/data/processed_reactions/*.json')):
+        for jobs in (1, 3):
+            target = tmp_path / f'jobs_{jobs}' / os.path.basename(file)
+            target.parent.mkdir(exist_ok=True)
+            target.write_text(open(file).read())
+            files.append(str(target))
+    broken = tmp_path / 'jobs_1' / 'broken.json'
+    broken.write_text('{')
+
+    sequential = generate_archives_from_json(
+        [f for f in files if 'jobs_1' in f] + [str(broken)], True, jobs=1
+    )
+    parallel = generate_archives_from_json([f for f in files if 'jobs_3' in f], True, 3)
+
+    assert [error for _, error in sequential[:-1]] == [None] * (len(sequential) - 1)
+    assert sequential[-1][0] == str(broken)
+    assert sequential[-1][1].startswith('JSONDecodeError')
+    assert [f for f, _ in parallel] == [f for f in files if 'jobs_3' in f]
+    for file, _ in parallel:
+        with open(file.replace('.json', '.archive.yaml')) as f:
+            parallel_archive = f.read()
+        with open(
+            file.replace('jobs_3', 'jobs_1').replace('.json', '.archive.yaml')
+        ) as f:
+            assert parallel_archive == f.read()
+
+
+def test_generate_archives_from_nested_json(tmp_path):
+    filepath = tmp_path / 'paper01.json'
+    filepath.write_text(open('tests/data/GPT4 Model Output.json').read())
+
+    archive_paths = generate_archives_from_nested_json(str(filepath), True)
+
+    assert archive_paths == [
+        str(tmp_path / f'paper01_reaction_{i}.archive.yaml') for i in range(1, 6)
+    ]
+    with open(archive_paths[0]) as f:
+        archive = yaml.load(f, Loader=yaml.FullLoader)
+    assert archive == {
+        'data': {
+            'm_def': (
+                'nomad_polymerization_reactions.schema_packages.polymerization.'
+                'PolymerizationReaction'
+            ),
+            'data_file_name': 'paper01.json',
+            'publication_reference': {
+                'DOI_number': 'https://doi.org/10.1002/macp.1985.021860810'
+            },
+            'monomers': [
+                {'substance_name': 'Methacrylic acid'},
+                {'substance_name': 'Styrene'},
+            ],
+            'reaction_conditions': {
+                'temperature': pytest.approx(333.15),
+                'solvent': {'name': 'carbon tetrachloride'},
+                'method': 'solvent',
+                'polymerization_type': 'free radical',
+                'determination_method': 'Kelen-Tudor',
+                'reaction_constants': [
+                    {'reaction_constant': 0.54, 'reaction_constant_confi': 0.01},
+                    {'reaction_constant': 0.06, 'reaction_constant_confi': 0.03},
+                ],
+            },
+        }
+    }
+
+
+def _peak_memory_of_nested_conversion(filepath, n_reactions):
+    with open('tests/data/GPT4 Model Output.json') as f:
+        reaction = json.load(f)['reactions'][0]
+    with open(filepath, 'w') as f:
+        f.write('{"reactions": [')
+        f.write(', '.join([json.dumps(reaction)] * n_reactions))
+        f.write('], "source": "https://doi.org/10.1002/macp.1985.021860810"}')
+
+    tracemalloc.start()
+    n_archives = sum(1 for _ in iter_archives_from_nested_json(filepath))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert n_archives == n_reactions * len(reaction['reaction_conditions'])
+    return peak
+
+
+def test_iter_archives_from_nested_json_memory(tmp_path):
+    small = _peak_memory_of_nested_conversion(str(tmp_path / 'small.json'), 100)
+    large = _peak_memory_of_nested_conversion(str(tmp_path / 'large.json'), 1000)
+    assert large < 2 * small
+
+
+@pytest.mark.parametrize(
+    'filepath',
+    [
+        'tests/data/processed_reactions/paper_0_reaction_1.json',
+        'tests/data/processed_reactions/paper_5_reaction_1.json',
+        'tests/data/processed_reactions/empty.json',
+    ],
+)
+def test_archive_serialization_formats(filepath, tmp_path):
+    reference_path = filepath.replace('.json', '.archive.yaml')
+    with open(reference_path) as f:
+        reference_text = f.read()
+    with open(filepath) as f:
+        entry = build_archive_entry(json.load(f))
+
+    assert dump_archive(entry, 'yaml') == reference_text
+    assert (
+        yaml.dump(entry, Dumper=yaml.Dumper, default_flow_style=False) == reference_text
+    )
+
+    target = tmp_path / os.path.basename(filepath)
+    target.write_text(open(filepath).read())
+    generate_archive_from_json(str(target), True, archive_format='json')
+    json_archive = read_archive(str(target).replace('.json', '.archive.json'))
+    assert json_archive == read_archive(reference_path)
+
+
+def test_get_archive_path():
+    assert (
+        get_archive_path('out.json/paper.json', True) == 'out.json/paper.archive.yaml'
+    )
+    assert get_archive_path('out.json/paper.json') == 'paper.archive.yaml'
+    # inputs without the extension never overwrite themselves
+    assert get_archive_path('paper.txt', True, 'json') == 'paper.txt.archive.json'
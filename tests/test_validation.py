@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from nomad_polymerization_reactions.validation import (
+    check_smiles,
+    check_temperature_unit,
+    validate_files,
+    validate_record,
+    write_validation_report,
+)
+
+
+@pytest.mark.parametrize(
+    'smiles, valid',
+    [
+        ('C=C', True),
+        ('C=C(C)C(=O)O', True),
+        ('O=C1OC(=O)C=C1', True),
+        ('C%12CC%12', True),
+        ('[Na+].[Cl-]', True),
+        ('C1CC', False),
+        ('C(C', False),
+        ('C)C(', False),
+        ('[NaC', False),
+        ('C C', False),
+    ],
+)
+def test_check_smiles(smiles, valid):
+    assert (check_smiles(smiles) is None) == valid
+
+
+def test_check_temperature_unit():
+    assert check_temperature_unit('°C') is None
+    assert check_temperature_unit('degree_Rankine') is None
+    assert check_temperature_unit('m') is not None
+    assert check_temperature_unit('not-a-unit') is not None
+
+
+def test_validate_record():
+    with open('tests/data/processed_reactions/paper_5_reaction_1.json') as f:
+        assert validate_record(json.load(f)) == []
+
+    issues = validate_record(
+        {
+            'temperature': '20',
+            'temperature_unit': 'm',
+            'monomer1': 'styrene',
+            'monomer3': 'ethylene',
+            'monomer2_s': 'C=C',
+            'r_values': {'constant_1': 'high', 'r1': 0.5},
+            'conf_intervals': None,
+        }
+    )
+    assert [field for field, _ in issues] == [
+        'temperature',
+        'r_values.constant_1',
+        'r_values.r1',
+        'temperature_unit',
+        'monomer2_s',
+        'monomer3',
+    ]
+    assert validate_record([]) == [(None, 'Expected an object, got list.')]
+
+
+def test_validate_files(tmp_path):
+    broken = tmp_path / 'broken.json'
+    broken.write_text('{')
+    invalid = tmp_path / 'invalid.json'
+    invalid.write_text(json.dumps({'temperature': 20.0, 'temperature_unit': 'm'}))
+    files = [
+        'tests/data/processed_reactions/paper_0_reaction_1.json',
+        str(broken),
+        str(invalid),
+    ]
+
+    report = validate_files(files)
+    assert report.records == 2  # noqa: PLR2004
+    assert report.invalid_files == {str(broken), str(invalid)}
+    write_validation_report(report, str(tmp_path / 'report.json'))
+    with open(tmp_path / 'report.json') as f:
+        issues = json.load(f)['issues']
+    assert issues[0]['file'] == str(broken)
+    assert issues[0]['field'] is None
+    assert issues[1] == {
+        'file': str(invalid),
+        'record': None,
+        'field': 'temperature_unit',
+        'reason': '"m" is not a known temperature unit.',
+    }
+
+
+def test_validate_files_nested(tmp_path):
+    with open('tests/data/GPT4 Model Output.json') as f:
+        document = json.load(f)
+    assert validate_files(['tests/data/GPT4 Model Output.json'], True).issues == []
+
+    document['reactions'][0]['reaction_conditions'][0]['temperature'] = 'hot'
+    target = tmp_path / 'nested.json'
+    target.write_text(json.dumps(document))
+    (issue,) = validate_files([str(target)], nested=True).issues
+    assert (issue.record, issue.field) == (1, 'temperature')
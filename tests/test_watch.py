@@ -0,0 +1,144 @@
+import glob
+import os
+import shutil
+import zipfile
+
+from nomad_polymerization_reactions.manifest import ConversionManifest
+from nomad_polymerization_reactions.watch import (
+    PARTIAL_DIRECTORY,
+    DirectoryPoller,
+    MicroBatcher,
+    convert_batch,
+    watch,
+)
+
+FLAT_FILES = sorted(glob.glob('tests/data/processed_reactions/*.json'))
+
+
+def _write(path, content):
+    path.write_text(content)
+    return str(path)
+
+
+def test_directory_poller(tmp_path):
+    first = _write(tmp_path / 'first.json', '{}')
+    _write(tmp_path / 'notes.txt', '')
+    (tmp_path / 'sub').mkdir()
+    nested = _write(tmp_path / 'sub' / 'nested.json', '{}')
+    poller = DirectoryPoller(str(tmp_path))
+
+    assert poller.poll() == []
+    assert poller.poll() == [first]
+    assert poller.poll() == []
+
+    # a changed file is only reported once it settled
+    _write(tmp_path / 'first.json', '{"file": "first.json"}')
+    assert poller.poll() == []
+    assert poller.poll() == [first]
+
+    recursive = DirectoryPoller(str(tmp_path), recursive=True)
+    recursive.poll()
+    assert recursive.poll() == [first, nested]
+
+    converted = DirectoryPoller(str(tmp_path), is_converted=lambda path: True)
+    converted.poll()
+    assert converted.poll() == []
+
+
+def test_micro_batcher():
+    now = [0.0]
+    batcher = MicroBatcher(max_size=3, max_wait=5.0, clock=lambda: now[0])
+
+    batcher.add(['a', 'b'])
+    assert batcher.pop() == []
+    batcher.add(['b', 'c', 'd'])
+    assert batcher.pop() == ['a', 'b', 'c']
+    assert batcher.pop() == []
+    now[0] = 5.0
+    assert batcher.pop() == ['d']
+    batcher.add(['e'])
+    assert batcher.pop(flush=True) == ['e']
+    assert len(batcher) == 0
+
+
+def test_convert_batch(tmp_path):
+    inputs = [*FLAT_FILES, _write(tmp_path / 'broken.json', '{')]
+    output = tmp_path / 'output'
+    batch = convert_batch(inputs, str(output), 'batch_1', max_entries=2)
+
+    assert [error is None for _, error in batch.results] == [True, True, True, False]
+    assert batch.bundles == [
+        str(output / 'batch_1_1.zip'),
+        str(output / 'batch_1_2.zip'),
+    ]
+    assert os.listdir(output / PARTIAL_DIRECTORY) == []
+    with zipfile.ZipFile(batch.bundles[0]) as zip_file:
+        assert zip_file.namelist() == [
+            'empty.archive.yaml',
+            'paper_0_reaction_1.archive.yaml',
+        ]
+
+
+def test_convert_batch_subdirectories(tmp_path):
+    inbox = tmp_path / 'inbox'
+    inputs = []
+    for directory in ('a', 'b'):
+        (inbox / directory).mkdir(parents=True)
+        inputs.append(shutil.copy(FLAT_FILES[1], inbox / directory / 'paper.json'))
+
+    batch = convert_batch(
+        inputs, str(tmp_path / 'output'), 'batch_1', base_dir=str(inbox)
+    )
+
+    with zipfile.ZipFile(batch.bundles[0]) as zip_file:
+        assert zip_file.namelist() == [
+            os.path.join('a', 'paper.archive.yaml'),
+            os.path.join('b', 'paper.archive.yaml'),
+        ]
+
+
+def test_watch(tmp_path):
+    inbox = tmp_path / 'inbox'
+    inbox.mkdir()
+    output = tmp_path / 'output'
+    manifest = str(tmp_path / 'manifest.json')
+    for file in FLAT_FILES[:2]:
+        shutil.copy(file, inbox)
+    batches = []
+
+    def run():
+        return watch(
+            str(inbox),
+            str(output),
+            poll_interval=0.01,
+            max_batch_size=10,
+            max_batch_wait=0.0,
+            manifest_path=manifest,
+            max_batches=1,
+            on_batch=batches.append,
+        )
+
+    assert run() == 1
+    assert [os.path.basename(path) for path, _ in batches[0].results] == [
+        os.path.basename(file) for file in FLAT_FILES[:2]
+    ]
+    assert len(batches[0].bundles) == 1
+    assert os.path.exists(batches[0].bundles[0])
+
+    # after a restart, only the new file is converted
+    shutil.copy(FLAT_FILES[2], inbox)
+    assert run() == 1
+    assert [os.path.basename(path) for path, _ in batches[1].results] == [
+        os.path.basename(FLAT_FILES[2])
+    ]
+    assert batches[1].bundles != batches[0].bundles
+    assert len(glob.glob(str(output / '*.zip'))) == 2  # noqa: PLR2004
+
+    # the bundles are shared by the files and never become orphans
+    os.remove(inbox / os.path.basename(FLAT_FILES[0]))
+    conversion_manifest = ConversionManifest(manifest)
+    assert all(
+        entry['outputs'] == [] and entry['converter'].endswith('/bundle')
+        for entry in conversion_manifest.entries.values()
+    )
+    assert conversion_manifest.find_orphans() == []